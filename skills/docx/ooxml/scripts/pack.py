@@ -3,29 +3,129 @@
 Tool to pack a directory into a .docx, .pptx, or .xlsx file with XML formatting undone.
 
 Example usage:
-    python pack.py <input_directory> <office_file> [--force]
+    python pack.py <input_directory> <office_file> [--force | --deep] [--jobs N]
+                   [--fast | --small] [--deterministic] [--incremental]
 """
 
 import argparse
-import shutil
+import collections
+import copy
+import hashlib
+import io
+import json
+import os
+import stat
+import struct
 import subprocess
 import sys
 import tempfile
+import xml.parsers.expat
 import defusedxml.minidom
 import zipfile
+import zlib
+from concurrent.futures import Future, ProcessPoolExecutor, ThreadPoolExecutor
 from pathlib import Path
 
+# Below this much XML, starting worker processes costs more than it saves
+_PARALLEL_MIN_BYTES = 1 << 20
+
+# Parts that are already compressed: deflating them again costs CPU for almost no
+# gain, so they are stored as-is
+# fmt: off
+STORED_EXTENSIONS = frozenset(
+    {
+        # Images (EMF, WMF, BMP and TIFF are usually uncompressed and still deflated)
+        ".png", ".jpg", ".jpeg", ".gif", ".webp", ".wdp", ".jxr", ".emz", ".wmz",
+        # Audio and video
+        ".mp3", ".m4a", ".aac", ".ogg", ".wma", ".mp4", ".m4v", ".mov", ".wmv", ".avi",
+        # Embedded packages and archives
+        ".docx", ".docm", ".dotx", ".xlsx", ".xlsm", ".xltx", ".pptx", ".pptm",
+        ".potx", ".zip", ".odt", ".ods", ".odp",
+        # Fonts obfuscated by Word are compressed font files
+        ".odttf", ".woff", ".woff2",
+    }
+)
+# fmt: on
+
+# Deflate levels for --fast and --small (None is zlib's default, level 6)
+FAST_COMPRESSLEVEL = 1
+SMALL_COMPRESSLEVEL = 9
+
+# Member metadata in deterministic archives: the earliest zip timestamp and a
+# regular file readable by everyone
+_DETERMINISTIC_DATE_TIME = (1980, 1, 1, 0, 0, 0)
+_DETERMINISTIC_EXTERNAL_ATTR = (stat.S_IFREG | 0o644) << 16
+
+# Suffix of the hidden file next to the output archive (.report.docx.pack-manifest.json)
+# recording what the last incremental pack wrote
+MANIFEST_SUFFIX = ".pack-manifest.json"
+_MANIFEST_VERSION = 1
+
+# soffice gets this long to convert a document, plus some time per MiB of archive
+_SOFFICE_TIMEOUT = 10
+_SOFFICE_TIMEOUT_PER_MB = 5
+
+# The umask can only be read by setting it, which races with other threads, so it
+# is read once at import; new files get 0o666 & ~_UMASK
+_UMASK = os.umask(0)
+os.umask(_UMASK)
+
 
 def main():
     parser = argparse.ArgumentParser(description="Pack a directory into an Office file")
     parser.add_argument("input_directory", help="Unpacked Office document directory")
     parser.add_argument("output_file", help="Output Office file (.docx/.pptx/.xlsx)")
-    parser.add_argument("--force", action="store_true", help="Skip validation")
+    checks = parser.add_mutually_exclusive_group()
+    checks.add_argument("--force", action="store_true", help="Skip validation")
+    checks.add_argument(
+        "--deep",
+        action="store_true",
+        help="After the structural checks, also open the result with soffice",
+    )
+    parser.add_argument(
+        "--jobs",
+        type=int,
+        default=None,
+        help="Workers condensing and compressing parts (default: CPU count; 1 for serial)",
+    )
+    level = parser.add_mutually_exclusive_group()
+    level.add_argument(
+        "--fast",
+        dest="compresslevel",
+        action="store_const",
+        const=FAST_COMPRESSLEVEL,
+        help="Compress quickly, for intermediate files",
+    )
+    level.add_argument(
+        "--small",
+        dest="compresslevel",
+        action="store_const",
+        const=SMALL_COMPRESSLEVEL,
+        help="Compress as much as possible, for final delivery",
+    )
+    parser.add_argument(
+        "--deterministic",
+        action="store_true",
+        help="Same bytes for the same content: fixed member order, times and modes",
+    )
+    parser.add_argument(
+        "--incremental",
+        action="store_true",
+        help="Reuse unchanged members of the previous output (tracked in a hidden "
+        f"{MANIFEST_SUFFIX} file next to it)",
+    )
     args = parser.parse_args()
 
     try:
         success = pack_document(
-            args.input_directory, args.output_file, validate=not args.force
+            args.input_directory,
+            args.output_file,
+            validate=not args.force,
+            deep=args.deep,
+            jobs=args.jobs,
+            compresslevel=args.compresslevel,
+            deterministic=args.deterministic,
+            incremental=args.incremental,
         )
 
         # Show warning if validation was skipped
@@ -42,53 +142,238 @@ def main():
         sys.exit(f"Error: {e}")
 
 
-def pack_document(input_dir, output_file, validate=False):
+def pack_document(
+    input_dir,
+    output_file,
+    validate=False,
+    jobs=None,
+    compresslevel=None,
+    deterministic=False,
+    incremental=False,
+    deep=False,
+):
     """Pack a directory into an Office file (.docx/.pptx/.xlsx).
 
+    Already-compressed parts (see STORED_EXTENSIONS) are stored; everything else,
+    XML in particular, is deflated at compresslevel.
+
+    With deterministic=True the archive depends only on the member names and
+    contents (and the zlib build): [Content_Types].xml comes first, then the other
+    members sorted by name, all with a fixed timestamp and permissions. Identical
+    input then gives an identical file, which can be cached by hash.
+
+    With incremental=True a manifest of each file's size, mtime and SHA-256 is kept
+    in a hidden file next to the output (".<output name>" + MANIFEST_SUFFIX); the
+    input directory is left untouched. On the next incremental pack of the same
+    directory to the same output file, members whose content is unchanged are copied
+    from the previous archive without condensing or compressing them again, so a
+    repack after a small edit costs about one part. The result is the same as a
+    full pack.
+
     Args:
         input_dir: Path to unpacked Office document directory
         output_file: Path to output Office file
-        validate: If True, validates with soffice (default: False)
+        validate: If True, runs check_structure() on input_dir first and packs
+            nothing if it fails (default: False)
+        jobs: Workers condensing XML parts (processes, used for large packages
+            only) and compressing members (threads); default CPU count. The
+            output is the same for any value.
+        compresslevel: Deflate level from 1 (fastest) to 9 (smallest); default
+            zlib's level 6
+        deterministic: If True, write a reproducible archive (default: False)
+        incremental: If True, reuse unchanged members of the previous output
+            (default: False)
+        deep: If True with validate, also converts the packed file with soffice
+            and deletes it if that fails (default: False)
 
     Returns:
         bool: True if successful, False if validation failed
     """
-    input_dir = Path(input_dir)
+    input_dir = _check_input_dir(input_dir)
     output_file = Path(output_file)
 
-    if not input_dir.is_dir():
-        raise ValueError(f"{input_dir} is not a directory")
     if output_file.suffix.lower() not in {".docx", ".pptx", ".xlsx"}:
         raise ValueError(f"{output_file} must be a .docx, .pptx, or .xlsx file")
 
-    # Work in temporary directory to avoid modifying original
-    with tempfile.TemporaryDirectory() as temp_dir:
-        temp_content_dir = Path(temp_dir) / "content"
-        shutil.copytree(input_dir, temp_content_dir)
-
-        # Process XML files to remove pretty-printing whitespace
-        for pattern in ["*.xml", "*.rels"]:
-            for xml_file in temp_content_dir.rglob(pattern):
-                condense_xml(xml_file)
-
-        # Create final Office file as zip archive
-        output_file.parent.mkdir(parents=True, exist_ok=True)
-        with zipfile.ZipFile(output_file, "w", zipfile.ZIP_DEFLATED) as zf:
-            for f in temp_content_dir.rglob("*"):
-                if f.is_file():
-                    zf.write(f, f.relative_to(temp_content_dir))
-
-        # Validate if requested
-        if validate:
-            if not validate_document(output_file):
-                output_file.unlink()  # Delete the corrupt file
-                return False
+    if validate and not check_structure(input_dir):
+        return False
+
+    manifest_path = _manifest_path(output_file)
+    files = _list_files(input_dir, deterministic)
+
+    entries = {}
+    reused = {}
+    previous = None
+    if incremental:
+        old_entries = _read_manifest(
+            manifest_path, input_dir, output_file, compresslevel
+        )
+        entries, unchanged = _scan_files(files, input_dir, old_entries)
+        if unchanged:
+            previous = zipfile.ZipFile(output_file)
+            reused = {
+                name: previous.NameToInfo[name]
+                for name in unchanged
+                if name in previous.NameToInfo
+                and previous.NameToInfo[name].compress_type == compress_type_for(name)
+            }
+
+    # An incremental pack reads the previous archive, so it writes a sibling file
+    # and renames it
+    output_file.parent.mkdir(parents=True, exist_ok=True)
+    target = output_file
+    if incremental:
+        fd, temp_path = tempfile.mkstemp(
+            prefix=f".{output_file.name}.", dir=output_file.parent
+        )
+        os.close(fd)
+        target = Path(temp_path)
+    try:
+        with zipfile.ZipFile(target, "w", zipfile.ZIP_DEFLATED) as zf:
+            _write_members(
+                zf, files, input_dir, jobs, compresslevel, deterministic, previous, reused
+            )
+        if target != output_file:
+            os.chmod(target, _new_file_mode(output_file))
+            os.replace(target, output_file)
+    finally:
+        if previous is not None:
+            previous.close()
+        if target != output_file:
+            target.unlink(missing_ok=True)
+
+    if incremental:
+        _write_manifest(manifest_path, input_dir, output_file, compresslevel, entries)
+
+    # The structure was checked before packing; soffice needs the packed file
+    if validate and deep:
+        if not _convert_with_soffice(output_file):
+            output_file.unlink()  # Delete the corrupt file
+            return False
 
     return True
 
 
-def validate_document(doc_path):
-    """Validate document by converting to HTML with soffice."""
+def pack_to_stream(
+    input_dir, fileobj, jobs=None, compresslevel=None, deterministic=False
+):
+    """Pack a directory into an Office file written to a binary file object.
+
+    Nothing is written to disk: the archive goes straight to fileobj, which need
+    not be seekable (an HTTP response or an upload stream works). Validate the
+    input with check_structure() or the result with validate_document() if
+    needed.
+
+    Args:
+        input_dir: Path to unpacked Office document directory
+        fileobj: Binary file object opened for writing; left open
+        jobs, compresslevel, deterministic: As for pack_document()
+
+    Raises:
+        ValueError: If input_dir is not a directory
+    """
+    input_dir = _check_input_dir(input_dir)
+    files = _list_files(input_dir, deterministic)
+    with zipfile.ZipFile(fileobj, "w", zipfile.ZIP_DEFLATED) as zf:
+        _write_members(zf, files, input_dir, jobs, compresslevel, deterministic)
+
+
+def pack_to_bytes(input_dir, jobs=None, compresslevel=None, deterministic=False):
+    """Pack a directory into an Office file held in memory.
+
+    Args:
+        input_dir: Path to unpacked Office document directory
+        jobs, compresslevel, deterministic: As for pack_document()
+
+    Returns:
+        bytes: The .docx/.pptx/.xlsx archive
+
+    Example:
+        content = pack_to_bytes("unpacked", deterministic=True)
+        if validate_document(content):
+            bucket.put_object(Key="report.docx", Body=content)
+    """
+    buffer = io.BytesIO()
+    pack_to_stream(input_dir, buffer, jobs, compresslevel, deterministic)
+    return buffer.getvalue()
+
+
+def check_structure(input_dir):
+    """Check an unpacked Office document for the usual causes of corruption.
+
+    Pure Python and fast (no soffice): runs the well-formedness, unique ID,
+    relationship target, relationship ID and content type checks of the
+    validation package, each of which prints the problems it finds. Files that no
+    relationship points to are untidy rather than corrupt, so they are only
+    reported as a warning.
+
+    Args:
+        input_dir: Path to unpacked Office document directory
+
+    Returns:
+        bool: True if all checks pass
+    """
+    try:
+        from .validation.base import BaseSchemaValidator
+    except ImportError:  # Run as a script from ooxml/scripts
+        from validation.base import BaseSchemaValidator
+
+    validator = BaseSchemaValidator(input_dir)
+    # Everything else parses the XML, so stop at the first malformed part
+    if not validator.validate_xml():
+        return False
+    checks = [
+        validator.validate_unique_ids,
+        lambda: validator.validate_file_references(unreferenced_is_error=False),
+        validator.validate_all_relationship_ids,
+        validator.validate_content_types,
+    ]
+    return all([check() for check in checks])
+
+
+def validate_document(doc, deep=False):
+    """Validate a packed Office document.
+
+    The archive is unpacked to a temporary directory and run through
+    check_structure(). Only if that passes and deep is True is the document also
+    converted to HTML with soffice, which takes seconds rather than milliseconds.
+
+    Args:
+        doc: Path of the Office file, its bytes, or a binary file object holding it
+            (read whole from the start when seekable)
+        deep: If True, also convert the document with soffice (default: False)
+
+    Returns:
+        bool: True if the document passes (soffice being unavailable counts as a
+            pass)
+    """
+    if isinstance(doc, (str, Path)):
+        doc_path = Path(doc)
+        content = None
+    else:
+        content = _read_document(doc)
+        doc_path = None
+
+    with tempfile.TemporaryDirectory() as temp_dir:
+        unpacked_dir = Path(temp_dir) / "unpacked"
+        try:
+            with zipfile.ZipFile(doc_path or io.BytesIO(content)) as zf:
+                zf.extractall(unpacked_dir)
+        except zipfile.BadZipFile as e:
+            print(f"Validation error: {e}", file=sys.stderr)
+            return False
+        if not check_structure(unpacked_dir):
+            return False
+        if not deep:
+            return True
+        if doc_path is None:
+            # soffice only reads files
+            doc_path = Path(temp_dir) / f"document{_office_suffix(content)}"
+            doc_path.write_bytes(content)
+        return _convert_with_soffice(doc_path)
+
+
+def _convert_with_soffice(doc_path):
     # Determine the correct filter based on file extension
     match doc_path.suffix.lower():
         case ".docx":
@@ -111,7 +396,7 @@ def validate_document(doc_path):
                     str(doc_path),
                 ],
                 capture_output=True,
-                timeout=10,
+                timeout=_soffice_timeout(doc_path),
                 text=True,
             )
             if not (Path(temp_dir) / f"{doc_path.stem}.html").exists():
@@ -130,10 +415,403 @@ def validate_document(doc_path):
             return False
 
 
+def _soffice_timeout(doc_path):
+    """Seconds to allow soffice for a document, growing with its size."""
+    return _SOFFICE_TIMEOUT + _SOFFICE_TIMEOUT_PER_MB * doc_path.stat().st_size / (
+        1 << 20
+    )
+
+
+def _read_document(doc):
+    """The bytes of a document given as bytes or a binary file object."""
+    if isinstance(doc, (bytes, bytearray, memoryview)):
+        return bytes(doc)
+    if doc.seekable():
+        position = doc.tell()
+        doc.seek(0)
+        content = doc.read()
+        doc.seek(position)
+        return content
+    return doc.read()
+
+
+def _office_suffix(content):
+    """File extension matching the main part of an Office archive."""
+    try:
+        with zipfile.ZipFile(io.BytesIO(content)) as zf:
+            names = set(zf.namelist())
+    except zipfile.BadZipFile:
+        return ".docx"  # soffice reports the error
+    if "ppt/presentation.xml" in names:
+        return ".pptx"
+    if "xl/workbook.xml" in names:
+        return ".xlsx"
+    return ".docx"
+
+
+def _check_input_dir(input_dir):
+    input_dir = Path(input_dir)
+    if not input_dir.is_dir():
+        raise ValueError(f"{input_dir} is not a directory")
+    return input_dir
+
+
+def _list_files(input_dir, deterministic):
+    """Files to pack, in archive order."""
+    files = [f for f in input_dir.rglob("*") if f.is_file()]
+    if deterministic:
+        files.sort(key=lambda f: _member_sort_key(f.relative_to(input_dir).as_posix()))
+    return files
+
+
+def _write_members(
+    zf, files, input_dir, jobs, compresslevel, deterministic, previous=None, reused=None
+):
+    """Add the files to an archive opened for writing.
+
+    Members go straight from the input directory into the archive: XML parts are
+    condensed in memory on the way, and every member is compressed by a thread
+    pool (zlib releases the GIL) and appended in input order.
+    """
+    reused = reused or {}
+    xml_files = [
+        f
+        for f in files
+        if f.name.endswith((".xml", ".rels"))
+        and f.relative_to(input_dir).as_posix() not in reused
+    ]
+    for info, data in _compressed_members(
+        files, xml_files, input_dir, jobs, compresslevel, deterministic, previous, reused
+    ):
+        _append_raw_member(zf, info, data)
+
+
+def copy_member_raw(source_zip, target_zip, info):
+    """Copy a member between open zip files without decompressing it.
+
+    The compressed bytes are spliced into the target archive as-is, so unchanged
+    parts (media in particular) skip a full inflate/deflate round trip.
+
+    Args:
+        source_zip: zipfile.ZipFile opened for reading
+        target_zip: zipfile.ZipFile opened for writing
+        info: zipfile.ZipInfo of the member in source_zip
+    """
+    try:
+        data = _read_raw_member(source_zip, info)
+    except AttributeError:
+        # zipfile no longer has the internals this relies on
+        target_zip.writestr(copy.copy(info), source_zip.read(info))
+        return
+    _append_raw_member(target_zip, copy.copy(info), data)
+
+
+def _read_raw_member(source_zip, info):
+    """Read a member's compressed bytes, as stored in the archive.
+
+    Relies on zipfile internals; raises AttributeError if they are missing.
+    """
+    source_zip.fp.seek(info.header_offset)
+    header = struct.unpack(
+        zipfile.structFileHeader, source_zip.fp.read(zipfile.sizeFileHeader)
+    )
+    source_zip.fp.seek(
+        header[zipfile._FH_FILENAME_LENGTH] + header[zipfile._FH_EXTRA_FIELD_LENGTH],
+        1,
+    )
+    return source_zip.fp.read(info.compress_size)
+
+
+def _append_raw_member(target_zip, new_info, data):
+    """Append a member whose compressed data, CRC and sizes are already known.
+
+    The data is spliced in through zipfile internals. If those are missing (a
+    different Python version), it is decompressed and written with writestr(),
+    which gives the same member (deflated at zlib's default level).
+
+    Args:
+        target_zip: zipfile.ZipFile opened for writing
+        new_info: zipfile.ZipInfo with compress_type, CRC, file_size and
+            compress_size set; it is added to the archive's directory
+        data: The member's data, compressed with new_info.compress_type
+    """
+    try:
+        # Look everything up before writing, so a fallback never follows a
+        # partial write
+        writecheck = target_zip._writecheck
+        seekable = target_zip._seekable
+        start_dir = target_zip.start_dir
+    except AttributeError:
+        if new_info.compress_type == zipfile.ZIP_DEFLATED:
+            data = zlib.decompress(data, -15)
+        target_zip.writestr(new_info, data)
+        return
+
+    # Sizes and CRC are known up front, so no trailing data descriptor is needed
+    new_info.flag_bits &= ~0x08
+    writecheck(new_info)
+    target_zip._didModify = True
+    if seekable:
+        target_zip.fp.seek(start_dir)
+    new_info.header_offset = target_zip.fp.tell()
+    target_zip.fp.write(new_info.FileHeader())
+    target_zip.fp.write(data)
+    target_zip.start_dir = target_zip.fp.tell()
+    target_zip.filelist.append(new_info)
+    target_zip.NameToInfo[new_info.filename] = new_info
+
+
+def compress_type_for(name):
+    """Zip compression method for a part: stored if already compressed, else deflated.
+
+    Args:
+        name: Part name or path
+
+    Returns:
+        int: zipfile.ZIP_STORED or zipfile.ZIP_DEFLATED
+    """
+    if Path(name).suffix.lower() in STORED_EXTENSIONS:
+        return zipfile.ZIP_STORED
+    return zipfile.ZIP_DEFLATED
+
+
+def _manifest_path(output_file):
+    """Where the incremental manifest for an output archive is kept."""
+    return output_file.with_name(f".{output_file.name}{MANIFEST_SUFFIX}")
+
+
+def _read_manifest(manifest_path, input_dir, output_file, compresslevel):
+    """Load the members recorded by the previous incremental pack.
+
+    Returns:
+        dict: name -> {"size", "mtime_ns", "sha256"}; empty if there is no manifest
+        or it does not describe packing input_dir into output_file as it is now
+    """
+    try:
+        manifest = json.loads(manifest_path.read_text(encoding="utf-8"))
+        archive = manifest["archive"]
+        stats = output_file.stat()
+        if (
+            manifest["version"] == _MANIFEST_VERSION
+            and manifest["compresslevel"] == compresslevel
+            and manifest["input"] == str(input_dir.resolve())
+            and archive["path"] == str(output_file.resolve())
+            and archive["size"] == stats.st_size
+            and archive["mtime_ns"] == stats.st_mtime_ns
+        ):
+            return manifest["members"]
+    except (OSError, ValueError, KeyError, TypeError):
+        pass
+    return {}
+
+
+def _scan_files(files, input_dir, old_entries):
+    """Fingerprint the input files and find those unchanged since the manifest.
+
+    A file whose size and mtime match its entry keeps the recorded hash; any other
+    file is hashed, so touched but identical files are still reused.
+
+    Returns:
+        tuple: (entries for the new manifest, set of unchanged member names)
+    """
+    entries = {}
+    unchanged = set()
+    for f in files:
+        name = f.relative_to(input_dir).as_posix()
+        stats = f.stat()
+        old = old_entries.get(name)
+        if old and old["size"] == stats.st_size and old["mtime_ns"] == stats.st_mtime_ns:
+            digest = old["sha256"]
+        else:
+            digest = _file_digest(f)
+        entries[name] = {
+            "size": stats.st_size,
+            "mtime_ns": stats.st_mtime_ns,
+            "sha256": digest,
+        }
+        if old and old["sha256"] == digest:
+            unchanged.add(name)
+    return entries, unchanged
+
+
+def _write_manifest(manifest_path, input_dir, output_file, compresslevel, entries):
+    """Record the input files packed into output_file for the next incremental pack."""
+    stats = output_file.stat()
+    manifest = {
+        "version": _MANIFEST_VERSION,
+        "compresslevel": compresslevel,
+        "input": str(input_dir.resolve()),
+        "archive": {
+            "path": str(output_file.resolve()),
+            "size": stats.st_size,
+            "mtime_ns": stats.st_mtime_ns,
+        },
+        "members": entries,
+    }
+    manifest_path.write_text(json.dumps(manifest, indent=1), encoding="utf-8")
+
+
+def _file_digest(path):
+    sha256 = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(1 << 20), b""):
+            sha256.update(chunk)
+    return sha256.hexdigest()
+
+
+def _new_file_mode(path):
+    """Permissions an archive written to path would get by opening it for writing."""
+    try:
+        return stat.S_IMODE(path.stat().st_mode)
+    except FileNotFoundError:
+        return 0o666 & ~_UMASK
+
+
+def _member_sort_key(name):
+    """Order of members in a deterministic archive: content types first, then by name."""
+    return (name != "[Content_Types].xml", name)
+
+
+def _compressed_members(
+    files,
+    xml_files,
+    input_dir,
+    jobs,
+    compresslevel,
+    deterministic,
+    previous=None,
+    reused=None,
+):
+    """Yield (ZipInfo, compressed bytes) for each file, in order.
+
+    Compression runs in a thread pool a bounded number of members ahead of the
+    consumer, so memory holds only that window of members. Members named in reused
+    (name -> ZipInfo in the previous archive) take their compressed data from there.
+    """
+    condensed = _condensed_parts(xml_files, jobs)
+    jobs = jobs or os.cpu_count() or 1
+    with ThreadPoolExecutor(max_workers=jobs) as executor:
+        pending = collections.deque()
+        for f in files:
+            if deterministic:
+                info = zipfile.ZipInfo(
+                    f.relative_to(input_dir).as_posix(), _DETERMINISTIC_DATE_TIME
+                )
+                info.create_system = 3  # Unix, so external_attr holds the mode
+                info.external_attr = _DETERMINISTIC_EXTERNAL_ATTR
+            else:
+                info = zipfile.ZipInfo.from_file(f, f.relative_to(input_dir))
+            old_info = reused.get(info.filename) if reused else None
+            if old_info is not None:
+                info.compress_type = old_info.compress_type
+                info.CRC = old_info.CRC
+                info.file_size = old_info.file_size
+                info.compress_size = old_info.compress_size
+                future = Future()
+                future.set_result((info, _read_raw_member(previous, old_info)))
+                pending.append(future)
+            else:
+                if f.name.endswith((".xml", ".rels")):
+                    info.compress_type = zipfile.ZIP_DEFLATED
+                    content = next(condensed)
+                else:
+                    info.compress_type = compress_type_for(f.name)
+                    content = None
+                pending.append(
+                    executor.submit(_compress_member, info, f, content, compresslevel)
+                )
+            # Reused members count towards the window too
+            if len(pending) >= 2 * jobs:
+                yield pending.popleft().result()
+        while pending:
+            yield pending.popleft().result()
+
+
+def _compress_member(info, path, content, compresslevel):
+    """Compress one member's content (read from path if None) for _append_raw_member."""
+    if content is None:
+        content = Path(path).read_bytes()
+    info.file_size = len(content)
+    info.CRC = zlib.crc32(content)
+    if info.compress_type == zipfile.ZIP_DEFLATED:
+        level = zlib.Z_DEFAULT_COMPRESSION if compresslevel is None else compresslevel
+        compressor = zlib.compressobj(level, zlib.DEFLATED, -15)
+        content = compressor.compress(content) + compressor.flush()
+    info.compress_size = len(content)
+    return info, content
+
+
+def _condensed_parts(xml_files, jobs):
+    """Yield the condensed content of each XML file in order.
+
+    The files are condensed across a process pool when it pays off (see
+    pack_document()); the output is the same either way.
+    """
+    if jobs is None:
+        total_size = sum(xml_file.stat().st_size for xml_file in xml_files)
+        jobs = (os.cpu_count() or 1) if total_size >= _PARALLEL_MIN_BYTES else 1
+    jobs = max(1, min(jobs, len(xml_files)))
+    if jobs == 1:
+        for xml_file in xml_files:
+            yield condense_xml_bytes(xml_file.read_bytes())
+        return
+
+    with ProcessPoolExecutor(max_workers=jobs) as executor:
+        yield from executor.map(_condense_file, xml_files)
+
+
+def _condense_file(xml_file):
+    return condense_xml_bytes(Path(xml_file).read_bytes())
+
+
 def condense_xml(xml_file):
-    """Strip unnecessary whitespace and remove comments."""
-    with open(xml_file, "r", encoding="utf-8") as f:
-        dom = defusedxml.minidom.parse(f)
+    """Strip unnecessary whitespace and remove comments.
+
+    The part is streamed through the condenser into a sibling file that then
+    replaces it, so memory use does not grow with the size of the part.
+    """
+    xml_file = Path(xml_file)
+    fd, temp_path = tempfile.mkstemp(prefix=f".{xml_file.name}.", dir=xml_file.parent)
+    try:
+        with open(xml_file, "rb") as source, os.fdopen(fd, "wb") as target:
+            _condense_stream(source.read, target.write)
+    except _DoctypeFound:
+        Path(temp_path).unlink()
+        xml_file.write_bytes(_condense_dom(xml_file.read_bytes()))
+        return
+    except BaseException:
+        Path(temp_path).unlink(missing_ok=True)
+        raise
+    # mkstemp creates files as 0600; keep the permissions of the part
+    os.chmod(temp_path, stat.S_IMODE(os.stat(xml_file).st_mode))
+    os.replace(temp_path, xml_file)
+
+
+def condense_xml_bytes(content):
+    """Strip unnecessary whitespace and remove comments from XML bytes.
+
+    Whitespace-only text and comments are dropped except inside *:t elements. The
+    result is byte-for-byte what serializing the condensed minidom tree with
+    toxml(encoding="UTF-8") gives, without building the tree.
+
+    Args:
+        content: XML document as bytes
+
+    Returns:
+        bytes: Condensed XML encoded as UTF-8
+    """
+    chunks = []
+    source = io.BytesIO(content)
+    try:
+        _condense_stream(source.read, chunks.append)
+    except _DoctypeFound:
+        return _condense_dom(content)
+    return b"".join(chunks)
+
+
+def _condense_dom(content):
+    """Condense XML through a minidom tree (parts with a DOCTYPE)."""
+    dom = defusedxml.minidom.parseString(content)
 
     # Process each element to remove whitespace and comments
     for element in dom.getElementsByTagName("*"):
@@ -150,9 +828,181 @@ def condense_xml(xml_file):
             ) or child.nodeType == child.COMMENT_NODE:
                 element.removeChild(child)
 
-    # Write back the condensed XML
-    with open(xml_file, "wb") as f:
-        f.write(dom.toxml(encoding="UTF-8"))
+    return dom.toxml(encoding="UTF-8")
+
+
+class _DoctypeFound(Exception):
+    """Raised by the streaming condenser; DTDs are left to defusedxml's minidom."""
+
+
+def _minidom_escapes():
+    """The references minidom writes for special characters in text and attributes.
+
+    minidom's escaping differs between Python versions, so it is probed once.
+
+    Returns:
+        tuple: (text, attribute) lists of (character, reference) pairs, '&' first
+    """
+    dom = defusedxml.minidom.parseString(
+        '<a b="&quot;|&gt;|&#9;|&#10;|&#13;">&quot;|&gt;|&#9;|&#10;|&#13;</a>'
+    )
+    xml = dom.documentElement.toxml()
+    attribute = xml[len('<a b="') : xml.index('">')]
+    text = xml[xml.index('">') + 2 : -len("</a>")]
+    escapes = []
+    for written in (text, attribute):
+        pairs = [("&", "&amp;"), ("<", "&lt;")]
+        for char, reference in zip('">\t\n\r', written.split("|")):
+            if reference != char:
+                pairs.append((char, reference))
+        escapes.append(pairs)
+    return tuple(escapes)
+
+
+def _escaper(pairs):
+    def escape(data):
+        for char, reference in pairs:
+            if char in data:
+                data = data.replace(char, reference)
+        return data
+
+    return escape
+
+
+_escape_text, _escape_attribute = map(_escaper, _minidom_escapes())
+
+# Read size, and pending output after which it is encoded and written
+_STREAM_CHUNK_SIZE = 1 << 16
+_STREAM_FLUSH_PIECES = 1 << 12
+
+
+def _condense_stream(read, write):
+    """Condense XML from a read callable into a write callable, event by event.
+
+    Only the open elements and the current run of text are held in memory.
+
+    Raises:
+        _DoctypeFound: If the document has a DOCTYPE (nothing has been written yet
+            except possibly the XML declaration)
+        xml.parsers.expat.ExpatError: If the XML is malformed
+    """
+    parser = xml.parsers.expat.ParserCreate(namespace_separator=" ")
+    parser.namespace_prefixes = True
+    parser.ordered_attributes = True
+    parser.buffer_text = True
+    parser.buffer_size = _STREAM_CHUNK_SIZE
+
+    out = ['<?xml version="1.0" encoding="UTF-8"?>']
+    text = []
+    cdata = []
+    stack = []
+    prefixes = []
+    names = {}
+    # Whether the last start tag still lacks its closing '>' (or '/>')
+    state = {"open": False}
+
+    def qname(name):
+        # Expat reports "uri local prefix"; minidom writes prefix:local
+        try:
+            return names[name]
+        except KeyError:
+            parts = name.split(" ")
+            if len(parts) == 3:
+                names[name] = f"{parts[2]}:{parts[1]}"
+            else:
+                names[name] = parts[-1]
+            return names[name]
+
+    def flush_text():
+        data = "".join(text)
+        text.clear()
+        if data and (data.strip() or (stack and stack[-1].endswith(":t"))):
+            open_content()
+            out.append(_escape_text(data))
+
+    def open_content():
+        if state["open"]:
+            out.append(">")
+            state["open"] = False
+
+    def start_namespace(prefix, uri):
+        prefixes.append((prefix, uri))
+
+    def start_element(name, attributes):
+        if text:
+            flush_text()
+        open_content()
+        tag = qname(name)
+        out.append("<" + tag)
+        # minidom puts namespace declarations before the other attributes
+        for prefix, uri in prefixes:
+            name = f"xmlns:{prefix}" if prefix else "xmlns"
+            out.append(f' {name}="{_escape_attribute(uri)}"')
+        prefixes.clear()
+        for i in range(0, len(attributes), 2):
+            out.append(f' {qname(attributes[i])}="{_escape_attribute(attributes[i + 1])}"')
+        stack.append(tag)
+        state["open"] = True
+
+    def end_element(name):
+        if text:
+            flush_text()
+        tag = stack.pop()
+        if state["open"]:
+            out.append("/>")
+            state["open"] = False
+        else:
+            out.append(f"</{tag}>")
+        if len(out) >= _STREAM_FLUSH_PIECES:
+            write("".join(out).encode("utf-8"))
+            out.clear()
+
+    def comment(data):
+        if text:
+            flush_text()
+        if not stack or stack[-1].endswith(":t"):
+            open_content()
+            out.append(f"<!--{data}-->")
+
+    def processing_instruction(target, data):
+        if text:
+            flush_text()
+        open_content()
+        out.append(f"<?{target} {data}?>")
+
+    def start_cdata():
+        if text:
+            flush_text()
+        parser.CharacterDataHandler = cdata.append
+
+    def end_cdata():
+        data = "".join(cdata)
+        cdata.clear()
+        if data:
+            open_content()
+            out.append(f"<![CDATA[{data}]]>")
+        parser.CharacterDataHandler = text.append
+
+    def doctype(*args):
+        raise _DoctypeFound()
+
+    parser.StartNamespaceDeclHandler = start_namespace
+    parser.StartElementHandler = start_element
+    parser.EndElementHandler = end_element
+    parser.CharacterDataHandler = text.append
+    parser.CommentHandler = comment
+    parser.ProcessingInstructionHandler = processing_instruction
+    parser.StartCdataSectionHandler = start_cdata
+    parser.EndCdataSectionHandler = end_cdata
+    parser.StartDoctypeDeclHandler = doctype
+
+    while True:
+        chunk = read(_STREAM_CHUNK_SIZE)
+        if not chunk:
+            break
+        parser.Parse(chunk, False)
+    parser.Parse(b"", True)
+    write("".join(out).encode("utf-8"))
 
 
 if __name__ == "__main__":
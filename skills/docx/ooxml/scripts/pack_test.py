@@ -0,0 +1,517 @@
+import contextlib
+import io
+import os
+import sys
+import tempfile
+import unittest
+import zipfile
+from pathlib import Path
+from unittest import mock
+from xml.parsers.expat import ExpatError
+
+import pack
+from pack import (
+    _condense_dom,
+    check_structure,
+    condense_xml,
+    condense_xml_bytes,
+    copy_member_raw,
+    pack_document,
+    pack_to_bytes,
+    pack_to_stream,
+)
+from unpack import unpack_document
+
+W_NAMESPACE = "http://schemas.openxmlformats.org/wordprocessingml/2006/main"
+RELATIONSHIPS = "http://schemas.openxmlformats.org/officeDocument/2006/relationships"
+PACKAGE_RELATIONSHIPS = "http://schemas.openxmlformats.org/package/2006/relationships"
+
+
+def write_package(directory, body="<w:p/>"):
+    """Write a minimal unpacked .docx whose w:body holds the given XML."""
+    parts = {
+        "[Content_Types].xml": (
+            '<Types xmlns="http://schemas.openxmlformats.org/package/2006/content-types">'
+            '<Default Extension="rels" ContentType="application/vnd.openxmlformats-package.relationships+xml"/>'
+            '<Default Extension="xml" ContentType="application/xml"/>'
+            '<Default Extension="png" ContentType="image/png"/>'
+            '<Override PartName="/word/document.xml" ContentType="application/vnd.openxmlformats-officedocument.wordprocessingml.document.main+xml"/>'
+            "</Types>"
+        ),
+        "_rels/.rels": (
+            f'<Relationships xmlns="{PACKAGE_RELATIONSHIPS}">'
+            f'<Relationship Id="rId1" Type="{RELATIONSHIPS}/officeDocument" Target="word/document.xml"/>'
+            "</Relationships>"
+        ),
+        "word/document.xml": (
+            f'<w:document xmlns:w="{W_NAMESPACE}"><w:body>{body}</w:body></w:document>'
+        ),
+    }
+    directory = Path(directory)
+    for name, content in parts.items():
+        path = directory / name
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_text(content, encoding="utf-8")
+    return directory
+
+
+# Currently this is not run automatically in CI; it's just for documentation and manual checking.
+class TestCondenseXml(unittest.TestCase):
+    """The streaming condenser must match the minidom condenser byte for byte."""
+
+    def assertSameAsDom(self, content):
+        self.assertEqual(condense_xml_bytes(content), _condense_dom(content))
+
+    def test_whitespace_between_elements(self):
+        self.assertSameAsDom(b"<a>\n  <b/>\n  <c>\n    <d/>\n  </c>\n</a>")
+
+    def test_whitespace_only_elements_become_empty(self):
+        self.assertSameAsDom(b"<a><b>  </b><c>\n</c></a>")
+
+    def test_whitespace_kept_in_t_elements(self):
+        self.assertSameAsDom(
+            b'<w:p xmlns:w="urn:w"><w:r><w:t xml:space="preserve">  </w:t>'
+            b"<w:t> x </w:t></w:r><t>  </t></w:p>"
+        )
+
+    def test_comments_removed_except_in_t_elements(self):
+        self.assertSameAsDom(
+            b'<!--before--><w:p xmlns:w="urn:w"><!-- a --><w:t> <!--b--> x</w:t>'
+            b"</w:p><!--after-->"
+        )
+
+    def test_text_split_by_comment(self):
+        self.assertSameAsDom(b"<a>x<!--c-->y  <!--c-->  </a>")
+
+    def test_namespace_declarations_written_first(self):
+        self.assertSameAsDom(
+            b'<w:document mc:Ignorable="w14" xmlns:w="urn:w" xmlns:mc="urn:mc" '
+            b'xmlns="urn:default"><w:body w:a="1" b="2" xmlns:w14="urn:w14"/>'
+            b"</w:document>"
+        )
+
+    def test_escaping(self):
+        self.assertSameAsDom(
+            b'<a b="&quot;&amp;&lt;&gt;&#9;&#10;&#13;\'">&quot;&amp;&lt;&gt;&#13;\'</a>'
+        )
+
+    def test_processing_instructions_and_cdata(self):
+        self.assertSameAsDom(
+            b"<?xml-stylesheet href='s'?><a><?pi?><?pi data?>"
+            b"<b><![CDATA[ ]]></b><c><![CDATA[]]></c> <![CDATA[<x>]]> </a>"
+        )
+
+    def test_declarations_and_encodings(self):
+        self.assertSameAsDom(b'<?xml version="1.0" standalone="yes"?>\n<a/>')
+        self.assertSameAsDom(b'<?xml version="1.0" encoding="ascii"?><a>&#233;</a>')
+        self.assertSameAsDom(b'<?xml version="1.0" encoding="ISO-8859-1"?><a>\xe9</a>')
+        self.assertSameAsDom("<a b='é'>— \U0001d11e</a>".encode("utf-16"))
+
+    def test_non_ascii_whitespace(self):
+        # str.strip() treats a no-break space as whitespace
+        self.assertSameAsDom("<a> <b> x</b></a>".encode("utf-8"))
+
+    def test_doctype_falls_back_to_dom(self):
+        self.assertSameAsDom(b"<!DOCTYPE a><a> <b/> </a>")
+
+    def test_large_part_spanning_chunks(self):
+        paragraph = (
+            b'\n    <w:p>\n      <w:r>\n        <w:t xml:space="preserve"> text </w:t>'
+            b"\n      </w:r>\n    </w:p>"
+        )
+        self.assertSameAsDom(
+            b'<?xml version="1.0" encoding="ascii"?>\n<w:document xmlns:w="urn:w">'
+            b"\n  <w:body>" + paragraph * 20000 + b"\n  </w:body>\n</w:document>\n"
+        )
+
+    def test_malformed_xml_raises(self):
+        with self.assertRaises(ExpatError):
+            condense_xml_bytes(b"<a><b></a>")
+
+    def test_condense_file_in_place(self):
+        content = b'<?xml version="1.0"?>\n<a>\n  <b> x </b>\n  <!-- c -->\n</a>\n'
+        with tempfile.TemporaryDirectory() as temp_dir:
+            xml_file = Path(temp_dir) / "part.xml"
+            xml_file.write_bytes(content)
+            condense_xml(xml_file)
+            self.assertEqual(xml_file.read_bytes(), _condense_dom(content))
+            self.assertEqual(list(Path(temp_dir).iterdir()), [xml_file])
+
+    def test_office_document(self):
+        """Compare every part of a .docx given on the command line (see below)."""
+        if not DOCUMENTS:
+            self.skipTest("no documents given")
+        for document in DOCUMENTS:
+            with zipfile.ZipFile(document) as zf:
+                for name in zf.namelist():
+                    if name.endswith((".xml", ".rels")):
+                        with self.subTest(document=document, part=name):
+                            self.assertSameAsDom(zf.read(name))
+
+
+class PublicZipFile:
+    """A ZipFile seen only through its public reading and writing methods."""
+
+    def __init__(self, zf):
+        self._zf = zf
+
+    def read(self, name):
+        return self._zf.read(name)
+
+    def writestr(self, *args, **kwargs):
+        return self._zf.writestr(*args, **kwargs)
+
+
+class TestCopyMemberRaw(unittest.TestCase):
+    """Members copied between archives keep their content and compression."""
+
+    def setUp(self):
+        self.members = {
+            "word/document.xml": b"<w:document>" + b"<w:p/>" * 1000 + b"</w:document>",
+            "word/media/image1.png": os.urandom(5000),
+        }
+        buffer = io.BytesIO()
+        with zipfile.ZipFile(buffer, "w", zipfile.ZIP_DEFLATED) as zf:
+            zf.writestr("word/document.xml", self.members["word/document.xml"])
+            zf.writestr(
+                "word/media/image1.png",
+                self.members["word/media/image1.png"],
+                compress_type=zipfile.ZIP_STORED,
+            )
+        self.source = zipfile.ZipFile(buffer)
+        self.addCleanup(self.source.close)
+
+    def copy_all(self, wrap=lambda zf: zf):
+        buffer = io.BytesIO()
+        with zipfile.ZipFile(buffer, "w", zipfile.ZIP_DEFLATED) as target:
+            for info in self.source.infolist():
+                copy_member_raw(wrap(self.source), wrap(target), info)
+        with zipfile.ZipFile(buffer) as zf:
+            self.assertIsNone(zf.testzip())
+            for name, content in self.members.items():
+                self.assertEqual(zf.read(name), content)
+                self.assertEqual(
+                    zf.getinfo(name).compress_type,
+                    self.source.getinfo(name).compress_type,
+                )
+
+    def test_copy(self):
+        self.copy_all()
+
+    def test_copy_without_zipfile_internals(self):
+        self.copy_all(PublicZipFile)
+
+    def test_copy_to_archive_without_internals(self):
+        buffer = io.BytesIO()
+        with zipfile.ZipFile(buffer, "w", zipfile.ZIP_DEFLATED) as target:
+            for info in self.source.infolist():
+                copy_member_raw(self.source, PublicZipFile(target), info)
+        with zipfile.ZipFile(buffer) as zf:
+            for name, content in self.members.items():
+                self.assertEqual(zf.read(name), content)
+
+
+class TestIncrementalPack(unittest.TestCase):
+    def setUp(self):
+        temp_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(temp_dir.cleanup)
+        self.temp_path = Path(temp_dir.name)
+        self.input_dir = self.temp_path / "unpacked"
+        (self.input_dir / "word/media").mkdir(parents=True)
+        (self.input_dir / "[Content_Types].xml").write_bytes(b"<Types/>")
+        (self.input_dir / "word/document.xml").write_bytes(b"<document>\n</document>")
+        for i in range(20):
+            (self.input_dir / f"word/media/image{i}.png").write_bytes(os.urandom(1000))
+        self.output = self.temp_path / "out.docx"
+
+    def members(self, path):
+        with zipfile.ZipFile(path) as zf:
+            return {info.filename: zf.read(info) for info in zf.infolist()}
+
+    def test_repack_matches_full_pack(self):
+        pack_document(self.input_dir, self.output, incremental=True)
+        (self.input_dir / "word/document.xml").write_bytes(b"<document/>")
+        pack_document(self.input_dir, self.output, incremental=True)
+        pack_document(self.input_dir, self.temp_path / "full.docx")
+        self.assertEqual(
+            self.members(self.output), self.members(self.temp_path / "full.docx")
+        )
+
+    def test_manifest_is_kept_next_to_the_output(self):
+        files = sorted(self.input_dir.rglob("*"))
+        pack_document(self.input_dir, self.output, incremental=True)
+        self.assertEqual(sorted(self.input_dir.rglob("*")), files)
+        self.assertTrue(pack._manifest_path(self.output).is_file())
+
+    def test_reused_members_stay_within_the_window(self):
+        pack_document(self.input_dir, self.output, incremental=True)
+        reads = []
+        read_raw_member = pack._read_raw_member
+
+        def counting_read(source_zip, info):
+            reads.append(info.filename)
+            return read_raw_member(source_zip, info)
+
+        with zipfile.ZipFile(self.output) as previous, mock.patch.object(
+            pack, "_read_raw_member", counting_read
+        ):
+            files = pack._list_files(self.input_dir, deterministic=False)
+            reused = {info.filename: info for info in previous.infolist()}
+            members = pack._compressed_members(
+                files, [], self.input_dir, 1, None, False, previous, reused
+            )
+            next(members)
+            self.assertLessEqual(len(reads), 2)
+            members.close()
+
+
+class TestPackDocument(unittest.TestCase):
+    def setUp(self):
+        temp_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(temp_dir.cleanup)
+        self.temp_path = Path(temp_dir.name)
+        body = "\n".join(f"<w:p>\n  <w:t>Text {i}</w:t>\n</w:p>" for i in range(50))
+        self.input_dir = write_package(self.temp_path / "unpacked", body)
+        (self.input_dir / "word/media").mkdir()
+        self.image = os.urandom(5000)
+        (self.input_dir / "word/media/image1.png").write_bytes(self.image)
+
+    def members(self, path):
+        with zipfile.ZipFile(path) as zf:
+            return {info.filename: zf.read(info) for info in zf.infolist()}
+
+    def test_process_pool_condense_matches_serial(self):
+        xml_files = pack._list_files(self.input_dir, deterministic=True)
+        xml_files = [f for f in xml_files if f.name.endswith((".xml", ".rels"))]
+        serial = list(pack._condensed_parts(xml_files, 1))
+        with mock.patch.object(
+            pack, "ProcessPoolExecutor", wraps=pack.ProcessPoolExecutor
+        ) as pool:
+            parallel = list(pack._condensed_parts(xml_files, 2))
+        pool.assert_called_once_with(max_workers=2)
+        self.assertEqual(parallel, serial)
+
+
+    def test_input_directory_is_left_untouched(self):
+        def snapshot():
+            return {
+                path: (path.read_bytes(), path.stat().st_mtime_ns)
+                for path in self.input_dir.rglob("*")
+                if path.is_file()
+            }
+
+        before = snapshot()
+        output = self.temp_path / "out.docx"
+        with mock.patch.object(tempfile, "mkdtemp") as mkdtemp:
+            pack_document(self.input_dir, output)
+        mkdtemp.assert_not_called()
+        self.assertEqual(snapshot(), before)
+        self.assertEqual(sorted(self.temp_path.iterdir()), [output, self.input_dir])
+        # XML is condensed on the way into the archive
+        document = (self.input_dir / "word/document.xml").read_bytes()
+        self.assertEqual(
+            self.members(output)["word/document.xml"], condense_xml_bytes(document)
+        )
+
+    def test_media_is_stored_and_xml_deflated(self):
+        output = self.temp_path / "out.docx"
+        pack_document(self.input_dir, output)
+        with zipfile.ZipFile(output) as zf:
+            image = zf.getinfo("word/media/image1.png")
+            self.assertEqual(image.compress_type, zipfile.ZIP_STORED)
+            self.assertEqual(image.compress_size, len(self.image))
+            self.assertEqual(zf.read(image), self.image)
+            self.assertEqual(
+                zf.getinfo("word/document.xml").compress_type, zipfile.ZIP_DEFLATED
+            )
+
+    def test_compresslevel_reaches_zlib(self):
+        for level in (pack.FAST_COMPRESSLEVEL, pack.SMALL_COMPRESSLEVEL):
+            with self.subTest(level=level), mock.patch.object(
+                pack.zlib, "compressobj", wraps=pack.zlib.compressobj
+            ) as compressobj:
+                pack_document(
+                    self.input_dir, self.temp_path / "out.docx", compresslevel=level
+                )
+                # One call per deflated member; the image is stored
+                self.assertEqual(compressobj.call_count, 3)
+                for call in compressobj.call_args_list:
+                    self.assertEqual(call.args[0], level)
+
+    def test_fast_and_small_flags(self):
+        for flag, level in [
+            ([], None),
+            (["--fast"], pack.FAST_COMPRESSLEVEL),
+            (["--small"], pack.SMALL_COMPRESSLEVEL),
+        ]:
+            argv = ["pack.py", str(self.input_dir), "out.docx", *flag]
+            with self.subTest(flag=flag), mock.patch.object(
+                sys, "argv", argv
+            ), mock.patch.object(pack, "pack_document", return_value=True) as packer:
+                pack.main()
+            self.assertEqual(packer.call_args.kwargs["compresslevel"], level)
+
+    def test_compression_thread_count_does_not_change_output(self):
+        # More members than the window of 2 * jobs compressed ahead
+        for i in range(2, 12):
+            (self.input_dir / f"word/media/image{i}.png").write_bytes(os.urandom(100))
+        outputs = []
+        for jobs in (1, 2, 8):
+            output = self.temp_path / f"jobs{jobs}.docx"
+            pack_document(self.input_dir, output, jobs=jobs, deterministic=True)
+            outputs.append(output.read_bytes())
+        self.assertEqual(outputs[1], outputs[0])
+        self.assertEqual(outputs[2], outputs[0])
+        with zipfile.ZipFile(self.temp_path / "jobs8.docx") as zf:
+            self.assertEqual(
+                zf.namelist(),
+                [
+                    f.relative_to(self.input_dir).as_posix()
+                    for f in pack._list_files(self.input_dir, deterministic=True)
+                ],
+            )
+
+    def test_deterministic_packs_are_identical(self):
+        first = self.temp_path / "first.docx"
+        pack_document(self.input_dir, first, deterministic=True)
+        # Different times and permissions must not leak into the archive
+        for path in self.input_dir.rglob("*"):
+            if path.is_file():
+                os.utime(path, (0, 1_000_000_000))
+                path.chmod(0o600)
+        second = self.temp_path / "second.docx"
+        pack_document(self.input_dir, second, deterministic=True)
+
+        self.assertEqual(first.read_bytes(), second.read_bytes())
+        with zipfile.ZipFile(second) as zf:
+            self.assertEqual(zf.namelist()[0], "[Content_Types].xml")
+            self.assertEqual(zf.namelist()[1:], sorted(zf.namelist()[1:]))
+            for info in zf.infolist():
+                self.assertEqual(info.date_time, (1980, 1, 1, 0, 0, 0))
+
+    def test_pack_to_bytes_matches_pack_document(self):
+        output = self.temp_path / "out.docx"
+        pack_document(self.input_dir, output, deterministic=True)
+        self.assertEqual(
+            pack_to_bytes(self.input_dir, deterministic=True), output.read_bytes()
+        )
+        # Non-deterministic archives differ in metadata only
+        content = pack_to_bytes(self.input_dir)
+        self.assertEqual(self.members(io.BytesIO(content)), self.members(output))
+
+    def test_pack_to_stream_needs_no_seeking(self):
+        class Unseekable(io.RawIOBase):
+            def __init__(self):
+                self.chunks = []
+
+            def writable(self):
+                return True
+
+            def write(self, data):
+                self.chunks.append(bytes(data))
+                return len(data)
+
+        stream = Unseekable()
+        pack_to_stream(self.input_dir, stream, deterministic=True)
+        self.assertEqual(
+            b"".join(stream.chunks), pack_to_bytes(self.input_dir, deterministic=True)
+        )
+
+class TestUnpackDocument(unittest.TestCase):
+    def setUp(self):
+        temp_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(temp_dir.cleanup)
+        self.temp_path = Path(temp_dir.name)
+        input_dir = write_package(self.temp_path / "unpacked")
+        (input_dir / "word/_rels").mkdir()
+        (input_dir / "word/_rels/document.xml.rels").write_text(
+            f'<Relationships xmlns="{PACKAGE_RELATIONSHIPS}"/>'
+        )
+        (input_dir / "word/media").mkdir()
+        (input_dir / "word/media/image1.png").write_bytes(os.urandom(100))
+        self.docx = self.temp_path / "source.docx"
+        pack_document(input_dir, self.docx, deterministic=True)
+
+    def test_parts_include_their_rels(self):
+        out_dir = self.temp_path / "selected"
+        names = unpack_document(self.docx, out_dir, parts=["word/document.xml"])
+        self.assertEqual(names, ["word/_rels/document.xml.rels", "word/document.xml"])
+        self.assertEqual(
+            sorted(p.relative_to(out_dir).as_posix() for p in out_dir.rglob("*.*")),
+            ["word/_rels/document.xml.rels", "word/document.xml"],
+        )
+
+    def test_missing_part_raises(self):
+        out_dir = self.temp_path / "selected"
+        with self.assertRaises(ValueError):
+            unpack_document(self.docx, out_dir, parts=["word/missing.xml"])
+        self.assertFalse(out_dir.exists())
+
+    def test_round_trip(self):
+        out_dir = self.temp_path / "all"
+        unpack_document(self.docx, out_dir, jobs=2)
+        repacked = self.temp_path / "repacked.docx"
+        pack_document(out_dir, repacked, deterministic=True)
+        self.assertEqual(repacked.read_bytes(), self.docx.read_bytes())
+
+class TestCheckStructure(unittest.TestCase):
+    def setUp(self):
+        temp_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(temp_dir.cleanup)
+        self.input_dir = write_package(Path(temp_dir.name) / "unpacked")
+
+    def check(self):
+        """Run check_structure(); return its result and what it printed."""
+        output = io.StringIO()
+        with contextlib.redirect_stdout(output):
+            passed = check_structure(self.input_dir)
+        return passed, output.getvalue()
+
+    def test_clean_package(self):
+        self.assertEqual(self.check(), (True, ""))
+
+    def test_unreferenced_file_is_a_warning(self):
+        (self.input_dir / "word/media").mkdir()
+        (self.input_dir / "word/media/orphan.png").write_bytes(b"png")
+        passed, output = self.check()
+        self.assertTrue(passed)
+        self.assertIn("WARNING", output)
+        self.assertIn("word/media/orphan.png", output)
+
+    def test_broken_relationship_target(self):
+        (self.input_dir / "word/_rels").mkdir()
+        (self.input_dir / "word/_rels/document.xml.rels").write_text(
+            f'<Relationships xmlns="{PACKAGE_RELATIONSHIPS}">'
+            f'<Relationship Id="rId1" Type="{RELATIONSHIPS}/image" '
+            'Target="media/missing.png"/></Relationships>'
+        )
+        passed, output = self.check()
+        self.assertFalse(passed)
+        self.assertIn("Broken reference to media/missing.png", output)
+
+    def test_missing_content_type(self):
+        path = self.input_dir / "[Content_Types].xml"
+        content = path.read_text()
+        path.write_text(content[: content.index("<Override")] + "</Types>")
+        passed, output = self.check()
+        self.assertFalse(passed)
+        self.assertIn("word/document.xml", output)
+
+    def test_duplicate_id(self):
+        write_package(
+            self.input_dir,
+            '<w:p><w:bookmarkStart w:id="1" w:name="a"/><w:bookmarkEnd w:id="1"/>'
+            '<w:bookmarkStart w:id="1" w:name="b"/><w:bookmarkEnd w:id="2"/></w:p>',
+        )
+        passed, output = self.check()
+        self.assertFalse(passed)
+        self.assertIn("'1'", output)
+
+
+# Office files to compare part by part: python pack_test.py [file.docx ...]
+DOCUMENTS = []
+
+
+if __name__ == "__main__":
+    DOCUMENTS.extend(sys.argv[1:])
+    unittest.main(argv=sys.argv[:1])
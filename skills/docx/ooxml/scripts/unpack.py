@@ -1,29 +1,166 @@
 #!/usr/bin/env python3
-"""Unpack and format XML contents of Office files (.docx, .pptx, .xlsx)"""
+"""
+Tool to unpack an Office file (.docx, .pptx, .xlsx) and pretty-print its XML parts.
 
+Example usage:
+    python unpack.py <office_file> <output_dir> [--parts NAME [NAME ...]] [--jobs N]
+"""
+
+import argparse
+import os
+import posixpath
 import random
 import sys
 import defusedxml.minidom
 import zipfile
+from concurrent.futures import ProcessPoolExecutor
 from pathlib import Path
 
-# Get command line arguments
-assert len(sys.argv) == 3, "Usage: python unpack.py <office_file> <output_dir>"
-input_file, output_dir = sys.argv[1], sys.argv[2]
-
-# Extract and format
-output_path = Path(output_dir)
-output_path.mkdir(parents=True, exist_ok=True)
-zipfile.ZipFile(input_file).extractall(output_path)
-
-# Pretty print all XML files
-xml_files = list(output_path.rglob("*.xml")) + list(output_path.rglob("*.rels"))
-for xml_file in xml_files:
-    content = xml_file.read_text(encoding="utf-8")
-    dom = defusedxml.minidom.parseString(content)
-    xml_file.write_bytes(dom.toprettyxml(indent="  ", encoding="ascii"))
-
-# For .docx files, suggest an RSID for tracked changes
-if input_file.endswith(".docx"):
-    suggested_rsid = "".join(random.choices("0123456789ABCDEF", k=8))
-    print(f"Suggested RSID for edit session: {suggested_rsid}")
+# Below this much XML, starting worker processes costs more than it saves
+_PARALLEL_MIN_BYTES = 1 << 20
+
+# The archive each worker process reads its parts from
+_worker_archive = None
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Unpack an Office file and pretty-print its XML"
+    )
+    parser.add_argument("office_file", help="Office file (.docx/.pptx/.xlsx)")
+    parser.add_argument("output_dir", help="Directory to unpack into")
+    parser.add_argument(
+        "--parts",
+        nargs="+",
+        metavar="NAME",
+        help="Only extract these members (e.g. word/document.xml) and their .rels",
+    )
+    parser.add_argument(
+        "--jobs",
+        type=int,
+        default=None,
+        help="Processes pretty-printing XML parts (default: CPU count; 1 for serial)",
+    )
+    args = parser.parse_args()
+
+    try:
+        unpack_document(args.office_file, args.output_dir, args.parts, args.jobs)
+    except ValueError as e:
+        sys.exit(f"Error: {e}")
+
+    # For .docx files, suggest an RSID for tracked changes
+    if args.office_file.endswith(".docx"):
+        suggested_rsid = "".join(random.choices("0123456789ABCDEF", k=8))
+        print(f"Suggested RSID for edit session: {suggested_rsid}")
+
+
+def unpack_document(path, out_dir, parts=None, jobs=None):
+    """Unpack an Office file into a directory, pretty-printing its XML parts.
+
+    XML and .rels members are written with minidom's toprettyxml (two-space
+    indent, ASCII), the layout pack.py undoes; other members are copied as they
+    are. Only the members named in parts are read, so unpacking
+    word/document.xml from a file full of media costs about one part.
+
+    Args:
+        path: Path to the .docx/.pptx/.xlsx file
+        out_dir: Directory to unpack into; created if needed, existing files are
+            overwritten
+        parts: Member names to extract, e.g. ["word/document.xml"]; the .rels
+            part of each is included when it has one. Default: all members.
+        jobs: Processes pretty-printing XML parts, used when there is at least
+            1 MiB of XML; default CPU count. The output is the same for any value.
+
+    Returns:
+        list[str]: Names of the extracted members, in archive order
+
+    Raises:
+        ValueError: If path is not an Office file or a requested part is missing
+
+    Example:
+        unpack_document("report.docx", "unpacked", parts=["word/document.xml"])
+    """
+    out_dir = Path(out_dir)
+    try:
+        zf = zipfile.ZipFile(path)
+    except zipfile.BadZipFile:
+        raise ValueError(f"{path} is not an Office file")
+
+    with zf:
+        infos = _selected_members(zf, parts)
+        out_dir.mkdir(parents=True, exist_ok=True)
+
+        xml_members = []
+        for info in infos:
+            target = _target_path(out_dir, info.filename)
+            if info.is_dir():
+                target.mkdir(parents=True, exist_ok=True)
+                continue
+            target.parent.mkdir(parents=True, exist_ok=True)
+            if info.filename.endswith((".xml", ".rels")):
+                xml_members.append((info, target))
+            else:
+                with zf.open(info) as source, open(target, "wb") as f:
+                    while chunk := source.read(1 << 20):
+                        f.write(chunk)
+
+        if jobs is None:
+            total_size = sum(info.file_size for info, _ in xml_members)
+            jobs = (os.cpu_count() or 1) if total_size >= _PARALLEL_MIN_BYTES else 1
+        jobs = max(1, min(jobs, len(xml_members)))
+        if jobs == 1:
+            for info, target in xml_members:
+                target.write_bytes(_pretty_print(zf.read(info)))
+        else:
+            with ProcessPoolExecutor(
+                max_workers=jobs,
+                initializer=_open_worker_archive,
+                initargs=(str(path),),
+            ) as executor:
+                names = [info.filename for info, _ in xml_members]
+                targets = [target for _, target in xml_members]
+                list(executor.map(_pretty_print_member, names, targets))
+
+    return [info.filename for info in infos]
+
+
+def _selected_members(zf, parts):
+    """ZipInfo of the requested parts and their .rels, in archive order."""
+    if parts is None:
+        return zf.infolist()
+
+    missing = [name for name in parts if name not in zf.NameToInfo]
+    if missing:
+        raise ValueError(f"Not in {zf.filename}: {', '.join(missing)}")
+    wanted = set(parts)
+    for name in parts:
+        directory, base = posixpath.split(name)
+        rels_name = posixpath.join(directory, "_rels", f"{base}.rels")
+        if rels_name in zf.NameToInfo:
+            wanted.add(rels_name)
+    return [info for info in zf.infolist() if info.filename in wanted]
+
+
+def _target_path(out_dir, name):
+    """Where a member is written, ignoring absolute and parent components as zipfile does."""
+    components = [c for c in name.split("/") if c not in ("", ".", "..")]
+    return out_dir.joinpath(*components)
+
+
+def _pretty_print(content):
+    return defusedxml.minidom.parseString(content).toprettyxml(
+        indent="  ", encoding="ascii"
+    )
+
+
+def _open_worker_archive(path):
+    global _worker_archive
+    _worker_archive = zipfile.ZipFile(path)
+
+
+def _pretty_print_member(name, target):
+    Path(target).write_bytes(_pretty_print(_worker_archive.read(name)))
+
+
+if __name__ == "__main__":
+    main()
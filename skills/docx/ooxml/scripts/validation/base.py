@@ -3,6 +3,7 @@ Base validator with common validation logic for document files.
 """
 
 import re
+import zipfile
 from pathlib import Path
 
 import lxml.etree
@@ -103,23 +104,64 @@ class BaseSchemaValidator:
         "http://www.w3.org/XML/1998/namespace",
     }
 
-    def __init__(self, unpacked_dir, original_file, verbose=False):
+    # Compiled XSD schemas shared across validator instances, keyed by schema path
+    _schema_cache = {}
+
+    def __init__(self, unpacked_dir, original_file=None, verbose=False, parts=None):
+        """
+        Args:
+            unpacked_dir: Path to unpacked document directory
+            original_file: Path to original document, used as the error baseline.
+                Not needed for the structural checks (well-formedness, unique IDs,
+                relationships, content types) on a whole package.
+            verbose: Enable verbose output
+            parts: Optional relative paths of the parts that changed. Per-file checks
+                are limited to these, and package-wide checks (file references,
+                content types) only run when package_changed is True.
+        """
         self.unpacked_dir = Path(unpacked_dir).resolve()
-        self.original_file = Path(original_file)
+        self.original_file = None if original_file is None else Path(original_file)
         self.verbose = verbose
+        self.parts = None if parts is None else {Path(p).as_posix() for p in parts}
 
         # Set schemas directory
         self.schemas_dir = Path(__file__).parent.parent.parent / "schemas"
 
         # Get all XML and .rels files
         patterns = ["*.xml", "*.rels"]
-        self.xml_files = [
-            f for pattern in patterns for f in self.unpacked_dir.rglob(pattern)
-        ]
+        if self.parts is None:
+            self.xml_files = [
+                f for pattern in patterns for f in self.unpacked_dir.rglob(pattern)
+            ]
+        else:
+            self.xml_files = [
+                self.unpacked_dir / p
+                for p in sorted(self.parts)
+                if p.endswith((".xml", ".rels")) and (self.unpacked_dir / p).is_file()
+            ]
 
-        if not self.xml_files:
+        self.package_changed = self._is_package_changed()
+
+        if not self.xml_files and self.parts is None:
             print(f"Warning: No XML files found in {self.unpacked_dir}")
 
+    def _is_package_changed(self):
+        """Whether package-wide checks are needed for the parts being validated.
+
+        True when validating everything, or when relationships, content types or
+        parts that are not in the original document are among the changed parts.
+        """
+        if self.parts is None or self.original_file is None:
+            return True
+        if any(p.endswith(".rels") or p == "[Content_Types].xml" for p in self.parts):
+            return True
+        try:
+            with zipfile.ZipFile(self.original_file, "r") as zip_ref:
+                original_parts = set(zip_ref.namelist())
+        except (OSError, zipfile.BadZipFile):
+            return True
+        return not self.parts <= original_parts
+
     def validate(self):
         """Run all validation checks and return True if all pass."""
         raise NotImplementedError("Subclasses must implement the validate method")
@@ -274,9 +316,13 @@ class BaseSchemaValidator:
                 print("PASSED - All required IDs are unique")
             return True
 
-    def validate_file_references(self):
+    def validate_file_references(self, unreferenced_is_error=True):
         """
         Validate that all .rels files properly reference files and that all files are referenced.
+
+        Args:
+            unreferenced_is_error: If False, files no relationship points to are only
+                reported as a warning; Word opens such packages (default: True)
         """
         errors = []
 
@@ -363,10 +409,16 @@ class BaseSchemaValidator:
         # Check for unreferenced files (files that exist but are not referenced anywhere)
         unreferenced_files = set(all_files) - all_referenced_files
 
-        if unreferenced_files:
-            for unref_file in sorted(unreferenced_files):
-                unref_rel_path = unref_file.relative_to(self.unpacked_dir)
-                errors.append(f"  Unreferenced file: {unref_rel_path}")
+        unreferenced = [
+            f"  Unreferenced file: {unref_file.relative_to(self.unpacked_dir)}"
+            for unref_file in sorted(unreferenced_files)
+        ]
+        if unreferenced_is_error:
+            errors.extend(unreferenced)
+        elif unreferenced:
+            print(f"WARNING - Found {len(unreferenced)} unreferenced files:")
+            for warning in unreferenced:
+                print(warning)
 
         if errors:
             print(f"FAILED - Found {len(errors)} relationship validation errors:")
@@ -394,8 +446,16 @@ class BaseSchemaValidator:
 
         errors = []
 
+        # When scoped to changed parts, also recheck the owners of changed .rels files
+        xml_files = list(self.xml_files)
+        for rels_file in self.xml_files:
+            if rels_file.suffix == ".rels" and rels_file.parent.name == "_rels":
+                owner = rels_file.parent.parent / rels_file.name[: -len(".rels")]
+                if owner.is_file() and owner not in xml_files:
+                    xml_files.append(owner)
+
         # Process each XML file that might contain r:id references
-        for xml_file in self.xml_files:
+        for xml_file in xml_files:
             # Skip .rels files themselves
             if xml_file.suffix == ".rels":
                 continue
@@ -830,13 +890,7 @@ class BaseSchemaValidator:
             return None, None  # Skip file
 
         try:
-            # Load schema
-            with open(schema_path, "rb") as xsd_file:
-                parser = lxml.etree.XMLParser()
-                xsd_doc = lxml.etree.parse(
-                    xsd_file, parser=parser, base_url=str(schema_path)
-                )
-                schema = lxml.etree.XMLSchema(xsd_doc)
+            schema = self._load_schema(schema_path)
 
             # Load and preprocess XML
             with open(xml_file, "r") as f:
@@ -866,6 +920,19 @@ class BaseSchemaValidator:
         except Exception as e:
             return False, {str(e)}
 
+    def _load_schema(self, schema_path):
+        """Load and compile an XSD schema, reusing previously compiled schemas."""
+        schema = self._schema_cache.get(schema_path)
+        if schema is None:
+            with open(schema_path, "rb") as xsd_file:
+                parser = lxml.etree.XMLParser()
+                xsd_doc = lxml.etree.parse(
+                    xsd_file, parser=parser, base_url=str(schema_path)
+                )
+                schema = lxml.etree.XMLSchema(xsd_doc)
+            self._schema_cache[schema_path] = schema
+        return schema
+
     def _get_original_file_errors(self, xml_file):
         """Get XSD validation errors from a single file in the original document.
 
@@ -876,7 +943,6 @@ class BaseSchemaValidator:
             set: Set of error messages from the original file
         """
         import tempfile
-        import zipfile
 
         # Resolve both paths to handle symlinks (e.g., /var vs /private/var on macOS)
         xml_file = Path(xml_file).resolve()
@@ -886,17 +952,15 @@ class BaseSchemaValidator:
         with tempfile.TemporaryDirectory() as temp_dir:
             temp_path = Path(temp_dir)
 
-            # Extract original file
+            # Extract only the corresponding file from the original
             with zipfile.ZipFile(self.original_file, "r") as zip_ref:
-                zip_ref.extractall(temp_path)
+                if relative_path.as_posix() not in zip_ref.NameToInfo:
+                    # File didn't exist in original, so no original errors
+                    return set()
+                zip_ref.extract(relative_path.as_posix(), temp_path)
 
-            # Find corresponding file in original
             original_xml_file = temp_path / relative_path
 
-            if not original_xml_file.exists():
-                # File didn't exist in original, so no original errors
-                return set()
-
             # Validate the specific file in original
             is_valid, errors = self._validate_single_file_xsd(
                 original_xml_file, temp_path
@@ -3,7 +3,6 @@ Validator for Word document XML files against XSD schemas.
 """
 
 import re
-import tempfile
 import zipfile
 
 import lxml.etree
@@ -37,11 +36,12 @@ class DOCXSchemaValidator(BaseSchemaValidator):
             all_valid = False
 
         # Test 3: Relationship and file reference validation
-        if not self.validate_file_references():
+        # Tests 3 and 4 cover the whole package; skip them when only content changed
+        if self.package_changed and not self.validate_file_references():
             all_valid = False
 
         # Test 4: Content type declarations
-        if not self.validate_content_types():
+        if self.package_changed and not self.validate_content_types():
             all_valid = False
 
         # Test 5: XSD schema validation
@@ -65,7 +65,8 @@ class DOCXSchemaValidator(BaseSchemaValidator):
             all_valid = False
 
         # Count and compare paragraphs
-        self.compare_paragraph_counts()
+        if any(f.name == "document.xml" for f in self.xml_files):
+            self.compare_paragraph_counts()
 
         return all_valid
 
@@ -194,19 +195,13 @@ class DOCXSchemaValidator(BaseSchemaValidator):
         count = 0
 
         try:
-            # Create temporary directory to unpack original
-            with tempfile.TemporaryDirectory() as temp_dir:
-                # Unpack original docx
-                with zipfile.ZipFile(self.original_file, "r") as zip_ref:
-                    zip_ref.extractall(temp_dir)
+            # Parse document.xml straight from the original docx
+            with zipfile.ZipFile(self.original_file, "r") as zip_ref:
+                root = lxml.etree.fromstring(zip_ref.read("word/document.xml"))
 
-                # Parse document.xml
-                doc_xml_path = temp_dir + "/word/document.xml"
-                root = lxml.etree.parse(doc_xml_path).getroot()
-
-                # Count all w:p elements
-                paragraphs = root.findall(f".//{{{self.WORD_2006_NAMESPACE}}}p")
-                count = len(paragraphs)
+            # Count all w:p elements
+            paragraphs = root.findall(f".//{{{self.WORD_2006_NAMESPACE}}}p")
+            count = len(paragraphs)
 
         except Exception as e:
             print(f"Error counting paragraphs in original document: {e}")
@@ -64,10 +64,11 @@ class RedliningValidator:
         with tempfile.TemporaryDirectory() as temp_dir:
             temp_path = Path(temp_dir)
 
-            # Unpack original docx
+            # Unpack document.xml from the original docx
             try:
                 with zipfile.ZipFile(self.original_docx, "r") as zip_ref:
-                    zip_ref.extractall(temp_path)
+                    if "word/document.xml" in zip_ref.NameToInfo:
+                        zip_ref.extract("word/document.xml", temp_path)
             except Exception as e:
                 print(f"FAILED - Error unpacking original docx: {e}")
                 return False
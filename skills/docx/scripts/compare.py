@@ -0,0 +1,732 @@
+#!/usr/bin/env python3
+"""
+Compare two Word documents and write a redline of the changes as tracked changes.
+
+The original document is opened with Document.open_docx() and the differences to
+the modified document are applied to it as w:ins/w:del markup (with the session
+RSID, author and date), so styles, numbering and media of the original are kept.
+
+Paragraphs and tables of the body are aligned by content first (a Myers diff over
+their text), which prunes unchanged content before any finer comparison. Only
+paragraphs that changed and still resemble each other are diffed word by word;
+everything else is deleted and inserted as a whole.
+
+Usage:
+    python compare.py <original.docx> <modified.docx> <output.docx> [--author NAME]
+
+Example:
+    python compare.py contract-v1.docx contract-v2.docx contract-redline.docx --author "Jane Smith"
+"""
+
+import argparse
+import re
+import sys
+import zipfile
+from pathlib import Path
+
+from defusedxml import minidom
+
+try:
+    from .document import Document, DocxXMLEditor
+except ImportError:
+    # Running as a script: make the skill root importable
+    sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+    from scripts.document import Document, DocxXMLEditor
+
+# Word-level tokens: words, runs of whitespace, single punctuation characters
+_TOKEN_PATTERN = re.compile(r"\w+|\s+|[^\w\s]")
+
+# Changed paragraph pairs less similar than this are replaced as a whole
+_MIN_WORD_DIFF_SIMILARITY = 0.5
+
+# How many new blocks ahead to look for a counterpart of a changed old block
+_PAIRING_LOOKAHEAD = 8
+
+# Ranges of the diff with up to this many items in total keep every round of the
+# Myers search for backtracking (at most about a million entries); larger ones are
+# first split at a point halfway along a shortest path
+_MYERS_TRACE_LIMIT = 1024
+
+# Elements aligned between the documents
+_BLOCK_TAGS = frozenset(("w:p", "w:tbl", "w:tr"))
+
+# Elements dropped when copying content from the modified document; they refer to
+# relationships, comments or bookmarks that do not exist in the original
+_DROPPED_TAGS = frozenset(
+    (
+        "w:bookmarkStart",
+        "w:bookmarkEnd",
+        "w:commentRangeStart",
+        "w:commentRangeEnd",
+        "w:commentReference",
+        "w:drawing",
+        "w:object",
+        "w:pict",
+        "w:sectPr",
+        "w:proofErr",
+    )
+)
+
+# Elements replaced by their children when copying content from the modified document
+_UNWRAPPED_TAGS = frozenset(("w:hyperlink", "w:smartTag", "w:customXml", "w:ins"))
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Compare two .docx files and write a redline with tracked changes"
+    )
+    parser.add_argument("original", help="Original .docx file")
+    parser.add_argument("modified", help="Modified .docx file")
+    parser.add_argument("output", help="Output .docx file with tracked changes")
+    parser.add_argument("--author", default="GLM", help="Author for tracked changes")
+    parser.add_argument(
+        "--no-validate", action="store_true", help="Skip validation before saving"
+    )
+    args = parser.parse_args()
+
+    try:
+        stats = compare_documents(
+            args.original,
+            args.modified,
+            args.output,
+            author=args.author,
+            validate=not args.no_validate,
+        )
+    except ValueError as e:
+        sys.exit(f"Error: {e}")
+
+    print(
+        f"Paragraphs: {stats['modified']} modified, "
+        f"{stats['inserted']} inserted, {stats['deleted']} deleted"
+    )
+
+
+def compare_documents(
+    original, modified, output, author="GLM", rsid=None, validate=True
+):
+    """Write a copy of the original document with the changes to modified tracked.
+
+    Only the main document body is compared. Content copied from the modified
+    document keeps paragraph and run formatting but drops images, bookmarks and
+    comments, which refer to parts of the modified package.
+
+    Args:
+        original: Path to the original .docx file
+        modified: Path to the modified .docx file
+        output: Path to write the redlined .docx file
+        author: Author for the tracked changes (default: "GLM")
+        rsid: Optional RSID for the tracked changes (auto-generated if not provided)
+        validate: If True, validates the redline before saving (default: True)
+
+    Returns:
+        dict: Counts of "modified", "inserted" and "deleted" paragraphs
+
+    Raises:
+        ValueError: If a file cannot be read or validation fails
+    """
+    try:
+        with zipfile.ZipFile(modified) as zf:
+            new_dom = minidom.parseString(zf.read("word/document.xml"))
+    except (OSError, KeyError, zipfile.BadZipFile) as e:
+        raise ValueError(f"Cannot read word/document.xml from {modified}: {e}")
+
+    doc = Document.open_docx(original, rsid=rsid, author=author)
+    editor = doc["word/document.xml"]
+    comparer = _Comparer(editor)
+
+    old_body = editor.dom.getElementsByTagName("w:body")[0]
+    new_body = new_dom.getElementsByTagName("w:body")[0]
+    comparer.compare_container(old_body, new_body)
+
+    doc.save_docx(output, validate=validate)
+    return comparer.stats
+
+
+class _Comparer:
+    """Applies the differences between two block containers to an editor's DOM."""
+
+    def __init__(self, editor):
+        self.editor = editor
+        self.stats = {"modified": 0, "inserted": 0, "deleted": 0}
+        # Word-level diffs of the paragraph pairs found comparable, for _update_block
+        self._paragraph_diffs = {}
+
+    def compare_container(self, old_container, new_container):
+        """Align the block children of two containers and redline them.
+
+        Containers are w:body and w:tc (holding paragraphs and tables) or w:tbl
+        (holding rows).
+        """
+        old_blocks = _blocks(old_container)
+        new_blocks = _blocks(new_container)
+        old_keys = [_block_key(block) for block in old_blocks]
+        new_keys = [_block_key(block) for block in new_blocks]
+
+        for tag, i1, i2, j1, j2 in _myers_opcodes(old_keys, new_keys):
+            if tag == "equal":
+                continue
+            # New blocks go after the old ones they replace
+            following = old_blocks[i2] if i2 < len(old_blocks) else None
+
+            # Pair each old block with the next comparable new block, if any
+            j = 0
+            for old_block in old_blocks[i1:i2]:
+                window = new_blocks[j1 + j : min(j2, j1 + j + _PAIRING_LOOKAHEAD)]
+                match = next(
+                    (
+                        offset
+                        for offset, new_block in enumerate(window)
+                        if self._comparable(old_block, new_block)
+                    ),
+                    None,
+                )
+                if match is None:
+                    self._delete_block(old_block)
+                    continue
+                for new_block in window[:match]:
+                    self._insert_block(old_container, old_block, new_block)
+                self._update_block(old_block, window[match])
+                j += match + 1
+            for new_block in new_blocks[j1 + j : j2]:
+                self._insert_block(old_container, following, new_block)
+
+    def _comparable(self, old_block, new_block):
+        """Check whether an old block can be redlined in place to match a new one."""
+        if old_block.tagName == "w:p" and new_block.tagName == "w:p":
+            diff = self._paragraph_diff(old_block, new_block)
+            if diff is None:
+                return False
+            self._paragraph_diffs[old_block, new_block] = diff
+            return True
+        if old_block.tagName == "w:tr" and new_block.tagName == "w:tr":
+            return len(_row_cells(old_block)) == len(_row_cells(new_block))
+        return old_block.tagName == new_block.tagName == "w:tbl"
+
+    def _update_block(self, old_block, new_block):
+        """Redline an old block in place to match a comparable new one."""
+        if old_block.tagName == "w:tbl":
+            self.compare_container(old_block, new_block)
+            return
+        if old_block.tagName == "w:tr":
+            for old_cell, new_cell in zip(_row_cells(old_block), _row_cells(new_block)):
+                self.compare_container(old_cell, new_cell)
+            return
+
+        segment, old_tokens, new_tokens, opcodes = self._paragraph_diffs.pop(
+            (old_block, new_block)
+        )
+        offsets = [0]
+        for token in old_tokens:
+            offsets.append(offsets[-1] + len(token))
+
+        # Apply from the end so earlier offsets stay valid
+        for tag, i1, i2, j1, j2 in reversed(opcodes):
+            if tag == "equal":
+                continue
+            new_text = "".join(new_tokens[j1:j2])
+            start, end = offsets[i1], offsets[i2]
+            if start == end:
+                self._insert_text(segment, start, new_text)
+            else:
+                runs = self.editor._isolate_match_runs(segment, start, end)
+                change_id = self.editor._get_next_change_id()
+                self.editor._track_replacement(runs, new_text, change_id)
+
+        if any(tag != "equal" for tag, *_ in opcodes):
+            self.stats["modified"] += 1
+
+    def _paragraph_diff(self, old_para, new_para):
+        """Word-level diff of two paragraphs, if the old one can be edited in place.
+
+        Returns:
+            tuple: (segment, old_tokens, new_tokens, opcodes), or None if the old
+            paragraph is not plain text or the paragraphs are too dissimilar
+        """
+        segments = self.editor._text_segments(old_para)
+        if len(segments) != 1:
+            return None
+        segment = segments[0]
+        old_text = "".join(self.editor._run_text(run) for run in segment)
+        if old_text != _paragraph_text(old_para):
+            # Text outside plain runs (fields, hyperlinks, tracked changes)
+            return None
+
+        old_tokens = _TOKEN_PATTERN.findall(old_text)
+        new_tokens = _TOKEN_PATTERN.findall(_paragraph_text(new_para))
+        opcodes = _myers_opcodes(old_tokens, new_tokens)
+        equal = sum(i2 - i1 for tag, i1, i2, _, _ in opcodes if tag == "equal")
+        total = len(old_tokens) + len(new_tokens)
+        if total and 2 * equal / total < _MIN_WORD_DIFF_SIMILARITY:
+            return None
+        return segment, old_tokens, new_tokens, opcodes
+
+    def _insert_text(self, segment, offset, text):
+        """Insert tracked text at a character offset of a plain-text segment."""
+        position = 0
+        anchor = None
+        for run in segment:
+            length = len(self.editor._run_text(run))
+            if position + length >= offset:
+                anchor = run
+                if offset < position + length:
+                    self.editor._split_run(run, offset - position)
+                break
+            position += length
+
+        template = anchor if anchor is not None else segment[0]
+        run_xml = "".join(
+            child.toxml()
+            for child in template.childNodes
+            if child.nodeType == child.ELEMENT_NODE and child.tagName == "w:rPr"
+        )
+        ins_xml = f"<w:ins><w:r>{run_xml}<w:t>{_escape(text)}</w:t></w:r></w:ins>"
+        if offset == 0:
+            self.editor.insert_before(segment[0], ins_xml)
+        else:
+            self.editor.insert_after(anchor, ins_xml)
+
+    def _delete_block(self, block):
+        """Mark a paragraph, table or row (including its paragraph marks) as deleted."""
+        rows = block.getElementsByTagName("w:tr")
+        for row in [block] if block.tagName == "w:tr" else rows:
+            self._mark_property(row, "w:trPr", "w:del")
+        paragraphs = (
+            [block] if block.tagName == "w:p" else block.getElementsByTagName("w:p")
+        )
+        for para in paragraphs:
+            try:
+                self.editor.suggest_deletion(para)
+            except ValueError:
+                # Paragraph already holds tracked changes: delete its plain runs
+                for child in list(para.childNodes):
+                    if child.nodeType == child.ELEMENT_NODE and child.tagName == "w:r":
+                        self.editor.suggest_deletion(child)
+            self._mark_paragraph_mark(para, "w:del")
+            self.stats["deleted"] += 1
+
+    def _insert_block(self, container, following, new_block):
+        """Insert a copy of a block from the modified document as a tracked insertion."""
+        block_xml = _tracked_block_xml(new_block)
+        if following is not None:
+            self.editor.insert_before(following, block_xml)
+        else:
+            # Keep the body's final w:sectPr last
+            last = _last_element(container)
+            if last is not None and last.tagName == "w:sectPr":
+                self.editor.insert_before(last, block_xml)
+            else:
+                self.editor.append_to(container, block_xml)
+        if new_block.tagName == "w:p":
+            self.stats["inserted"] += 1
+        else:
+            self.stats["inserted"] += len(new_block.getElementsByTagName("w:p"))
+
+    def _mark_paragraph_mark(self, para, tag):
+        """Track the paragraph mark itself so accepting the change merges the paragraph."""
+        ppr = _child(para, "w:pPr")
+        rpr = _child(ppr, "w:rPr") if ppr is not None else None
+        if rpr is not None and _child(rpr, tag) is not None:
+            return
+        ppr = self._mark_property(para, "w:pPr", None)
+        rpr = _child(ppr, "w:rPr")
+        if rpr is None:
+            rpr = self.editor.dom.createElement("w:rPr")
+            self.editor._insert_node(ppr, rpr)
+        marker = self.editor.dom.createElement(tag)
+        self.editor._insert_node(rpr, marker, rpr.firstChild)
+        self.editor._inject_attributes_to_nodes([marker])
+
+    def _mark_property(self, elem, property_tag, marker_tag):
+        """Get (creating if needed) the leading property element and optionally add a marker.
+
+        Insertions go through the editor's journal, so rollback() removes them.
+        """
+        prop = _child(elem, property_tag)
+        if prop is None:
+            prop = self.editor.dom.createElement(property_tag)
+            first = _first_element(elem)
+            # w:tblPrEx precedes w:trPr in a row
+            if first is not None and first.tagName == "w:tblPrEx":
+                first = _next_element(first)
+            self.editor._insert_node(elem, prop, first)
+        if marker_tag is not None and _child(prop, marker_tag) is None:
+            marker = self.editor.dom.createElement(marker_tag)
+            self.editor._insert_node(prop, marker)
+            self.editor._inject_attributes_to_nodes([marker])
+        return prop
+
+
+# ==================== Block helpers ====================
+
+
+def _blocks(container):
+    """Paragraphs, tables and rows directly inside a container."""
+    return [
+        child
+        for child in container.childNodes
+        if child.nodeType == child.ELEMENT_NODE and child.tagName in _BLOCK_TAGS
+    ]
+
+
+def _block_key(block):
+    """Content key used to align blocks; equal keys are treated as unchanged."""
+    if block.tagName == "w:tr":
+        return ("w:tr", "\x1f".join(_cell_text(cell) for cell in _row_cells(block)))
+    if block.tagName == "w:tbl":
+        rows = [_block_key(row)[1] for row in _blocks(block)]
+        return ("w:tbl", "\x1d".join(rows))
+    return (block.tagName, _paragraph_text(block))
+
+
+def _cell_text(cell):
+    return "\x1e".join(_paragraph_text(p) for p in cell.getElementsByTagName("w:p"))
+
+
+def _paragraph_text(elem):
+    """Visible text of an element: w:t, tabs and breaks, ignoring deleted text."""
+    parts = []
+    for node in elem.getElementsByTagName("*"):
+        if node.tagName == "w:t":
+            parts.extend(
+                child.data
+                for child in node.childNodes
+                if child.nodeType == child.TEXT_NODE
+            )
+        elif node.tagName == "w:tab":
+            parts.append("\t")
+        elif node.tagName in ("w:br", "w:cr"):
+            parts.append("\n")
+    return "".join(parts)
+
+
+def _row_cells(row):
+    """Cells of a table row."""
+    return [cell for cell in _element_children(row) if cell.tagName == "w:tc"]
+
+
+def _tracked_block_xml(block):
+    """XML for a copy of a paragraph, table or row, wrapped as a tracked insertion."""
+    copy = _clean_copy(block)
+    if copy.tagName == "w:p":
+        return DocxXMLEditor.suggest_paragraph(copy.toxml())
+
+    # Tables and rows: mark every row and every paragraph's runs as inserted
+    rows = copy.getElementsByTagName("w:tr")
+    for row in [copy] if copy.tagName == "w:tr" else rows:
+        trpr = _child(row, "w:trPr")
+        if trpr is None:
+            trpr = copy.ownerDocument.createElement("w:trPr")
+            first = _first_element(row)
+            if first is not None and first.tagName == "w:tblPrEx":
+                first = _next_element(first)
+            row.insertBefore(trpr, first)
+        trpr.appendChild(copy.ownerDocument.createElement("w:ins"))
+    for para in list(copy.getElementsByTagName("w:p")):
+        tracked = minidom.parseString(
+            f'<root xmlns:w="{_W_NAMESPACE}">'
+            f"{DocxXMLEditor.suggest_paragraph(para.toxml())}</root>"
+        ).documentElement.firstChild
+        para.parentNode.replaceChild(
+            copy.ownerDocument.importNode(tracked, True), para
+        )
+    return copy.toxml()
+
+
+_W_NAMESPACE = "http://schemas.openxmlformats.org/wordprocessingml/2006/main"
+
+
+def _clean_copy(block):
+    """Copy a block keeping only w: markup that does not reference other parts."""
+    document = minidom.parseString(f'<root xmlns:w="{_W_NAMESPACE}"/>')
+
+    def copy_node(node, parent):
+        if node.nodeType == node.TEXT_NODE:
+            if node.data.strip() or (
+                parent.tagName in ("w:t", "w:instrText") and node.data
+            ):
+                parent.appendChild(document.createTextNode(node.data))
+            return
+        if node.nodeType != node.ELEMENT_NODE or not node.tagName.startswith("w:"):
+            return
+        if node.tagName in _DROPPED_TAGS:
+            return
+        if node.tagName in _UNWRAPPED_TAGS:
+            for child in node.childNodes:
+                copy_node(child, parent)
+            return
+        if node.tagName == "w:r" and (
+            node.getElementsByTagName("w:drawing")
+            or node.getElementsByTagName("w:object")
+            or node.getElementsByTagName("w:pict")
+        ):
+            return
+        elem = document.createElement(node.tagName)
+        for name, value in node.attributes.items():
+            if name.startswith("w:") or name == "xml:space":
+                elem.setAttribute(name, value)
+        parent.appendChild(elem)
+        for child in node.childNodes:
+            copy_node(child, elem)
+
+    copy_node(block, document.documentElement)
+    return document.documentElement.firstChild
+
+
+def _escape(text):
+    return text.replace("&", "&amp;").replace("<", "&lt;").replace(">", "&gt;")
+
+
+# ==================== DOM helpers ====================
+
+
+def _element_children(elem):
+    return [c for c in elem.childNodes if c.nodeType == c.ELEMENT_NODE]
+
+
+def _child(elem, tag):
+    for child in elem.childNodes:
+        if child.nodeType == child.ELEMENT_NODE and child.tagName == tag:
+            return child
+    return None
+
+
+def _first_element(elem):
+    children = _element_children(elem)
+    return children[0] if children else None
+
+
+def _next_element(elem):
+    node = elem.nextSibling
+    while node is not None and node.nodeType != node.ELEMENT_NODE:
+        node = node.nextSibling
+    return node
+
+
+def _last_element(elem):
+    children = _element_children(elem)
+    return children[-1] if children else None
+
+
+# ==================== Diff ====================
+
+
+def _myers_opcodes(a, b):
+    """Diff two sequences with Myers' O(ND) algorithm.
+
+    Common prefixes and suffixes are trimmed first, so the cost is driven by the
+    size of the changed region rather than the length of the sequences.
+
+    Args:
+        a, b: Sequences of hashable items
+
+    Returns:
+        list: difflib-style opcodes (tag, i1, i2, j1, j2) with tags equal,
+        replace, delete and insert
+    """
+    n, m = len(a), len(b)
+    prefix = 0
+    while prefix < n and prefix < m and a[prefix] == b[prefix]:
+        prefix += 1
+    suffix = 0
+    while (
+        suffix < n - prefix
+        and suffix < m - prefix
+        and a[n - 1 - suffix] == b[m - 1 - suffix]
+    ):
+        suffix += 1
+
+    steps = _myers_steps(a[prefix : n - suffix], b[prefix : m - suffix])
+
+    opcodes = []
+
+    def add(tag, i1, i2, j1, j2):
+        if i1 == i2 and j1 == j2:
+            return
+        if opcodes and opcodes[-1][0] == tag:
+            opcodes[-1] = (tag, opcodes[-1][1], i2, opcodes[-1][3], j2)
+        elif opcodes and {opcodes[-1][0], tag} <= {"delete", "insert", "replace"}:
+            opcodes[-1] = ("replace", opcodes[-1][1], i2, opcodes[-1][3], j2)
+        else:
+            opcodes.append((tag, i1, i2, j1, j2))
+
+    add("equal", 0, prefix, 0, prefix)
+    for tag, i1, i2, j1, j2 in steps:
+        add(tag, i1 + prefix, i2 + prefix, j1 + prefix, j2 + prefix)
+    add("equal", n - suffix, n, m - suffix, m)
+    return opcodes
+
+
+def _myers_steps(a, b):
+    """Shortest edit script between a and b as steps over ranges.
+
+    Large inputs use the linear-space refinement of the algorithm: a point halfway
+    along a shortest path splits the problem in two until the halves are small
+    enough to backtrack through saved V arrays, so memory stays bounded by
+    _MYERS_TRACE_LIMIT rather than growing as O(D^2).
+    """
+    steps = []
+    _myers_range(a, 0, len(a), b, 0, len(b), steps)
+    return steps
+
+
+def _myers_range(a, alo, ahi, b, blo, bhi, steps):
+    """Append the steps turning a[alo:ahi] into b[blo:bhi]."""
+    prefix = 0
+    while (
+        alo + prefix < ahi
+        and blo + prefix < bhi
+        and a[alo + prefix] == b[blo + prefix]
+    ):
+        prefix += 1
+    steps.append(("equal", alo, alo + prefix, blo, blo + prefix))
+    alo += prefix
+    blo += prefix
+    suffix = 0
+    while (
+        suffix < ahi - alo
+        and suffix < bhi - blo
+        and a[ahi - 1 - suffix] == b[bhi - 1 - suffix]
+    ):
+        suffix += 1
+    ahi -= suffix
+    bhi -= suffix
+
+    if alo == ahi:
+        steps.append(("insert", alo, alo, blo, bhi))
+    elif blo == bhi:
+        steps.append(("delete", alo, ahi, blo, blo))
+    elif (ahi - alo) + (bhi - blo) <= _MYERS_TRACE_LIMIT:
+        steps.extend(
+            (tag, i1 + alo, i2 + alo, j1 + blo, j2 + blo)
+            for tag, i1, i2, j1, j2 in _myers_trace_steps(a[alo:ahi], b[blo:bhi])
+        )
+    else:
+        x, y = _myers_split(a, alo, ahi, b, blo, bhi)
+        _myers_range(a, alo, x, b, blo, y, steps)
+        _myers_range(a, x, ahi, b, y, bhi, steps)
+    steps.append(("equal", ahi, ahi + suffix, bhi, bhi + suffix))
+
+
+def _myers_split(a, alo, ahi, b, blo, bhi):
+    """A point about halfway along a shortest edit path through the given ranges.
+
+    Furthest-reaching paths are extended from both corners at once until they
+    overlap. The ranges must be non-empty and differ at both ends, so the point
+    is never a corner and both halves are smaller problems.
+    """
+    n, m = ahi - alo, bhi - blo
+    delta = n - m
+    odd = delta % 2 == 1
+    max_d = (n + m + 1) // 2
+    offset = max_d + 1
+    size = 2 * offset + 1
+    forward = [-1] * size
+    backward = [-1] * size
+    forward[offset + 1] = backward[offset + 1] = 0
+    # Diagonals skipped at either end once their paths have left the grid
+    forward_start = forward_end = backward_start = backward_end = 0
+
+    for d in range(max_d + 1):
+        for k in range(-d + forward_start, d + 1 - forward_end, 2):
+            if k == -d or (
+                k != d and forward[offset + k - 1] < forward[offset + k + 1]
+            ):
+                x = forward[offset + k + 1]
+            else:
+                x = forward[offset + k - 1] + 1
+            y = x - k
+            while x < n and y < m and a[alo + x] == b[blo + y]:
+                x += 1
+                y += 1
+            forward[offset + k] = x
+            if x > n:
+                forward_end += 2
+            elif y > m:
+                forward_start += 2
+            elif odd:
+                c = delta - k
+                reverse = backward[offset + c] if abs(c) <= max_d else -1
+                if reverse != -1 and x + reverse >= n:
+                    return alo + x, blo + y
+
+        # Same again from the far corner, with x and y counted backwards
+        for c in range(-d + backward_start, d + 1 - backward_end, 2):
+            if c == -d or (
+                c != d and backward[offset + c - 1] < backward[offset + c + 1]
+            ):
+                x = backward[offset + c + 1]
+            else:
+                x = backward[offset + c - 1] + 1
+            y = x - c
+            while x < n and y < m and a[ahi - 1 - x] == b[bhi - 1 - y]:
+                x += 1
+                y += 1
+            backward[offset + c] = x
+            if x > n:
+                backward_end += 2
+            elif y > m:
+                backward_start += 2
+            elif not odd:
+                k = delta - c
+                reached = forward[offset + k] if abs(k) <= max_d else -1
+                if reached != -1 and reached + x >= n:
+                    return alo + reached, blo + reached - k
+    raise AssertionError("unreachable")
+
+
+def _myers_trace_steps(a, b):
+    """Shortest edit script between a and b, saving V before each round to backtrack."""
+    n, m = len(a), len(b)
+    if n == 0 or m == 0:
+        return [("delete", 0, n, 0, 0)] if n else [("insert", 0, 0, 0, m)] if m else []
+
+    offset = n + m + 1
+    v = [0] * (2 * offset + 1)
+    trace = []
+    for d in range(n + m + 1):
+        trace.append(v[offset - d - 1 : offset + d + 2])
+        for k in range(-d, d + 1, 2):
+            if k == -d or (k != d and v[offset + k - 1] < v[offset + k + 1]):
+                x = v[offset + k + 1]
+            else:
+                x = v[offset + k - 1] + 1
+            y = x - k
+            while x < n and y < m and a[x] == b[y]:
+                x += 1
+                y += 1
+            v[offset + k] = x
+            if x >= n and y >= m:
+                return _myers_backtrack(trace, n, m)
+    raise AssertionError("unreachable")
+
+
+def _myers_backtrack(trace, n, m):
+    """Recover the edit steps from the V arrays saved before each round."""
+    steps = []
+    x, y = n, m
+    for d in range(len(trace) - 1, -1, -1):
+        saved = trace[d]
+        # saved holds V for diagonals -d-1 .. d+1
+        k = x - y
+        if k == -d or (k != d and saved[k + d] < saved[k + d + 2]):
+            prev_k = k + 1
+        else:
+            prev_k = k - 1
+        prev_x = saved[prev_k + d + 1]
+        prev_y = prev_x - prev_k
+        while x > prev_x and y > prev_y:
+            steps.append(("equal", x - 1, x, y - 1, y))
+            x -= 1
+            y -= 1
+        if d > 0:
+            if x == prev_x:
+                steps.append(("insert", x, x, prev_y, y))
+            else:
+                steps.append(("delete", prev_x, x, y, y))
+        x, y = prev_x, prev_y
+    steps.reverse()
+    return steps
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,146 @@
+import tempfile
+import unittest
+import zipfile
+from pathlib import Path
+from unittest import mock
+
+from defusedxml import minidom
+
+from ooxml.scripts.pack import pack_document
+
+from . import compare
+from .compare import _Comparer, _myers_opcodes, compare_documents
+from .document import Document
+from .document_test import NAMESPACES, write_unpacked_document
+
+
+def paragraphs(*texts):
+    return "".join(f"<w:p><w:r><w:t>{text}</w:t></w:r></w:p>" for text in texts)
+
+
+# Currently this is not run automatically in CI; it's just for documentation and manual checking.
+class TestCompareDocuments(unittest.TestCase):
+    def setUp(self):
+        temp_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(temp_dir.cleanup)
+        self.temp_path = Path(temp_dir.name)
+
+    def make_docx(self, name, body):
+        unpacked = write_unpacked_document(self.temp_path / f"{name}-unpacked", body)
+        Document(unpacked, rsid="00AB12CD").save(validate=False)
+        path = self.temp_path / f"{name}.docx"
+        pack_document(unpacked, path)
+        return path
+
+    def compare(self, old_body, new_body):
+        """Redline two bodies with validation; return the stats and output DOM."""
+        output = self.temp_path / "redline.docx"
+        stats = compare_documents(
+            self.make_docx("original", old_body),
+            self.make_docx("modified", new_body),
+            output,
+            author="Reviewer",
+        )
+        with zipfile.ZipFile(output) as zf:
+            return stats, minidom.parseString(zf.read("word/document.xml"))
+
+    def texts(self, dom, tag):
+        return [
+            "".join(node.data for node in elem.childNodes)
+            for elem in dom.getElementsByTagName(tag)
+        ]
+
+    def test_word_level_diff(self):
+        stats, dom = self.compare(
+            paragraphs("The Company shall pay the fee within 30 days."),
+            paragraphs("The Supplier shall pay the fee within 45 days."),
+        )
+        self.assertEqual(stats, {"modified": 1, "inserted": 0, "deleted": 0})
+        self.assertEqual(self.texts(dom, "w:delText"), ["Company", "30"])
+        self.assertEqual(
+            [
+                "".join(self.texts(ins, "w:t"))
+                for ins in dom.getElementsByTagName("w:ins")
+            ],
+            ["Supplier", "45"],
+        )
+        for change in dom.getElementsByTagName("w:ins") + dom.getElementsByTagName(
+            "w:del"
+        ):
+            self.assertEqual(change.getAttribute("w:author"), "Reviewer")
+
+    def test_paragraph_insert_and_delete(self):
+        stats, dom = self.compare(
+            paragraphs("Alpha clause.", "Beta clause.", "Gamma clause."),
+            paragraphs("Alpha clause.", "Gamma clause.", "Delta clause."),
+        )
+        self.assertEqual(stats, {"modified": 0, "inserted": 1, "deleted": 1})
+        body_paragraphs = dom.getElementsByTagName("w:p")
+        self.assertEqual(len(body_paragraphs), 4)
+        deleted, inserted = body_paragraphs[1], body_paragraphs[3]
+        self.assertEqual(self.texts(deleted, "w:delText"), ["Beta clause."])
+        self.assertEqual(
+            len(deleted.getElementsByTagName("w:pPr")[0].getElementsByTagName("w:del")),
+            1,
+        )
+        self.assertEqual(self.texts(inserted, "w:t"), ["Delta clause."])
+
+    def test_identical_documents_have_no_changes(self):
+        stats, dom = self.compare(
+            paragraphs("Alpha clause.", "Beta clause."),
+            paragraphs("Alpha clause.", "Beta clause."),
+        )
+        self.assertEqual(stats, {"modified": 0, "inserted": 0, "deleted": 0})
+        self.assertEqual(dom.getElementsByTagName("w:ins"), [])
+        self.assertEqual(dom.getElementsByTagName("w:del"), [])
+
+    def test_rollback_removes_paragraph_mark_changes(self):
+        doc = Document.open_docx(
+            self.make_docx("original", paragraphs("Alpha clause.", "Beta clause."))
+        )
+        editor = doc["word/document.xml"]
+        before = editor.dom.toxml()
+        new_dom = minidom.parseString(
+            f"<w:document {NAMESPACES}><w:body>"
+            f"{paragraphs('Alpha clause.')}</w:body></w:document>"
+        )
+        checkpoint = editor.checkpoint()
+        _Comparer(editor).compare_container(
+            editor.get_node(tag="w:body"), new_dom.getElementsByTagName("w:body")[0]
+        )
+        self.assertNotEqual(editor.dom.toxml(), before)
+        editor.rollback(checkpoint)
+        self.assertEqual(editor.dom.toxml(), before)
+
+
+class TestMyersOpcodes(unittest.TestCase):
+    def check(self, a, b):
+        """Check the opcodes rebuild b from a with a shortest edit script."""
+        opcodes = _myers_opcodes(a, b)
+        rebuilt = []
+        edits = 0
+        for tag, i1, i2, j1, j2 in opcodes:
+            if tag == "equal":
+                self.assertEqual(a[i1:i2], b[j1:j2])
+            else:
+                edits += (i2 - i1) + (j2 - j1)
+            rebuilt.extend(b[j1:j2])
+        self.assertEqual(rebuilt, list(b))
+        return edits
+
+    def test_shortest_edit_script(self):
+        self.assertEqual(self.check(list("ABCABBA"), list("CBABAC")), 5)
+        self.assertEqual(self.check([], list("abc")), 3)
+        self.assertEqual(self.check(list("abc"), []), 3)
+        self.assertEqual(self.check(list("abc"), list("abc")), 0)
+
+    def test_split_ranges_match_traced_ranges(self):
+        a = list("the quick brown fox jumps over the lazy dog" * 3)
+        b = list("the quick red fox leaps over a lazy cat" * 3)
+        traced = self.check(a, b)
+        with mock.patch.object(compare, "_MYERS_TRACE_LIMIT", 0):
+            self.assertEqual(self.check(a, b), traced)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -27,22 +27,89 @@ Usage:
 """
 
 import html
+import io
+import os
 import random
+import re
 import shutil
+import sys
 import tempfile
+import zipfile
 from datetime import datetime, timezone
 from pathlib import Path
+from xml.parsers import expat
 
 from defusedxml import minidom
-from ooxml.scripts.pack import pack_document
+from ooxml.scripts.pack import (
+    compress_type_for,
+    condense_xml_bytes,
+    copy_member_raw,
+    pack_document,
+)
 from ooxml.scripts.validation.docx import DOCXSchemaValidator
 from ooxml.scripts.validation.redlining import RedliningValidator
 
-from .utilities import XMLEditor
+from .utilities import XMLEditor, _forbid_entity_declarations, _write_bytes_atomic
 
 # Path to template files
 TEMPLATE_DIR = Path(__file__).parent / "templates"
 
+# Parts Document reads or checks for during setup; extracted eagerly by open_docx()
+_CORE_PARTS = (
+    "[Content_Types].xml",
+    "word/document.xml",
+    "word/_rels/document.xml.rels",
+    "word/settings.xml",
+    "word/people.xml",
+    "word/comments.xml",
+    "word/commentsExtended.xml",
+    "word/commentsIds.xml",
+    "word/commentsExtensible.xml",
+)
+
+# Relationship types (last path segment) of parts holding document stories
+_STORY_RELATIONSHIP_TYPES = ("header", "footer", "footnotes", "endnotes", "comments")
+
+# Parts that carry comment paraIds/durableIds without being stories themselves
+_COMMENT_ID_PARTS = (
+    "word/commentsExtended.xml",
+    "word/commentsIds.xml",
+    "word/commentsExtensible.xml",
+)
+
+# Tracked change elements reported by revisions(), keyed by tag -> revision type
+_REVISION_TAGS = {
+    "w:ins": "ins",
+    "w:del": "del",
+    "w:moveFrom": "moveFrom",
+    "w:moveTo": "moveTo",
+    "w:rPrChange": "rPrChange",
+}
+
+# Revision elements whose w:id values share one ID space across the package
+_CHANGE_TAGS = frozenset(
+    (
+        "w:ins",
+        "w:del",
+        "w:moveFrom",
+        "w:moveTo",
+        "w:moveFromRangeStart",
+        "w:moveToRangeStart",
+        "w:rPrChange",
+        "w:pPrChange",
+        "w:sectPrChange",
+        "w:tblPrChange",
+        "w:tblPrExChange",
+        "w:tblGridChange",
+        "w:trPrChange",
+        "w:tcPrChange",
+        "w:numberingChange",
+        "w:cellIns",
+        "w:cellDel",
+        "w:cellMerge",
+    )
+)
+
 
 class DocxXMLEditor(XMLEditor):
     """XMLEditor that automatically applies RSID, author, and date to new elements.
@@ -57,7 +124,12 @@ class DocxXMLEditor(XMLEditor):
     """
 
     def __init__(
-        self, xml_path, rsid: str, author: str = "GLM", initials: str = "C"
+        self,
+        xml_path,
+        rsid: str,
+        author: str = "GLM",
+        initials: str = "C",
+        ids=None,
     ):
         """Initialize with required RSID and optional author.
 
@@ -66,31 +138,37 @@ class DocxXMLEditor(XMLEditor):
             rsid: RSID to automatically apply to new elements
             author: Author name for tracked changes and comments (default: "GLM")
             initials: Author initials (default: "C")
+            ids: Optional ID registry shared with other parts of the package. If not
+                 provided, one is built from this file on first use.
         """
         super().__init__(xml_path)
         self.rsid = rsid
         self.author = author
         self.initials = initials
+        self._ids = ids
+        # Tracked change element -> parsed w:date, built on first revisions() call
+        self._revisions = None
+        # (journal length, entries in document order) as of the last revisions() call
+        self._revision_entries = None
+
+    def _id_registry(self):
+        """Get the ID registry, scanning this file's DOM if none was shared."""
+        if self._ids is None:
+            self._ids = _IdRegistry()
+            for elem in self.dom.getElementsByTagName("*"):
+                self._ids.observe(elem.tagName, dict(elem.attributes.items()))
+        return self._ids
 
     def _get_next_change_id(self):
-        """Get the next available change ID by checking all tracked change elements."""
-        max_id = -1
-        for tag in ("w:ins", "w:del"):
-            elements = self.dom.getElementsByTagName(tag)
-            for elem in elements:
-                change_id = elem.getAttribute("w:id")
-                if change_id:
-                    try:
-                        max_id = max(max_id, int(change_id))
-                    except ValueError:
-                        pass
-        return max_id + 1
+        """Get the next available change ID (without reserving it)."""
+        return self._id_registry().next_change_id
 
     def _ensure_w16du_namespace(self):
         """Ensure w16du namespace is declared on the root element."""
         root = self.dom.documentElement
         if not root.hasAttribute("xmlns:w16du"):  # type: ignore
-            root.setAttribute(  # type: ignore
+            self._set_attribute(
+                root,
                 "xmlns:w16du",
                 "http://schemas.microsoft.com/office/word/2023/wordml/word16du",
             )
@@ -99,7 +177,8 @@ class DocxXMLEditor(XMLEditor):
         """Ensure w16cex namespace is declared on the root element."""
         root = self.dom.documentElement
         if not root.hasAttribute("xmlns:w16cex"):  # type: ignore
-            root.setAttribute(  # type: ignore
+            self._set_attribute(
+                root,
                 "xmlns:w16cex",
                 "http://schemas.microsoft.com/office/word/2018/wordml/cex",
             )
@@ -108,7 +187,8 @@ class DocxXMLEditor(XMLEditor):
         """Ensure w14 namespace is declared on the root element."""
         root = self.dom.documentElement
         if not root.hasAttribute("xmlns:w14"):  # type: ignore
-            root.setAttribute(  # type: ignore
+            self._set_attribute(
+                root,
                 "xmlns:w14",
                 "http://schemas.microsoft.com/office/word/2010/wordml",
             )
@@ -130,6 +210,7 @@ class DocxXMLEditor(XMLEditor):
         from datetime import datetime, timezone
 
         timestamp = datetime.now(timezone.utc).strftime("%Y-%m-%dT%H:%M:%SZ")
+        ids = self._id_registry()
 
         def is_inside_deletion(elem):
             """Check if element is inside a w:del element."""
@@ -142,56 +223,62 @@ class DocxXMLEditor(XMLEditor):
 
         def add_rsid_to_p(elem):
             if not elem.hasAttribute("w:rsidR"):
-                elem.setAttribute("w:rsidR", self.rsid)
+                self._set_attribute(elem, "w:rsidR", self.rsid)
             if not elem.hasAttribute("w:rsidRDefault"):
-                elem.setAttribute("w:rsidRDefault", self.rsid)
+                self._set_attribute(elem, "w:rsidRDefault", self.rsid)
             if not elem.hasAttribute("w:rsidP"):
-                elem.setAttribute("w:rsidP", self.rsid)
+                self._set_attribute(elem, "w:rsidP", self.rsid)
             # Add w14:paraId and w14:textId if not present
-            if not elem.hasAttribute("w14:paraId"):
+            if elem.hasAttribute("w14:paraId"):
+                ids.observe("w:p", {"w14:paraId": elem.getAttribute("w14:paraId")})
+            else:
                 self._ensure_w14_namespace()
-                elem.setAttribute("w14:paraId", _generate_hex_id())
+                self._set_attribute(elem, "w14:paraId", ids.new_para_id())
             if not elem.hasAttribute("w14:textId"):
                 self._ensure_w14_namespace()
-                elem.setAttribute("w14:textId", _generate_hex_id())
+                self._set_attribute(elem, "w14:textId", ids.new_text_id())
 
         def add_rsid_to_r(elem):
             # Use w:rsidDel for <w:r> inside <w:del>, otherwise w:rsidR
             if is_inside_deletion(elem):
                 if not elem.hasAttribute("w:rsidDel"):
-                    elem.setAttribute("w:rsidDel", self.rsid)
+                    self._set_attribute(elem, "w:rsidDel", self.rsid)
             else:
                 if not elem.hasAttribute("w:rsidR"):
-                    elem.setAttribute("w:rsidR", self.rsid)
+                    self._set_attribute(elem, "w:rsidR", self.rsid)
 
         def add_tracked_change_attrs(elem):
-            # Auto-assign w:id if not present
-            if not elem.hasAttribute("w:id"):
-                elem.setAttribute("w:id", str(self._get_next_change_id()))
+            # Auto-assign w:id if not present; explicit IDs are recorded so they
+            # are never handed out again
+            if elem.hasAttribute("w:id"):
+                ids.observe(elem.tagName, {"w:id": elem.getAttribute("w:id")})
+            else:
+                self._set_attribute(elem, "w:id", str(ids.allocate_change_ids()))
             if not elem.hasAttribute("w:author"):
-                elem.setAttribute("w:author", self.author)
+                self._set_attribute(elem, "w:author", self.author)
             if not elem.hasAttribute("w:date"):
-                elem.setAttribute("w:date", timestamp)
+                self._set_attribute(elem, "w:date", timestamp)
             # Add w16du:dateUtc for tracked changes (same as w:date since we generate UTC timestamps)
             if elem.tagName in ("w:ins", "w:del") and not elem.hasAttribute(
                 "w16du:dateUtc"
             ):
                 self._ensure_w16du_namespace()
-                elem.setAttribute("w16du:dateUtc", timestamp)
+                self._set_attribute(elem, "w16du:dateUtc", timestamp)
+            self._record_revision(elem)
 
         def add_comment_attrs(elem):
             if not elem.hasAttribute("w:author"):
-                elem.setAttribute("w:author", self.author)
+                self._set_attribute(elem, "w:author", self.author)
             if not elem.hasAttribute("w:date"):
-                elem.setAttribute("w:date", timestamp)
+                self._set_attribute(elem, "w:date", timestamp)
             if not elem.hasAttribute("w:initials"):
-                elem.setAttribute("w:initials", self.initials)
+                self._set_attribute(elem, "w:initials", self.initials)
 
         def add_comment_extensible_date(elem):
             # Add w16cex:dateUtc for comment extensible elements
             if not elem.hasAttribute("w16cex:dateUtc"):
                 self._ensure_w16cex_namespace()
-                elem.setAttribute("w16cex:dateUtc", timestamp)
+                self._set_attribute(elem, "w16cex:dateUtc", timestamp)
 
         def add_xml_space_to_t(elem):
             # Add xml:space="preserve" to w:t if text has leading/trailing whitespace
@@ -202,7 +289,7 @@ class DocxXMLEditor(XMLEditor):
                 text = elem.firstChild.data
                 if text and (text[0].isspace() or text[-1].isspace()):
                     if not elem.hasAttribute("xml:space"):
-                        elem.setAttribute("xml:space", "preserve")
+                        self._set_attribute(elem, "xml:space", "preserve")
 
         for node in nodes:
             if node.nodeType != node.ELEMENT_NODE:
@@ -217,6 +304,8 @@ class DocxXMLEditor(XMLEditor):
                 add_xml_space_to_t(node)
             elif node.tagName in ("w:ins", "w:del"):
                 add_tracked_change_attrs(node)
+            elif node.tagName in _REVISION_TAGS:
+                self._record_revision(node)
             elif node.tagName == "w:comment":
                 add_comment_attrs(node)
             elif node.tagName == "w16cex:commentExtensible":
@@ -232,6 +321,9 @@ class DocxXMLEditor(XMLEditor):
             for tag in ("w:ins", "w:del"):
                 for elem in node.getElementsByTagName(tag):
                     add_tracked_change_attrs(elem)
+            for tag in ("w:moveFrom", "w:moveTo", "w:rPrChange"):
+                for elem in node.getElementsByTagName(tag):
+                    self._record_revision(elem)
             for elem in node.getElementsByTagName("w:comment"):
                 add_comment_attrs(elem)
             for elem in node.getElementsByTagName("w16cex:commentExtensible"):
@@ -261,6 +353,17 @@ class DocxXMLEditor(XMLEditor):
         self._inject_attributes_to_nodes(nodes)
         return nodes
 
+    def rollback(self, checkpoint=0):
+        """Undo every edit made since a checkpoint; see XMLEditor.rollback().
+
+        IDs handed out by the undone edits stay reserved, so they are never reused.
+        Comments also edit the comment parts; use Document.rollback() to undo them.
+        """
+        super().rollback(checkpoint)
+        # Indexed revisions may belong to nodes that were just removed
+        self._revisions = None
+        self._revision_entries = None
+
     def revert_insertion(self, elem):
         """Reject an insertion by wrapping its content in a deletion.
 
@@ -308,31 +411,14 @@ class DocxXMLEditor(XMLEditor):
             # Create deletion wrapper
             del_wrapper = self.dom.createElement("w:del")
 
-            # Process each run
+            # Convert w:t → w:delText and w:rsidR → w:rsidDel
             for run in runs:
-                # Convert w:t → w:delText and w:rsidR → w:rsidDel
-                if run.hasAttribute("w:rsidR"):
-                    run.setAttribute("w:rsidDel", run.getAttribute("w:rsidR"))
-                    run.removeAttribute("w:rsidR")
-                elif not run.hasAttribute("w:rsidDel"):
-                    run.setAttribute("w:rsidDel", self.rsid)
-
-                for t_elem in list(run.getElementsByTagName("w:t")):
-                    del_text = self.dom.createElement("w:delText")
-                    # Copy ALL child nodes (not just firstChild) to handle entities
-                    while t_elem.firstChild:
-                        del_text.appendChild(t_elem.firstChild)
-                    for i in range(t_elem.attributes.length):
-                        attr = t_elem.attributes.item(i)
-                        del_text.setAttribute(attr.name, attr.value)
-                    t_elem.parentNode.replaceChild(del_text, t_elem)
+                self._mark_run_deleted(run)
 
-            # Move all children from ins to del wrapper
-            while ins_elem.firstChild:
-                del_wrapper.appendChild(ins_elem.firstChild)
-
-            # Add del wrapper back to ins
-            ins_elem.appendChild(del_wrapper)
+            # Move all children from ins to del wrapper, then add it back to ins
+            for child in list(ins_elem.childNodes):
+                self._insert_node(del_wrapper, child)
+            self._insert_node(ins_elem, del_wrapper)
 
             # Inject attributes to the deletion wrapper
             self._inject_attributes_to_nodes([del_wrapper])
@@ -500,31 +586,13 @@ class DocxXMLEditor(XMLEditor):
             if elem.getElementsByTagName("w:delText"):
                 raise ValueError("w:r element already contains w:delText")
 
-            # Convert w:t → w:delText
-            for t_elem in list(elem.getElementsByTagName("w:t")):
-                del_text = self.dom.createElement("w:delText")
-                # Copy ALL child nodes (not just firstChild) to handle entities
-                while t_elem.firstChild:
-                    del_text.appendChild(t_elem.firstChild)
-                # Preserve attributes like xml:space
-                for i in range(t_elem.attributes.length):
-                    attr = t_elem.attributes.item(i)
-                    del_text.setAttribute(attr.name, attr.value)
-                t_elem.parentNode.replaceChild(del_text, t_elem)
-
-            # Update run attributes: w:rsidR → w:rsidDel
-            if elem.hasAttribute("w:rsidR"):
-                elem.setAttribute("w:rsidDel", elem.getAttribute("w:rsidR"))
-                elem.removeAttribute("w:rsidR")
-            elif not elem.hasAttribute("w:rsidDel"):
-                elem.setAttribute("w:rsidDel", self.rsid)
+            # Convert w:t → w:delText and w:rsidR → w:rsidDel
+            self._mark_run_deleted(elem)
 
             # Wrap in w:del
             del_wrapper = self.dom.createElement("w:del")
-            parent = elem.parentNode
-            parent.insertBefore(del_wrapper, elem)
-            parent.removeChild(elem)
-            del_wrapper.appendChild(elem)
+            self._insert_node(elem.parentNode, del_wrapper, elem)
+            self._insert_node(del_wrapper, elem)
 
             # Inject attributes to the deletion wrapper
             self._inject_attributes_to_nodes([del_wrapper])
@@ -547,42 +615,23 @@ class DocxXMLEditor(XMLEditor):
 
                 if not rPr_list:
                     rPr = self.dom.createElement("w:rPr")
-                    pPr.appendChild(rPr)
+                    self._insert_node(pPr, rPr)
                 else:
                     rPr = rPr_list[0]
 
                 # Add <w:del/> marker
                 del_marker = self.dom.createElement("w:del")
-                rPr.insertBefore(
-                    del_marker, rPr.firstChild
-                ) if rPr.firstChild else rPr.appendChild(del_marker)
-
-            # Convert w:t → w:delText in all runs
-            for t_elem in list(elem.getElementsByTagName("w:t")):
-                del_text = self.dom.createElement("w:delText")
-                # Copy ALL child nodes (not just firstChild) to handle entities
-                while t_elem.firstChild:
-                    del_text.appendChild(t_elem.firstChild)
-                # Preserve attributes like xml:space
-                for i in range(t_elem.attributes.length):
-                    attr = t_elem.attributes.item(i)
-                    del_text.setAttribute(attr.name, attr.value)
-                t_elem.parentNode.replaceChild(del_text, t_elem)
-
-            # Update run attributes: w:rsidR → w:rsidDel
+                self._insert_node(rPr, del_marker, rPr.firstChild)
+
+            # Convert w:t → w:delText and w:rsidR → w:rsidDel in all runs
             for run in elem.getElementsByTagName("w:r"):
-                if run.hasAttribute("w:rsidR"):
-                    run.setAttribute("w:rsidDel", run.getAttribute("w:rsidR"))
-                    run.removeAttribute("w:rsidR")
-                elif not run.hasAttribute("w:rsidDel"):
-                    run.setAttribute("w:rsidDel", self.rsid)
+                self._mark_run_deleted(run)
 
             # Wrap all non-pPr children in <w:del>
             del_wrapper = self.dom.createElement("w:del")
             for child in [c for c in elem.childNodes if c.nodeName != "w:pPr"]:
-                elem.removeChild(child)
-                del_wrapper.appendChild(child)
-            elem.appendChild(del_wrapper)
+                self._insert_node(del_wrapper, child)
+            self._insert_node(elem, del_wrapper)
 
             # Inject attributes to the deletion wrapper
             self._inject_attributes_to_nodes([del_wrapper])
@@ -592,25 +641,506 @@ class DocxXMLEditor(XMLEditor):
         else:
             raise ValueError(f"Element must be w:r or w:p, got {elem.nodeName}")
 
+    def replace_all(self, pattern, replacement, track=True):
+        """Replace every regex match in the text of this part, optionally as tracked changes.
+
+        Matches may span several runs. Runs are split at the match boundaries, the
+        matched text is wrapped in <w:del> (w:t → w:delText) and the replacement is
+        added in a <w:ins> run that copies the w:rPr of the first matched run.
+        All paragraphs are processed in a single traversal of the DOM.
+
+        Only plain text runs (w:rPr + w:t) that are direct children of a paragraph or
+        hyperlink are searched. Content already inside tracked changes, fields,
+        tabs or breaks is never matched and splits the searchable text.
+
+        Args:
+            pattern: Regex string or compiled pattern
+            replacement: Replacement string (supports backreferences like \\1)
+                         or a callable taking the match and returning a string
+            track: If True, emit w:del/w:ins tracked changes; otherwise edit text in place
+
+        Returns:
+            int: Number of replacements made
+
+        Example:
+            count = doc["word/document.xml"].replace_all(r"\\b30 days\\b", "45 days")
+        """
+        regex = re.compile(pattern) if isinstance(pattern, str) else pattern
+        next_change_id = self._get_next_change_id() if track else None
+        count = 0
+
+        for para in list(self.dom.getElementsByTagName("w:p")):
+            containers = [para] + [
+                child
+                for child in para.childNodes
+                if child.nodeType == child.ELEMENT_NODE
+                and child.tagName == "w:hyperlink"
+            ]
+            for container in containers:
+                for segment in self._text_segments(container):
+                    text = "".join(self._run_text(run) for run in segment)
+                    matches = [m for m in regex.finditer(text) if m.end() > m.start()]
+                    # Replace from the end so earlier offsets stay valid
+                    for match in reversed(matches):
+                        new_text = (
+                            replacement(match)
+                            if callable(replacement)
+                            else match.expand(replacement)
+                        )
+                        runs = self._isolate_match_runs(
+                            segment, match.start(), match.end()
+                        )
+                        if track:
+                            self._track_replacement(runs, new_text, next_change_id)
+                            next_change_id += 2
+                        else:
+                            self._replace_runs_text(runs, new_text)
+                        count += 1
+
+        return count
+
+    def revisions(self, author=None, since=None, until=None):
+        """List the tracked changes in this part.
+
+        The index of w:ins, w:del, w:moveFrom, w:moveTo and w:rPrChange elements is
+        built in one pass on first call and then kept current as this editor creates
+        tracked changes. The entries (with their text) are kept until the next edit,
+        so later calls only filter them.
+
+        Args:
+            author: Only include changes by this author
+            since: Only include changes dated at or after this datetime or ISO string
+            until: Only include changes dated at or before this datetime or ISO string
+
+        Returns:
+            list[dict]: One entry per change, in document order, with keys id (int,
+            or None if w:id is missing or not a number), type (ins, del, moveFrom,
+            moveTo, rPrChange), author, date, paragraph (enclosing w:p), para_id,
+            text (flattened) and node
+
+        Example:
+            for rev in doc["word/document.xml"].revisions(author="Jane Smith"):
+                print(rev["type"], rev["date"], rev["text"])
+        """
+        if self._revisions is None:
+            self._revisions = {}
+            for elem in self.dom.getElementsByTagName("*"):
+                if elem.tagName in _REVISION_TAGS:
+                    self._record_revision(elem)
+        if (
+            self._revision_entries is None
+            or self._revision_entries[0] != self.checkpoint()
+        ):
+            self._revision_entries = (self.checkpoint(), self._sorted_revisions())
+
+        since = _parse_revision_date(since)
+        until = _parse_revision_date(until)
+        entries = []
+        for entry in self._revision_entries[1]:
+            date = entry["date"]
+            if author is not None and entry["author"] != author:
+                continue
+            if (since or until) and date is None:
+                continue
+            if (since and date < since) or (until and date > until):
+                continue
+            entries.append(dict(entry))
+        return entries
 
-def _generate_hex_id() -> str:
-    """Generate random 8-character hex ID for para/durable IDs.
+    def _sorted_revisions(self):
+        """Describe the indexed tracked changes still in the DOM, in document order.
 
-    Values are constrained to be less than 0x7FFFFFFF per OOXML spec:
-    - paraId must be < 0x80000000
-    - durableId must be < 0x7FFFFFFF
-    We use the stricter constraint (0x7FFFFFFF) for both.
+        Detached nodes are dropped from the index. Child positions are looked up
+        once per parent, so ordering costs about one walk to the root per change.
+        """
+        child_indexes = {}
+        keyed = []
+        for node, date in list(self._revisions.items()):
+            path = []
+            child = node
+            while child.parentNode is not None:
+                parent = child.parentNode
+                indexes = child_indexes.get(parent)
+                if indexes is None:
+                    indexes = {
+                        sibling: index
+                        for index, sibling in enumerate(parent.childNodes)
+                    }
+                    child_indexes[parent] = indexes
+                path.append(indexes[child])
+                child = parent
+            if child is not self.dom:
+                del self._revisions[node]
+                continue
+            path.reverse()
+            keyed.append((path, self._revision_entry(node, date)))
+        keyed.sort(key=lambda item: item[0])
+        return [entry for _, entry in keyed]
+
+    def _record_revision(self, elem):
+        """Add a tracked change element to the revision index once it is built."""
+        if self._revisions is not None:
+            self._revisions[elem] = _parse_revision_date(elem.getAttribute("w:date"))
+            self._revision_entries = None
+
+    def _revision_entry(self, node, date):
+        """Describe one indexed tracked change."""
+        paragraph = node.parentNode
+        while paragraph is not None and getattr(paragraph, "tagName", None) != "w:p":
+            paragraph = paragraph.parentNode
+        # Formatting changes sit in w:rPr, so report the text of the run they format
+        scope = node.parentNode.parentNode if node.tagName == "w:rPrChange" else node
+        text = "".join(
+            child.data
+            for elem in scope.getElementsByTagName("*")
+            if elem.tagName in ("w:t", "w:delText")
+            for child in elem.childNodes
+            if child.nodeType == child.TEXT_NODE
+        )
+        try:
+            change_id = int(node.getAttribute("w:id"))
+        except ValueError:
+            change_id = None
+        return {
+            "id": change_id,
+            "type": _REVISION_TAGS[node.tagName],
+            "author": node.getAttribute("w:author"),
+            "date": date,
+            "paragraph": paragraph,
+            "para_id": paragraph.getAttribute("w14:paraId") if paragraph else "",
+            "text": text,
+            "node": node,
+        }
+
+    def _is_attached(self, node):
+        """Check that a node is still part of this editor's DOM."""
+        while node.parentNode is not None:
+            node = node.parentNode
+        return node is self.dom
+
+    # Elements that may sit between two runs without interrupting their text
+    _TRANSPARENT_RUN_SIBLINGS = ("w:proofErr", "w:bookmarkStart", "w:bookmarkEnd")
+
+    def _text_segments(self, container):
+        """Split the direct children of a paragraph into runs of contiguous plain text."""
+        segments = []
+        current = []
+        for child in container.childNodes:
+            if child.nodeType != child.ELEMENT_NODE:
+                continue
+            if child.tagName == "w:r" and self._is_plain_text_run(child):
+                current.append(child)
+            elif child.tagName not in self._TRANSPARENT_RUN_SIBLINGS:
+                if current:
+                    segments.append(current)
+                current = []
+        if current:
+            segments.append(current)
+        return segments
+
+    @staticmethod
+    def _is_plain_text_run(run):
+        """Check if a run holds nothing but optional w:rPr and a single w:t."""
+        tags = [
+            child.tagName
+            for child in run.childNodes
+            if child.nodeType == child.ELEMENT_NODE
+        ]
+        return tags in (["w:t"], ["w:rPr", "w:t"])
+
+    @staticmethod
+    def _run_text_element(run):
+        return run.getElementsByTagName("w:t")[0]
+
+    def _run_text(self, run):
+        t_elem = self._run_text_element(run)
+        return "".join(
+            node.data for node in t_elem.childNodes if node.nodeType == node.TEXT_NODE
+        )
+
+    def _set_run_text(self, run, text):
+        """Replace the text of a plain run, keeping xml:space consistent."""
+        t_elem = self._run_text_element(run)
+        for child in list(t_elem.childNodes):
+            self._remove_node(child)
+        self._insert_node(t_elem, self.dom.createTextNode(text))
+        if text and (text[0].isspace() or text[-1].isspace()):
+            self._set_attribute(t_elem, "xml:space", "preserve")
+
+    def _split_run(self, run, offset):
+        """Split a plain run at a character offset and return the second half.
+
+        The original node keeps the first half so references to it stay valid.
+        """
+        text = self._run_text(run)
+        tail = run.cloneNode(True)
+        self._set_run_text(run, text[:offset])
+        self._set_run_text(tail, text[offset:])
+        self._insert_node(run.parentNode, tail, run.nextSibling)
+        return tail
+
+    def _isolate_match_runs(self, segment, start, end):
+        """Split runs of a text segment so [start, end) maps onto whole runs.
+
+        Args:
+            segment: List of plain runs (updated in place when runs are split)
+            start, end: Character offsets into the concatenated segment text
+
+        Returns:
+            list: The runs that together hold exactly the matched text
+        """
+        matched = []
+        pos = 0
+        index = 0
+        while index < len(segment):
+            run = segment[index]
+            run_start = pos
+            if run_start >= end:
+                break
+            length = len(self._run_text(run))
+            run_end = pos = run_start + length
+            if run_end <= start or length == 0:
+                index += 1
+                continue
+            if run_end > end:
+                segment.insert(index + 1, self._split_run(run, end - run_start))
+                run_end = end
+            if run_start < start:
+                run = self._split_run(run, start - run_start)
+                index += 1
+                segment.insert(index, run)
+            matched.append(run)
+            index += 1
+        return matched
+
+    def _track_replacement(self, runs, new_text, change_id):
+        """Wrap matched runs in w:del and add the replacement in a following w:ins."""
+        first, last = runs[0], runs[-1]
+        parent = first.parentNode
+        rpr_list = [
+            child
+            for child in first.childNodes
+            if child.nodeType == child.ELEMENT_NODE and child.tagName == "w:rPr"
+        ]
+
+        del_wrapper = self.dom.createElement("w:del")
+        del_wrapper.setAttribute("w:id", str(change_id))
+        self._insert_node(parent, del_wrapper, first)
+        node = first
+        while node is not None:
+            following = node.nextSibling
+            self._insert_node(del_wrapper, node)
+            if node is last:
+                break
+            node = following
+
+        for run in runs:
+            self._mark_run_deleted(run)
+
+        new_nodes = [del_wrapper]
+        if new_text:
+            ins_elem = self.dom.createElement("w:ins")
+            ins_elem.setAttribute("w:id", str(change_id + 1))
+            new_run = self.dom.createElement("w:r")
+            if rpr_list:
+                new_run.appendChild(rpr_list[0].cloneNode(True))
+            new_run.appendChild(self.dom.createElement("w:t"))
+            self._set_run_text(new_run, new_text)
+            ins_elem.appendChild(new_run)
+            self._insert_node(parent, ins_elem, del_wrapper.nextSibling)
+            new_nodes.append(ins_elem)
+
+        self._inject_attributes_to_nodes(new_nodes)
+
+    def _replace_runs_text(self, runs, new_text):
+        """Put the replacement in the first matched run and drop the others."""
+        if new_text:
+            self._set_run_text(runs[0], new_text)
+            runs = runs[1:]
+        for run in runs:
+            self._remove_node(run)
+
+    def _mark_run_deleted(self, run):
+        """Convert a run's w:t to w:delText and its w:rsidR to w:rsidDel."""
+        for t_elem in list(run.getElementsByTagName("w:t")):
+            self._rename_element(t_elem, "w:delText")
+        if run.hasAttribute("w:rsidR"):
+            self._set_attribute(run, "w:rsidDel", run.getAttribute("w:rsidR"))
+            self._remove_attribute(run, "w:rsidR")
+        elif not run.hasAttribute("w:rsidDel"):
+            self._set_attribute(run, "w:rsidDel", self.rsid)
+
+
+class _IdRegistry:
+    """Used w14:paraId, durableId, RSID and tracked change IDs across a set of parts.
+
+    Built from one pass over the parts and kept current as IDs are handed out,
+    so allocation never rescans a DOM and new IDs are guaranteed not to collide
+    with any ID in the parts that share the registry.
+
+    Hex IDs are drawn from a private random generator; pass a seed to make the
+    sequence (and therefore the output) reproducible.
     """
-    return f"{random.randint(1, 0x7FFFFFFE):08X}"
 
+    def __init__(self, seed=None):
+        self.para_ids = set()
+        self.durable_ids = set()
+        self.rsids = set()
+        self.next_change_id = 0
+        self._random = random.Random(seed)
+
+    def scan(self, content):
+        """Record the IDs used in a serialized XML part.
+
+        Args:
+            content: XML document as bytes
+        """
+        parser = expat.ParserCreate()
+        parser.EntityDeclHandler = _forbid_entity_declarations
+        parser.StartElementHandler = self.observe
+        parser.Parse(content, True)
+
+    def observe(self, tag, attrs):
+        """Record the IDs carried by one element.
+
+        Args:
+            tag: Qualified tag name (e.g., "w:ins")
+            attrs: Mapping of qualified attribute names to values
+        """
+        for name, value in attrs.items():
+            local_name = name.rpartition(":")[2]
+            if local_name == "paraId":
+                self.para_ids.add(value.upper())
+            elif local_name == "durableId":
+                self.durable_ids.add(value.upper())
+        if tag.rpartition(":")[2] in ("rsid", "rsidRoot"):
+            self.rsids.update(
+                value.upper()
+                for name, value in attrs.items()
+                if name.rpartition(":")[2] == "val"
+            )
+        if tag in _CHANGE_TAGS:
+            try:
+                change_id = int(attrs.get("w:id", ""))
+            except ValueError:
+                return
+            self.next_change_id = max(self.next_change_id, change_id + 1)
+
+    def allocate_change_ids(self, count=1):
+        """Reserve consecutive tracked change IDs and return the first one."""
+        first = self.next_change_id
+        self.next_change_id += count
+        return first
+
+    def new_para_id(self):
+        """Allocate an unused w14:paraId."""
+        return self._new_hex_id(self.para_ids)
+
+    def new_durable_id(self):
+        """Allocate an unused w16cid:durableId."""
+        return self._new_hex_id(self.durable_ids)
+
+    def new_text_id(self):
+        """Generate a w14:textId (a revision marker, so it need not be unique)."""
+        return self._random_hex_id()
+
+    def new_rsid(self):
+        """Allocate an RSID not yet listed in the document's settings."""
+        return self._new_hex_id(self.rsids, limit=0xFFFFFFFF)
+
+    def _new_hex_id(self, used, limit=0x7FFFFFFE):
+        while True:
+            value = self._random_hex_id(limit)
+            if value not in used:
+                used.add(value)
+                return value
+
+    def _random_hex_id(self, limit=0x7FFFFFFE):
+        """8-character hex ID in 1..limit from the registry's seedable generator.
+
+        Not checked against used IDs; _new_hex_id() does that. The default limit
+        keeps values below 0x7FFFFFFF, the stricter of the OOXML bounds for paraId
+        (< 0x80000000) and durableId (< 0x7FFFFFFF); RSIDs pass 0xFFFFFFFF.
+        """
+        return f"{self._random.randint(1, limit):08X}"
+
+
+# FICLONE ioctl from linux/fs.h: share extents between two files on btrfs/xfs.
+# Linux only; the same request number may mean something else on other systems.
+_FICLONE = 0x40049409
 
-def _generate_rsid() -> str:
-    """Generate random 8-character hex RSID."""
-    return "".join(random.choices("0123456789ABCDEF", k=8))
+
+def _link_or_copy(src, dst):
+    """Populate a workspace file without duplicating its data where possible.
+
+    On Linux, tries a reflink clone first: its blocks are copied on write, so
+    writing the workspace file can never change the original. Otherwise media and
+    other non-XML parts, which nothing edits, are hard-linked; XML parts and
+    anything that cannot be linked are copied.
+    """
+    if sys.platform.startswith("linux"):
+        import fcntl
+
+        try:
+            with open(src, "rb") as fsrc, open(dst, "wb") as fdst:
+                fcntl.ioctl(fdst.fileno(), _FICLONE, fsrc.fileno())
+            return dst
+        except OSError:
+            Path(dst).unlink(missing_ok=True)
+    if not str(src).endswith((".xml", ".rels")):
+        try:
+            os.link(src, dst)
+            return dst
+        except OSError:
+            pass
+    return shutil.copy2(src, dst)
+
+
+def _copy_file_atomic(src, dst):
+    """Copy a file by copying to a temporary sibling and renaming it over the destination."""
+    dst = Path(dst)
+    fd, temp_path = tempfile.mkstemp(prefix=f".{dst.name}.", dir=dst.parent)
+    os.close(fd)
+    try:
+        shutil.copy2(src, temp_path)
+        os.replace(temp_path, dst)
+    except BaseException:
+        Path(temp_path).unlink(missing_ok=True)
+        raise
+
+
+def _stat_key(path):
+    """Snapshot of a file's identity used to detect parts written during a session."""
+    st = os.stat(path)
+    return (st.st_size, st.st_mtime_ns, st.st_ino)
+
+
+def _parse_revision_date(value):
+    """Parse a w:date value (or datetime) into an aware UTC datetime, or None."""
+    if not value:
+        return None
+    if isinstance(value, str):
+        try:
+            value = datetime.fromisoformat(value.replace("Z", "+00:00"))
+        except ValueError:
+            return None
+    if value.tzinfo is None:
+        value = value.replace(tzinfo=timezone.utc)
+    return value
 
 
 class Document:
-    """Manages comments in unpacked Word documents."""
+    """Manages comments in unpacked Word documents.
+
+    Edits happen in a temporary copy of the unpacked directory (unpacked_path)
+    and reach the original only on save(). Where the filesystem supports it the
+    copy is a reflink clone; otherwise, when the temp directory is on the same
+    filesystem, media and other non-XML parts are hard-links to the original
+    files, so writing one of those in place would change the original too.
+    Editors and save() always replace files rather than write into them; do the
+    same when changing files in unpacked_path directly (write a new file and
+    rename it over the old one).
+    """
 
     def __init__(
         self,
@@ -619,6 +1149,7 @@ class Document:
         track_revisions=False,
         author="GLM",
         initials="C",
+        seed=None,
     ):
         """
         Initialize with path to unpacked Word document directory.
@@ -630,34 +1161,126 @@ class Document:
             track_revisions: If True, enables track revisions in settings.xml (default: False)
             author: Default author name for comments (default: "GLM")
             initials: Default author initials for comments (default: "C")
+            seed: Optional seed for generated RSIDs, paraIds and durableIds, making them
+                reproducible across runs (default: None)
         """
         self.original_path = Path(unpacked_dir)
 
         if not self.original_path.exists() or not self.original_path.is_dir():
             raise ValueError(f"Directory not found: {unpacked_dir}")
 
-        # Create temporary directory with subdirectories for unpacked content and baseline
+        # Create temporary workspace; where the filesystem allows, parts share data
+        # with the original (see the class docstring)
         self.temp_dir = tempfile.mkdtemp(prefix="docx_")
         self.unpacked_path = Path(self.temp_dir) / "unpacked"
-        shutil.copytree(self.original_path, self.unpacked_path)
+        shutil.copytree(
+            self.original_path, self.unpacked_path, copy_function=_link_or_copy
+        )
+
+        # Validation baseline .docx is packed on first use (see original_docx)
+        self._original_docx = None
+
+        # Only set for documents opened with open_docx()
+        self.source_docx = None
+        self._package = None
+        self._pending_parts = set()
+
+        # Snapshot of workspace files as opened, and per destination what it last
+        # received, so save() copies only files written since
+        self._part_stats = {
+            path.relative_to(self.unpacked_path).as_posix(): _stat_key(path)
+            for path in self.unpacked_path.rglob("*")
+            if path.is_file()
+        }
+        self._synced = {self.original_path.resolve(): dict(self._part_stats)}
+        self._opened_parts = set(self._part_stats)
+
+        self._initialize(rsid, track_revisions, author, initials, seed)
+
+    @classmethod
+    def open_docx(
+        cls,
+        docx_path,
+        rsid=None,
+        track_revisions=False,
+        author="GLM",
+        initials="C",
+        seed=None,
+    ):
+        """
+        Open a .docx file directly, without unpacking it to a directory first.
 
-        # Pack original directory into temporary .docx for validation baseline (outside unpacked dir)
-        self.original_docx = Path(self.temp_dir) / "original.docx"
-        pack_document(self.original_path, self.original_docx, validate=False)
+        The archive is held in memory and each part is extracted into the workspace
+        (pretty-printed, as unpack.py does) only when it is first accessed. Use
+        save_docx() to write the result back to a .docx file.
 
+        Args:
+            docx_path: Path to .docx file
+            rsid: Optional RSID to use for all comment elements. If not provided, one will be generated.
+            track_revisions: If True, enables track revisions in settings.xml (default: False)
+            author: Default author name for comments (default: "GLM")
+            initials: Default author initials for comments (default: "C")
+            seed: Optional seed for generated IDs (see Document)
+
+        Returns:
+            Document: Document backed by the in-memory archive
+
+        Raises:
+            ValueError: If the file does not exist or is not a zip archive
+
+        Example:
+            doc = Document.open_docx("contract.docx", author="John Doe")
+            doc.replace_all(r"\bthe Company\b", "the Supplier")
+            doc.save_docx("contract-redlined.docx")
+        """
+        docx_path = Path(docx_path)
+        if not docx_path.is_file():
+            raise ValueError(f"File not found: {docx_path}")
+        try:
+            package = zipfile.ZipFile(io.BytesIO(docx_path.read_bytes()))
+        except zipfile.BadZipFile:
+            raise ValueError(f"Not a valid .docx archive: {docx_path}")
+
+        doc = cls.__new__(cls)
+        doc.original_path = None
+        doc.temp_dir = tempfile.mkdtemp(prefix="docx_")
+        doc.unpacked_path = Path(doc.temp_dir) / "unpacked"
+        doc.unpacked_path.mkdir()
+        doc._original_docx = None
+
+        doc.source_docx = docx_path
+        doc._package = package
+        doc._pending_parts = {
+            info.filename for info in package.infolist() if not info.is_dir()
+        }
+        doc._part_stats = {}
+        doc._synced = {}
+        doc._opened_parts = set(doc._pending_parts)
+        for name in _CORE_PARTS:
+            doc._materialize(name)
+
+        doc._initialize(rsid, track_revisions, author, initials, seed)
+        return doc
+
+    def _initialize(self, rsid, track_revisions, author, initials, seed):
+        """Set up editors, comment state and tracking infrastructure for the workspace."""
         self.word_path = self.unpacked_path / "word"
 
+        # Cache for lazy-loaded editors, and the digest of each part as loaded
+        self._editors = {}
+        self._loaded_digests = {}
+
+        # IDs used anywhere in the package, shared by every editor
+        self._ids = self._load_id_registry(seed)
+
         # Generate RSID if not provided
-        self.rsid = rsid if rsid else _generate_rsid()
+        self.rsid = rsid if rsid else self._ids.new_rsid()
         print(f"Using RSID: {self.rsid}")
 
         # Set default author and initials
         self.author = author
         self.initials = initials
 
-        # Cache for lazy-loaded editors
-        self._editors = {}
-
         # Comment file paths
         self.comments_path = self.word_path / "comments.xml"
         self.comments_extended_path = self.word_path / "commentsExtended.xml"
@@ -671,6 +1294,9 @@ class Document:
         # Convenient access to document.xml editor (semi-private)
         self._document = self["word/document.xml"]
 
+        # Index of comment anchors in document.xml so replies avoid full scans
+        self._comment_anchors = self._load_comment_anchors()
+
         # Setup tracked changes infrastructure
         self._setup_tracking(track_revisions=track_revisions)
 
@@ -701,15 +1327,92 @@ class Document:
             comment = doc["word/comments.xml"].get_node(tag="w:comment", attrs={"w:id": "0"})
         """
         if xml_path not in self._editors:
+            self._materialize(xml_path)
             file_path = self.unpacked_path / xml_path
             if not file_path.exists():
                 raise ValueError(f"XML file not found: {xml_path}")
             # Use DocxXMLEditor with RSID, author, and initials for all editors
-            self._editors[xml_path] = DocxXMLEditor(
-                file_path, rsid=self.rsid, author=self.author, initials=self.initials
+            editor = DocxXMLEditor(
+                file_path,
+                rsid=self.rsid,
+                author=self.author,
+                initials=self.initials,
+                ids=self._ids,
             )
+            self._editors[xml_path] = editor
+            self._loaded_digests[xml_path] = editor._saved_digest
         return self._editors[xml_path]
 
+    @property
+    def story_parts(self) -> list:
+        """Relative paths of all story parts: the main document, headers, footers,
+        footnotes, endnotes and comments."""
+        parts = ["word/document.xml"]
+        rels_path = "word/_rels/document.xml.rels"
+        if rels_path in self._editors:
+            rels = self._editors[rels_path].dom
+        else:
+            rels = minidom.parseString(self._read_part(rels_path))
+        for rel in rels.getElementsByTagName("*"):
+            if rel.tagName.rpartition(":")[2] != "Relationship":
+                continue
+            if rel.getAttribute("TargetMode") == "External":
+                continue
+            rel_type = rel.getAttribute("Type").rpartition("/")[2]
+            if rel_type in _STORY_RELATIONSHIP_TYPES:
+                target = rel.getAttribute("Target")
+                name = target.lstrip("/") if target.startswith("/") else f"word/{target}"
+                if name not in parts:
+                    parts.append(name)
+        # Comments added this session are only linked in the .rels on save
+        if "word/comments.xml" not in parts and self._part_exists("word/comments.xml"):
+            parts.append("word/comments.xml")
+        return parts
+
+    def revisions(self, author=None, since=None, until=None) -> list:
+        """
+        List tracked changes across all story parts.
+
+        Each part keeps an index that is built on first use and updated as its
+        editor creates tracked changes, so repeated calls only filter.
+
+        Args:
+            author: Only include changes by this author
+            since: Only include changes dated at or after this datetime or ISO string
+            until: Only include changes dated at or before this datetime or ISO string
+
+        Returns:
+            list[dict]: Entries as described in DocxXMLEditor.revisions(), plus a
+            part key with the relative path of the story part
+
+        Example:
+            mine = doc.revisions(author="John Doe", since="2025-01-01")
+        """
+        entries = []
+        for part, editor in self.stories():
+            for entry in editor.revisions(author=author, since=since, until=until):
+                entry["part"] = part
+                entries.append(entry)
+        return entries
+
+    def stories(self):
+        """
+        Iterate over editors for every story part (see story_parts).
+
+        Each part is opened only when reached. All editors share the document's ID
+        registry, so paraIds and tracked change IDs allocated in a header, footnote
+        or comment never collide with those in the main document.
+
+        Yields:
+            tuple: (relative part path, DocxXMLEditor)
+
+        Example:
+            for part, editor in doc.stories():
+                editor.replace_all(r"ACME Corp", "Acme Corporation")
+        """
+        for part in self.story_parts:
+            yield part, self[part]
+
     def add_comment(self, start, end, text: str) -> int:
         """
         Add a comment spanning from one element to another.
@@ -727,40 +1430,66 @@ class Document:
             end_node = cm.get_document_node(tag="w:ins", id="2")
             cm.add_comment(start=start_node, end=end_node, text="Explanation")
         """
-        comment_id = self.next_comment_id
-        para_id = _generate_hex_id()
-        durable_id = _generate_hex_id()
-        timestamp = datetime.now(timezone.utc).strftime("%Y-%m-%dT%H:%M:%SZ")
+        return self.add_comments([{"start": start, "end": end, "text": text}])[0]
 
-        # Add comment ranges to document.xml immediately
-        self._document.insert_before(start, self._comment_range_start_xml(comment_id))
+    def add_comments(self, comments) -> list:
+        """
+        Add many comments at once.
 
-        # If end node is a paragraph, append comment markup inside it
-        # Otherwise insert after it (for run-level anchors)
-        if end.tagName == "w:p":
-            self._document.append_to(end, self._comment_range_end_xml(comment_id))
-        else:
-            self._document.insert_after(end, self._comment_range_end_xml(comment_id))
+        Resolves the roots of the four comment parts once and parses all new
+        fragments for each part in a single pass, so the cost grows linearly
+        with the number of comments.
 
-        # Add to comments.xml immediately
-        self._add_to_comments_xml(
-            comment_id, para_id, text, self.author, self.initials, timestamp
-        )
+        Args:
+            comments: Iterable of dicts with "start", "end" and "text" keys
+                      (same meaning as the add_comment arguments)
 
-        # Add to commentsExtended.xml immediately
-        self._add_to_comments_extended_xml(para_id, parent_para_id=None)
+        Returns:
+            List of the comment IDs that were created, in input order
 
-        # Add to commentsIds.xml immediately
-        self._add_to_comments_ids_xml(para_id, durable_id)
+        Example:
+            ids = doc.add_comments([
+                {"start": para1, "end": para1, "text": "Check this clause"},
+                {"start": run_a, "end": run_b, "text": "Inconsistent term"},
+            ])
+        """
+        comments = list(comments)
+        if not comments:
+            return []
 
-        # Add to commentsExtensible.xml immediately
-        self._add_to_comments_extensible_xml(durable_id)
+        entries = [self._new_comment_entry(spec["text"]) for spec in comments]
 
-        # Update existing_comments so replies work
-        self.existing_comments[comment_id] = {"para_id": para_id}
+        # Add comment ranges to document.xml (one parse for all anchors)
+        fragments = self._document._parse_fragments(
+            [self._comment_range_start_xml(e["comment_id"]) for e in entries]
+            + [self._comment_range_end_xml(e["comment_id"]) for e in entries]
+        )
+        start_fragments = fragments[: len(entries)]
+        end_fragments = fragments[len(entries) :]
+
+        inserted = []
+        for spec, start_nodes, end_nodes in zip(
+            comments, start_fragments, end_fragments
+        ):
+            start, end = spec["start"], spec["end"]
+            for node in start_nodes:
+                self._document._insert_node(start.parentNode, node, start)
+
+            # If end node is a paragraph, append comment markup inside it
+            # Otherwise insert after it (for run-level anchors)
+            if end.tagName == "w:p":
+                for node in end_nodes:
+                    self._document._insert_node(end, node)
+            else:
+                next_sibling = end.nextSibling
+                for node in end_nodes:
+                    self._document._insert_node(end.parentNode, node, next_sibling)
+            inserted.extend(start_nodes + end_nodes)
+            self._index_comment_anchors(start_nodes + end_nodes)
+        self._document._inject_attributes_to_nodes(inserted)
 
-        self.next_comment_id += 1
-        return comment_id
+        self._add_to_comment_parts(entries)
+        return [e["comment_id"] for e in entries]
 
     def reply_to_comment(
         self,
@@ -780,92 +1509,339 @@ class Document:
         Example:
             cm.reply_to_comment(parent_comment_id=0, text="I agree with this change")
         """
-        if parent_comment_id not in self.existing_comments:
-            raise ValueError(f"Parent comment with id={parent_comment_id} not found")
+        return self.reply_to_comments(
+            [{"parent_comment_id": parent_comment_id, "text": text}]
+        )[0]
 
-        parent_info = self.existing_comments[parent_comment_id]
-        comment_id = self.next_comment_id
-        para_id = _generate_hex_id()
-        durable_id = _generate_hex_id()
-        timestamp = datetime.now(timezone.utc).strftime("%Y-%m-%dT%H:%M:%SZ")
+    def reply_to_comments(self, replies) -> list:
+        """
+        Add many replies at once.
 
-        # Add comment ranges to document.xml immediately
-        parent_start_elem = self._document.get_node(
-            tag="w:commentRangeStart", attrs={"w:id": str(parent_comment_id)}
-        )
-        parent_ref_elem = self._document.get_node(
-            tag="w:commentReference", attrs={"w:id": str(parent_comment_id)}
-        )
+        Replies may target comments created earlier in the same batch.
 
-        self._document.insert_after(
-            parent_start_elem, self._comment_range_start_xml(comment_id)
-        )
-        parent_ref_run = parent_ref_elem.parentNode
-        self._document.insert_after(
-            parent_ref_run, f'<w:commentRangeEnd w:id="{comment_id}"/>'
-        )
-        self._document.insert_after(
-            parent_ref_run, self._comment_ref_run_xml(comment_id)
-        )
+        Args:
+            replies: Iterable of dicts with "parent_comment_id" and "text" keys
 
-        # Add to comments.xml immediately
-        self._add_to_comments_xml(
-            comment_id, para_id, text, self.author, self.initials, timestamp
-        )
+        Returns:
+            List of the comment IDs that were created, in input order
 
-        # Add to commentsExtended.xml immediately (with parent)
-        self._add_to_comments_extended_xml(
-            para_id, parent_para_id=parent_info["para_id"]
+        Example:
+            ids = doc.reply_to_comments([
+                {"parent_comment_id": 0, "text": "Agreed"},
+                {"parent_comment_id": 3, "text": "Fixed in the latest draft"},
+            ])
+        """
+        replies = list(replies)
+        if not replies:
+            return []
+
+        entries = []
+        for reply in replies:
+            parent_comment_id = reply["parent_comment_id"]
+            if parent_comment_id not in self.existing_comments:
+                raise ValueError(
+                    f"Parent comment with id={parent_comment_id} not found"
+                )
+            entry = self._new_comment_entry(
+                reply["text"],
+                parent_para_id=self.existing_comments[parent_comment_id]["para_id"],
+            )
+            entries.append(entry)
+
+        # Add comment ranges to document.xml (one parse for all anchors)
+        fragments = self._document._parse_fragments(
+            [self._comment_range_start_xml(e["comment_id"]) for e in entries]
+            + [
+                self._comment_ref_run_xml(e["comment_id"])
+                + f'<w:commentRangeEnd w:id="{e["comment_id"]}"/>'
+                for e in entries
+            ]
         )
+        start_fragments = fragments[: len(entries)]
+        end_fragments = fragments[len(entries) :]
+
+        inserted = []
+        for reply, start_nodes, end_nodes in zip(
+            replies, start_fragments, end_fragments
+        ):
+            parent_comment_id = reply["parent_comment_id"]
+            parent_start_elem = self._get_comment_anchor(
+                parent_comment_id, "range_start"
+            )
+            parent_ref_run = self._get_comment_anchor(
+                parent_comment_id, "reference_run"
+            )
 
-        # Add to commentsIds.xml immediately
-        self._add_to_comments_ids_xml(para_id, durable_id)
+            next_sibling = parent_start_elem.nextSibling
+            for node in start_nodes:
+                self._document._insert_node(
+                    parent_start_elem.parentNode, node, next_sibling
+                )
 
-        # Add to commentsExtensible.xml immediately
-        self._add_to_comments_extensible_xml(durable_id)
+            next_sibling = parent_ref_run.nextSibling
+            for node in end_nodes:
+                self._document._insert_node(
+                    parent_ref_run.parentNode, node, next_sibling
+                )
+            inserted.extend(start_nodes + end_nodes)
+            self._index_comment_anchors(start_nodes + end_nodes)
+        self._document._inject_attributes_to_nodes(inserted)
 
-        # Update existing_comments so replies work
-        self.existing_comments[comment_id] = {"para_id": para_id}
+        self._add_to_comment_parts(entries)
+        return [e["comment_id"] for e in entries]
 
-        self.next_comment_id += 1
-        return comment_id
+    def replace_all(self, pattern, replacement, track=True) -> int:
+        """
+        Replace every regex match in document.xml, as tracked changes by default.
+
+        Args:
+            pattern: Regex string or compiled pattern
+            replacement: Replacement string (supports backreferences) or callable
+            track: If True, emit w:del/w:ins tracked changes (default: True)
+
+        Returns:
+            Number of replacements made
+
+        Example:
+            doc.replace_all(r"\\bthe Company\\b", "the Supplier")
+            doc.replace_all(r"(\\d+) days", r"\\1 business days")
+        """
+        return self._document.replace_all(pattern, replacement, track=track)
+
+    def checkpoint(self) -> dict:
+        """
+        Mark the current state of every open editor and of the comment bookkeeping.
+
+        Unlike XMLEditor.checkpoint(), rolling back to this mark also undoes comments
+        and replies, which span document.xml and the comment parts.
+
+        Returns:
+            Opaque token for rollback()
+
+        Example:
+            mark = doc.checkpoint()
+            doc.add_comments(specs)
+            try:
+                doc.validate()
+            except ValueError:
+                doc.rollback(mark)  # comments gone from every part
+        """
+        return {
+            "editors": {
+                name: editor.checkpoint() for name, editor in self._editors.items()
+            },
+            "existing_comments": dict(self.existing_comments),
+            "comment_anchors": {
+                comment_id: dict(anchors)
+                for comment_id, anchors in self._comment_anchors.items()
+            },
+            "comment_parts": {
+                name for name in self._comment_parts() if self._part_exists(name)
+            },
+        }
+
+    def rollback(self, checkpoint) -> None:
+        """
+        Undo every edit made in any part since a Document checkpoint.
+
+        Editors opened after the checkpoint are rolled back to their loaded state,
+        and comment parts created since are deleted. Comment IDs handed out in the
+        meantime stay reserved.
+
+        Args:
+            checkpoint: Token from checkpoint()
+
+        Raises:
+            ValueError: If an editor's journal was committed past the checkpoint
+        """
+        for name, editor in self._editors.items():
+            editor.rollback(checkpoint["editors"].get(name, 0))
+        for name in self._comment_parts():
+            if name in checkpoint["comment_parts"]:
+                continue
+            self._editors.pop(name, None)
+            self._loaded_digests.pop(name, None)
+            (self.unpacked_path / name).unlink(missing_ok=True)
+        self.existing_comments = dict(checkpoint["existing_comments"])
+        self._comment_anchors = {
+            comment_id: dict(anchors)
+            for comment_id, anchors in checkpoint["comment_anchors"].items()
+        }
+
+    def commit(self) -> None:
+        """Drop the undo records of every open editor; see XMLEditor.commit()."""
+        for editor in self._editors.values():
+            editor.commit()
+
+    @property
+    def original_docx(self) -> Path:
+        """Path to the packed original document used as the validation baseline.
+
+        Packed from the original directory (or copied from the in-memory archive
+        for open_docx()) on first access, so documents that are never validated
+        skip the cost entirely.
+        """
+        if self._original_docx is None:
+            original_docx = Path(self.temp_dir) / "original.docx"
+            if self._package is not None:
+                original_docx.write_bytes(self._package.fp.getvalue())
+            else:
+                pack_document(self.original_path, original_docx, validate=False)
+            self._original_docx = original_docx
+        return self._original_docx
 
     def __del__(self):
         """Clean up temporary directory on deletion."""
         if hasattr(self, "temp_dir") and Path(self.temp_dir).exists():
             shutil.rmtree(self.temp_dir)
 
-    def validate(self) -> None:
+    def validate(self, incremental=False) -> None:
         """
         Validate the document against XSD schema and redlining rules.
 
+        Args:
+            incremental: If True, only validates parts whose saved content differs from
+                what was opened, and parts created since. Relationship and content type checks run only when .rels files,
+                [Content_Types].xml or new parts changed, and redlining runs only when
+                word/document.xml changed (default: False).
+
         Raises:
             ValueError: If validation fails.
         """
+        parts = self._changed_parts() if incremental else None
+
         # Create validators with current state
         schema_validator = DOCXSchemaValidator(
-            self.unpacked_path, self.original_docx, verbose=False
+            self.unpacked_path, self.original_docx, verbose=False, parts=parts
         )
         redlining_validator = RedliningValidator(
             self.unpacked_path, self.original_docx, verbose=False
         )
 
+        # Package-wide checks look at the whole directory
+        if schema_validator.package_changed:
+            self._materialize_all()
+
         # Run validations
         if not schema_validator.validate():
             raise ValueError("Schema validation failed")
-        if not redlining_validator.validate():
-            raise ValueError("Redlining validation failed")
+        if parts is None or "word/document.xml" in parts:
+            if not redlining_validator.validate():
+                raise ValueError("Redlining validation failed")
 
-    def save(self, destination=None, validate=True) -> None:
+    def save(self, destination=None, validate=True, incremental=False) -> None:
         """
         Save all modified XML files to disk and copy to destination directory.
 
         This persists all changes made via add_comment() and reply_to_comment().
+        Only files created or modified since the last save to the same destination
+        are copied (each atomically, via a temporary file and rename); the first
+        save to a new destination copies everything.
 
         Args:
             destination: Optional path to save to. If None, saves back to original directory.
             validate: If True, validates document before saving (default: True).
+            incremental: If True, validation is limited to changed parts; see validate()
+                (default: False).
+
+        Raises:
+            ValueError: If destination is None for a document opened with open_docx()
+        """
+        if destination is None and self.original_path is None:
+            raise ValueError(
+                "Document was opened from a .docx; pass a destination or use save_docx()"
+            )
+
+        self._flush()
+
+        # Validate by default
+        if validate:
+            self.validate(incremental=incremental)
+
+        # Copy contents from temp directory to destination (or original directory)
+        self._materialize_all()
+        target_path = Path(destination) if destination else self.original_path
+        if (
+            self.original_path is not None
+            and target_path.resolve() == self.original_path.resolve()
+        ):
+            # Capture the baseline before the original directory is overwritten
+            self.original_docx
+        synced = self._synced.setdefault(target_path.resolve(), {})
+        for path in self.unpacked_path.rglob("*"):
+            if not path.is_file():
+                continue
+            name = path.relative_to(self.unpacked_path).as_posix()
+            stat_key = _stat_key(path)
+            if synced.get(name) == stat_key:
+                continue
+            target_file = target_path / name
+            target_file.parent.mkdir(parents=True, exist_ok=True)
+            _copy_file_atomic(path, target_file)
+            synced[name] = stat_key
+
+    def save_docx(self, destination=None, validate=True, incremental=False) -> None:
+        """
+        Save the document as a .docx file.
+
+        For documents opened with open_docx(), members that were not written during
+        the session are copied from the source archive without recompression; only
+        edited or new parts are condensed and compressed again.
+
+        Args:
+            destination: Output .docx path. If None, overwrites the .docx the document
+                was opened from.
+            validate: If True, validates document before saving (default: True).
+            incremental: If True, validation is limited to changed parts; see validate()
+                (default: False). Recommended for documents opened with open_docx(),
+                where full validation extracts and pretty-prints every part.
+
+        Raises:
+            ValueError: If destination is None for a document not opened with open_docx()
         """
+        if destination is None and self.source_docx is None:
+            raise ValueError("Document was not opened from a .docx; pass a destination")
+        target_path = Path(destination) if destination else self.source_docx
+
+        self._flush()
+
+        # Validate by default
+        if validate:
+            self.validate(incremental=incremental)
+
+        if self._package is None:
+            pack_document(self.unpacked_path, target_path, validate=False)
+            return
+
+        buffer = io.BytesIO()
+        with zipfile.ZipFile(buffer, "w", zipfile.ZIP_DEFLATED) as zf:
+            for info in self._package.infolist():
+                path = self.unpacked_path / info.filename
+                if (
+                    info.is_dir()
+                    or info.filename in self._pending_parts
+                    or (
+                        path.is_file()
+                        and _stat_key(path) == self._part_stats.get(info.filename)
+                    )
+                ):
+                    copy_member_raw(self._package, zf, info)
+                elif path.is_file():
+                    self._write_part(zf, info.filename, path)
+
+            # Parts created during the session (comments.xml, people.xml, ...)
+            for path in sorted(self.unpacked_path.rglob("*")):
+                name = path.relative_to(self.unpacked_path).as_posix()
+                if path.is_file() and name not in zf.NameToInfo:
+                    self._write_part(zf, name, path)
+
+        target_path.parent.mkdir(parents=True, exist_ok=True)
+        _write_bytes_atomic(target_path, buffer.getvalue())
+
+    # ==================== Private: Saving ====================
+
+    def _flush(self):
+        """Write comment relationships, content types and all open editors to the workspace."""
         # Only ensure comment relationships and content types if comment files exist
         if self.comments_path.exists():
             self._ensure_comment_relationships()
@@ -875,13 +1851,62 @@ class Document:
         for editor in self._editors.values():
             editor.save()
 
-        # Validate by default
-        if validate:
-            self.validate()
+    def _write_part(self, zf, name, path):
+        """Add a workspace file to an archive, condensing XML parts like pack.py."""
+        content = path.read_bytes()
+        if name.endswith((".xml", ".rels")):
+            content = condense_xml_bytes(content)
+        zf.writestr(name, content, compress_type=compress_type_for(name))
 
-        # Copy contents from temp directory to destination (or original directory)
-        target_path = Path(destination) if destination else self.original_path
-        shutil.copytree(self.unpacked_path, target_path, dirs_exist_ok=True)
+    # ==================== Private: Package Parts ====================
+
+    def _part_exists(self, name):
+        """Check whether a part exists, whether or not it has been extracted yet."""
+        return name in self._pending_parts or (self.unpacked_path / name).is_file()
+
+    def _read_part(self, name):
+        """Read a part's bytes without extracting it into the workspace."""
+        if name in self._pending_parts:
+            return self._package.read(name)
+        return (self.unpacked_path / name).read_bytes()
+
+    def _changed_parts(self):
+        """Relative paths of parts changed since the document was opened.
+
+        A part opened in an editor has changed if its saved content differs from
+        what was loaded; parts that were not in the document as opened are new.
+        """
+        changed = {
+            name
+            for name, editor in self._editors.items()
+            if editor._saved_digest != self._loaded_digests[name]
+        }
+        for path in self.unpacked_path.rglob("*"):
+            name = path.relative_to(self.unpacked_path).as_posix()
+            if name not in self._opened_parts and path.is_file():
+                changed.add(name)
+        return changed
+
+    def _materialize(self, name):
+        """Extract a part from the in-memory archive into the workspace on first access."""
+        if name not in self._pending_parts:
+            return
+        self._pending_parts.discard(name)
+
+        content = self._package.read(name)
+        if name.endswith((".xml", ".rels")):
+            content = minidom.parseString(content).toprettyxml(
+                indent="  ", encoding="ascii"
+            )
+        path = self.unpacked_path / name
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_bytes(content)
+        self._part_stats[name] = _stat_key(path)
+
+    def _materialize_all(self):
+        """Extract every remaining archive member into the workspace."""
+        for name in sorted(self._pending_parts):
+            self._materialize(name)
 
     # ==================== Private: Initialization ====================
 
@@ -901,6 +1926,14 @@ class Document:
                     pass
         return max_id + 1
 
+    def _load_id_registry(self, seed=None):
+        """Collect IDs from story, comment and settings parts in one pass over each part."""
+        ids = _IdRegistry(seed)
+        for name in self.story_parts + list(_COMMENT_ID_PARTS) + ["word/settings.xml"]:
+            if self._part_exists(name):
+                ids.scan(self._read_part(name))
+        return ids
+
     def _load_existing_comments(self):
         """Load existing comments from files to enable replies."""
         if not self.comments_path.exists():
@@ -928,6 +1961,73 @@ class Document:
 
         return existing
 
+    def _load_comment_anchors(self):
+        """Index comment range starts, range ends and reference runs in one DOM walk."""
+        self._comment_anchors = {}
+        stack = [self._document.dom.documentElement]
+        while stack:
+            node = stack.pop()
+            for child in node.childNodes:
+                if child.nodeType != child.ELEMENT_NODE:
+                    continue
+                if child.tagName in self._ANCHOR_TAGS:
+                    self._index_comment_anchor(child)
+                else:
+                    stack.append(child)
+        return self._comment_anchors
+
+    # Comment anchor elements -> key in the _comment_anchors index
+    _ANCHOR_TAGS = {
+        "w:commentRangeStart": "range_start",
+        "w:commentRangeEnd": "range_end",
+        "w:commentReference": "reference_run",
+    }
+
+    def _index_comment_anchors(self, nodes):
+        """Record comment anchor elements contained in newly inserted nodes."""
+        for node in nodes:
+            if node.nodeType != node.ELEMENT_NODE:
+                continue
+            if node.tagName in self._ANCHOR_TAGS:
+                self._index_comment_anchor(node)
+            for tag in self._ANCHOR_TAGS:
+                for elem in node.getElementsByTagName(tag):
+                    self._index_comment_anchor(elem)
+
+    def _index_comment_anchor(self, elem):
+        """Record a single comment anchor element (the w:r for w:commentReference)."""
+        try:
+            comment_id = int(elem.getAttribute("w:id"))
+        except ValueError:
+            return
+        key = self._ANCHOR_TAGS[elem.tagName]
+        anchors = self._comment_anchors.setdefault(
+            comment_id, {"range_start": None, "range_end": None, "reference_run": None}
+        )
+        if anchors[key] is None:
+            anchors[key] = elem.parentNode if key == "reference_run" else elem
+
+    def _get_comment_anchor(self, comment_id, key):
+        """Get an indexed anchor node, falling back to a search if it was detached."""
+        node = self._comment_anchors.get(comment_id, {}).get(key)
+        if node is not None and self._is_in_document(node):
+            return node
+
+        # The index can go stale after direct DOM edits; look the node up again
+        tag = {v: k for k, v in self._ANCHOR_TAGS.items()}[key]
+        node = self._document.get_node(tag=tag, attrs={"w:id": str(comment_id)})
+        if key == "reference_run":
+            node = node.parentNode
+        anchors = self._comment_anchors.setdefault(
+            comment_id, {"range_start": None, "range_end": None, "reference_run": None}
+        )
+        anchors[key] = node
+        return node
+
+    def _is_in_document(self, node):
+        """Check that a node is still attached to the document.xml DOM."""
+        return self._document._is_attached(node)
+
     # ==================== Private: Setup Methods ====================
 
     def _setup_tracking(self, track_revisions=False):
@@ -1091,68 +2191,111 @@ class Document:
 
     # ==================== Private: XML File Creation ====================
 
-    def _add_to_comments_xml(
-        self, comment_id, para_id, text, author, initials, timestamp
-    ):
-        """Add a single comment to comments.xml."""
+    def _new_comment_entry(self, text, parent_para_id=None):
+        """Allocate IDs for a new comment and register it so replies work."""
+        comment_id = self.next_comment_id
+        self.next_comment_id += 1
+        entry = {
+            "comment_id": comment_id,
+            "para_id": self._ids.new_para_id(),
+            "durable_id": self._ids.new_durable_id(),
+            "parent_para_id": parent_para_id,
+            "text": text,
+        }
+        self.existing_comments[comment_id] = {"para_id": entry["para_id"]}
+        return entry
+
+    def _add_to_comment_parts(self, entries):
+        """Add comments to comments.xml, commentsExtended.xml, commentsIds.xml
+        and commentsExtensible.xml."""
+        timestamp = datetime.now(timezone.utc).strftime("%Y-%m-%dT%H:%M:%SZ")
+        self._add_to_comments_xml(entries, self.author, self.initials, timestamp)
+        self._add_to_comments_extended_xml(entries)
+        self._add_to_comments_ids_xml(entries)
+        self._add_to_comments_extensible_xml(entries)
+
+    def _comment_parts(self):
+        """Relative paths of the four comment parts."""
+        return [
+            path.relative_to(self.unpacked_path).as_posix()
+            for path in (
+                self.comments_path,
+                self.comments_extended_path,
+                self.comments_ids_path,
+                self.comments_extensible_path,
+            )
+        ]
+
+    def _append_to_part_root(self, xml_path, xml_content):
+        """Append XML to the root element of a part (no element search needed)."""
+        editor = self[xml_path]
+        editor.append_to(editor.dom.documentElement, xml_content)
+
+    def _add_to_comments_xml(self, entries, author, initials, timestamp):
+        """Add comments to comments.xml."""
         if not self.comments_path.exists():
             shutil.copy(TEMPLATE_DIR / "comments.xml", self.comments_path)
 
-        editor = self["word/comments.xml"]
-        root = editor.get_node(tag="w:comments")
-
-        escaped_text = (
-            text.replace("&", "&amp;").replace("<", "&lt;").replace(">", "&gt;")
-        )
-        # Note: w:rsidR, w:rsidRDefault, w:rsidP on w:p, w:rsidR on w:r,
-        # and w:author, w:date, w:initials on w:comment are automatically added by DocxXMLEditor
-        comment_xml = f'''<w:comment w:id="{comment_id}">
-  <w:p w14:paraId="{para_id}" w14:textId="77777777">
+        comment_xmls = []
+        for entry in entries:
+            escaped_text = (
+                entry["text"]
+                .replace("&", "&amp;")
+                .replace("<", "&lt;")
+                .replace(">", "&gt;")
+            )
+            # Note: w:rsidR, w:rsidRDefault, w:rsidP on w:p, w:rsidR on w:r,
+            # and w:author, w:date, w:initials on w:comment are automatically added by DocxXMLEditor
+            comment_xmls.append(f'''<w:comment w:id="{entry["comment_id"]}">
+  <w:p w14:paraId="{entry["para_id"]}" w14:textId="77777777">
     <w:r><w:rPr><w:rStyle w:val="CommentReference"/></w:rPr><w:annotationRef/></w:r>
     <w:r><w:rPr><w:color w:val="000000"/><w:sz w:val="20"/><w:szCs w:val="20"/></w:rPr><w:t>{escaped_text}</w:t></w:r>
   </w:p>
-</w:comment>'''
-        editor.append_to(root, comment_xml)
+</w:comment>''')
+        self._append_to_part_root("word/comments.xml", "".join(comment_xmls))
 
-    def _add_to_comments_extended_xml(self, para_id, parent_para_id):
-        """Add a single comment to commentsExtended.xml."""
+    def _add_to_comments_extended_xml(self, entries):
+        """Add comments to commentsExtended.xml."""
         if not self.comments_extended_path.exists():
             shutil.copy(
                 TEMPLATE_DIR / "commentsExtended.xml", self.comments_extended_path
             )
 
-        editor = self["word/commentsExtended.xml"]
-        root = editor.get_node(tag="w15:commentsEx")
-
-        if parent_para_id:
-            xml = f'<w15:commentEx w15:paraId="{para_id}" w15:paraIdParent="{parent_para_id}" w15:done="0"/>'
-        else:
-            xml = f'<w15:commentEx w15:paraId="{para_id}" w15:done="0"/>'
-        editor.append_to(root, xml)
+        xmls = []
+        for entry in entries:
+            if entry["parent_para_id"]:
+                xmls.append(
+                    f'<w15:commentEx w15:paraId="{entry["para_id"]}" w15:paraIdParent="{entry["parent_para_id"]}" w15:done="0"/>'
+                )
+            else:
+                xmls.append(
+                    f'<w15:commentEx w15:paraId="{entry["para_id"]}" w15:done="0"/>'
+                )
+        self._append_to_part_root("word/commentsExtended.xml", "".join(xmls))
 
-    def _add_to_comments_ids_xml(self, para_id, durable_id):
-        """Add a single comment to commentsIds.xml."""
+    def _add_to_comments_ids_xml(self, entries):
+        """Add comments to commentsIds.xml."""
         if not self.comments_ids_path.exists():
             shutil.copy(TEMPLATE_DIR / "commentsIds.xml", self.comments_ids_path)
 
-        editor = self["word/commentsIds.xml"]
-        root = editor.get_node(tag="w16cid:commentsIds")
-
-        xml = f'<w16cid:commentId w16cid:paraId="{para_id}" w16cid:durableId="{durable_id}"/>'
-        editor.append_to(root, xml)
+        xml = "".join(
+            f'<w16cid:commentId w16cid:paraId="{entry["para_id"]}" w16cid:durableId="{entry["durable_id"]}"/>'
+            for entry in entries
+        )
+        self._append_to_part_root("word/commentsIds.xml", xml)
 
-    def _add_to_comments_extensible_xml(self, durable_id):
-        """Add a single comment to commentsExtensible.xml."""
+    def _add_to_comments_extensible_xml(self, entries):
+        """Add comments to commentsExtensible.xml."""
         if not self.comments_extensible_path.exists():
             shutil.copy(
                 TEMPLATE_DIR / "commentsExtensible.xml", self.comments_extensible_path
             )
 
-        editor = self["word/commentsExtensible.xml"]
-        root = editor.get_node(tag="w16cex:commentsExtensible")
-
-        xml = f'<w16cex:commentExtensible w16cex:durableId="{durable_id}"/>'
-        editor.append_to(root, xml)
+        xml = "".join(
+            f'<w16cex:commentExtensible w16cex:durableId="{entry["durable_id"]}"/>'
+            for entry in entries
+        )
+        self._append_to_part_root("word/commentsExtensible.xml", xml)
 
     # ==================== Private: XML Fragments ====================
 
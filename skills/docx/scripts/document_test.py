@@ -0,0 +1,560 @@
+import os
+import re
+import tempfile
+import unittest
+import zipfile
+from pathlib import Path
+from unittest import mock
+
+from ooxml.scripts.pack import pack_document
+
+from . import document
+from .document import Document, DocxXMLEditor, _link_or_copy
+
+NAMESPACES = (
+    'xmlns:w="http://schemas.openxmlformats.org/wordprocessingml/2006/main" '
+    'xmlns:r="http://schemas.openxmlformats.org/officeDocument/2006/relationships" '
+    'xmlns:w14="http://schemas.microsoft.com/office/word/2010/wordml" '
+    'xmlns:mc="http://schemas.openxmlformats.org/markup-compatibility/2006" '
+    'mc:Ignorable="w14"'
+)
+DECLARATION = '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>\n'
+RELATIONSHIPS = "http://schemas.openxmlformats.org/officeDocument/2006/relationships"
+
+
+def write_unpacked_document(directory, body):
+    """Write a minimal unpacked .docx whose w:body holds the given XML."""
+    parts = {
+        "[Content_Types].xml": (
+            '<Types xmlns="http://schemas.openxmlformats.org/package/2006/content-types">'
+            '<Default Extension="rels" ContentType="application/vnd.openxmlformats-package.relationships+xml"/>'
+            '<Default Extension="xml" ContentType="application/xml"/>'
+            '<Override PartName="/word/document.xml" ContentType="application/vnd.openxmlformats-officedocument.wordprocessingml.document.main+xml"/>'
+            '<Override PartName="/word/settings.xml" ContentType="application/vnd.openxmlformats-officedocument.wordprocessingml.settings+xml"/>'
+            "</Types>"
+        ),
+        "_rels/.rels": (
+            '<Relationships xmlns="http://schemas.openxmlformats.org/package/2006/relationships">'
+            f'<Relationship Id="rId1" Type="{RELATIONSHIPS}/officeDocument" Target="word/document.xml"/>'
+            "</Relationships>"
+        ),
+        "word/_rels/document.xml.rels": (
+            '<Relationships xmlns="http://schemas.openxmlformats.org/package/2006/relationships">'
+            f'<Relationship Id="rId1" Type="{RELATIONSHIPS}/settings" Target="settings.xml"/>'
+            "</Relationships>"
+        ),
+        "word/document.xml": (
+            f"<w:document {NAMESPACES}><w:body>{body}<w:sectPr/></w:body></w:document>"
+        ),
+        "word/settings.xml": f"<w:settings {NAMESPACES}><w:compat/></w:settings>",
+    }
+    directory = Path(directory)
+    for name, content in parts.items():
+        path = directory / name
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_text(DECLARATION + content, encoding="utf-8")
+    return directory
+
+
+# Currently this is not run automatically in CI; it's just for documentation and manual checking.
+class TestChangedParts(unittest.TestCase):
+    def setUp(self):
+        temp_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(temp_dir.cleanup)
+        self.unpacked = write_unpacked_document(
+            Path(temp_dir.name) / "unpacked",
+            "<w:p><w:r><w:t>The Company shall pay.</w:t></w:r></w:p>",
+        )
+        # The first session adds people.xml, its relationship and the RSID
+        Document(self.unpacked, rsid="00AB12CD").save(validate=False)
+
+    def test_text_edit_changes_only_document_xml(self):
+        doc = Document(self.unpacked, rsid="00AB12CD")
+        doc.replace_all("Company", "Supplier")
+        doc.save(incremental=True)
+        self.assertEqual(doc._changed_parts(), {"word/document.xml"})
+
+    def test_unchanged_document_has_no_changed_parts(self):
+        doc = Document(self.unpacked, rsid="00AB12CD")
+        doc.save(validate=False)
+        self.assertEqual(doc._changed_parts(), set())
+
+    def test_new_part_is_changed(self):
+        doc = Document(self.unpacked, rsid="00AB12CD")
+        paragraph = doc["word/document.xml"].get_node(tag="w:p")
+        doc.add_comment(paragraph, paragraph, "Check this")
+        doc.save(validate=False)
+        self.assertIn("word/comments.xml", doc._changed_parts())
+        self.assertIn("word/_rels/document.xml.rels", doc._changed_parts())
+
+
+class TestComments(unittest.TestCase):
+    def setUp(self):
+        temp_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(temp_dir.cleanup)
+        self.unpacked = write_unpacked_document(
+            Path(temp_dir.name) / "unpacked",
+            "<w:p><w:r><w:t>Alpha clause.</w:t></w:r></w:p>"
+            "<w:p><w:r><w:t>Beta clause.</w:t></w:r></w:p>",
+        )
+
+    def open(self):
+        return Document(self.unpacked, rsid="00AB12CD", seed=5)
+
+    def parts(self, doc):
+        """Serialized open parts, without the timestamps that differ between runs."""
+        return {
+            name: re.sub(r' (w:date|w16du:dateUtc)="[^"]*"', "", editor.dom.toxml())
+            for name, editor in doc._editors.items()
+        }
+
+    def test_batch_matches_one_at_a_time(self):
+        def specs(doc):
+            editor = doc["word/document.xml"]
+            alpha = editor.get_node(tag="w:p", contains="Alpha")
+            beta = editor.get_node(tag="w:r", contains="Beta")
+            return [
+                {"start": alpha, "end": alpha, "text": "Check this"},
+                {"start": beta, "end": beta, "text": "And <this> & that"},
+            ]
+
+        batch = self.open()
+        ids = batch.add_comments(specs(batch))
+        batch.reply_to_comments(
+            [{"parent_comment_id": i, "text": f"Reply to {i}"} for i in ids]
+        )
+
+        single = self.open()
+        single_ids = [
+            single.add_comment(spec["start"], spec["end"], spec["text"])
+            for spec in specs(single)
+        ]
+        for i in single_ids:
+            single.reply_to_comment(i, f"Reply to {i}")
+
+        self.assertEqual(single_ids, ids)
+        self.assertEqual(self.parts(batch), self.parts(single))
+        batch.save()
+
+    def test_reply_to_comment_added_this_session(self):
+        doc = self.open()
+        editor = doc["word/document.xml"]
+        paragraph = editor.get_node(tag="w:p", contains="Alpha")
+        parent = doc.add_comment(paragraph, paragraph, "Check this")
+
+        # Anchors come from the index, not from a search of document.xml
+        with mock.patch.object(
+            DocxXMLEditor, "get_node", side_effect=AssertionError("search")
+        ):
+            reply = doc.reply_to_comment(parent, "Agreed")
+            # Replies may target a reply made earlier in the same batch
+            nested = doc.reply_to_comments(
+                [{"parent_comment_id": reply, "text": "Thanks"}]
+            )[0]
+
+        # Each reply's range sits right inside its parent's
+        for tag, expected in [
+            ("w:commentRangeStart", [parent, reply, nested]),
+            ("w:commentReference", [parent, reply, nested]),
+            ("w:commentRangeEnd", [parent, nested, reply]),
+        ]:
+            self.assertEqual(
+                [
+                    int(elem.getAttribute("w:id"))
+                    for elem in editor.dom.getElementsByTagName(tag)
+                ],
+                expected,
+            )
+        extended = doc["word/commentsExtended.xml"].dom.getElementsByTagName(
+            "w15:commentEx"
+        )
+        self.assertEqual(
+            [elem.getAttribute("w15:paraIdParent") for elem in extended],
+            [
+                "",
+                doc.existing_comments[parent]["para_id"],
+                doc.existing_comments[reply]["para_id"],
+            ],
+        )
+        doc.save()
+
+
+class TestIdAllocation(unittest.TestCase):
+    def setUp(self):
+        temp_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(temp_dir.cleanup)
+        self.unpacked = write_unpacked_document(
+            Path(temp_dir.name) / "unpacked",
+            "<w:p><w:r><w:t>Body text.</w:t></w:r></w:p>",
+        )
+        # Register word/header1.xml as a header story
+        for name, old, new in [
+            (
+                "word/_rels/document.xml.rels",
+                "</Relationships>",
+                f'<Relationship Id="rId2" Type="{RELATIONSHIPS}/header" '
+                'Target="header1.xml"/></Relationships>',
+            ),
+            (
+                "[Content_Types].xml",
+                "</Types>",
+                '<Override PartName="/word/header1.xml" ContentType="application/'
+                'vnd.openxmlformats-officedocument.wordprocessingml.header+xml"/></Types>',
+            ),
+        ]:
+            path = self.unpacked / name
+            path.write_text(path.read_text().replace(old, new, 1))
+
+    def write_header(self, para_id):
+        """Write word/header1.xml with one paragraph carrying the given paraId."""
+        (self.unpacked / "word/header1.xml").write_text(
+            f'{DECLARATION}<w:hdr {NAMESPACES}><w:p w14:paraId="{para_id}">'
+            "<w:r><w:t>Header text.</w:t></w:r></w:p></w:hdr>"
+        )
+
+    def add_paragraph(self, doc, part):
+        """Append an empty paragraph to a part and return its allocated paraId."""
+        editor = doc[part]
+        paragraphs = editor.dom.getElementsByTagName("w:p")
+        new = editor.insert_after(paragraphs[-1], "<w:p/>")[0]
+        return new.getAttribute("w14:paraId")
+
+    def test_para_ids_are_unique_across_parts(self):
+        self.write_header("00000001")
+        first = self.add_paragraph(
+            Document(self.unpacked, rsid="00AB12CD", seed=3), "word/document.xml"
+        )
+
+        # The header now holds the paraId the same seed hands out first
+        self.write_header(first)
+        doc = Document(self.unpacked, rsid="00AB12CD", seed=3)
+        para_ids = [
+            self.add_paragraph(doc, part)
+            for part in ["word/document.xml", "word/header1.xml"] * 3
+        ]
+        self.assertNotIn(first, para_ids)
+        self.assertEqual(len(set(para_ids)), len(para_ids))
+        doc.save()
+
+    def test_seed_is_reproducible(self):
+        self.write_header("00000001")
+
+        def new_ids(seed):
+            doc = Document(self.unpacked, rsid="00AB12CD", seed=seed)
+            paragraph = doc["word/document.xml"].get_node(tag="w:p")
+            comment_id = doc.add_comment(paragraph, paragraph, "Check this")
+            para_id = doc.existing_comments[comment_id]["para_id"]
+            return [self.add_paragraph(doc, "word/document.xml"), para_id]
+
+        ids = new_ids(seed=3)
+        self.assertEqual(new_ids(seed=3), ids)
+        self.assertNotEqual(new_ids(seed=4), ids)
+
+        # An ID already in the package is skipped; IDs drawn before it are unchanged
+        self.write_header(ids[0])
+        paragraph_id, comment_para_id = new_ids(seed=3)
+        self.assertNotEqual(paragraph_id, ids[0])
+        self.assertEqual(comment_para_id, ids[1])
+
+
+def paragraph_layout(para):
+    """Summarize a paragraph as (wrapper, text, formatting) per run, in order."""
+    layout = []
+    for child in para.childNodes:
+        if child.nodeType != child.ELEMENT_NODE:
+            continue
+        runs = [child] if child.tagName == "w:r" else child.getElementsByTagName("w:r")
+        for run in runs:
+            text = "".join(
+                node.data
+                for elem in run.childNodes
+                if elem.nodeType == elem.ELEMENT_NODE
+                and elem.tagName in ("w:t", "w:delText")
+                for node in elem.childNodes
+            )
+            formatting = [
+                elem.tagName
+                for rpr in run.getElementsByTagName("w:rPr")
+                for elem in rpr.childNodes
+                if elem.nodeType == elem.ELEMENT_NODE
+            ]
+            layout.append((child.tagName, text, formatting))
+    return layout
+
+
+class TestReplaceAll(unittest.TestCase):
+    def setUp(self):
+        temp_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(temp_dir.cleanup)
+        self.temp_path = Path(temp_dir.name)
+
+    def replace(self, paragraph, pattern, replacement):
+        unpacked = write_unpacked_document(self.temp_path / "unpacked", paragraph)
+        doc = Document(unpacked, rsid="00AB12CD")
+        self.assertEqual(doc.replace_all(pattern, replacement), 1)
+        return doc["word/document.xml"].get_node(tag="w:p")
+
+    def test_match_spanning_runs_with_different_formatting(self):
+        para = self.replace(
+            '<w:p><w:r><w:t xml:space="preserve">The </w:t></w:r>'
+            "<w:r><w:rPr><w:b/></w:rPr><w:t>Com</w:t></w:r>"
+            "<w:r><w:rPr><w:i/></w:rPr><w:t>pany</w:t></w:r>"
+            '<w:r><w:t xml:space="preserve"> shall pay.</w:t></w:r></w:p>',
+            "Company",
+            "Supplier",
+        )
+        self.assertEqual(
+            paragraph_layout(para),
+            [
+                ("w:r", "The ", []),
+                ("w:del", "Com", ["w:b"]),
+                ("w:del", "pany", ["w:i"]),
+                # The replacement takes the formatting of the first matched run
+                ("w:ins", "Supplier", ["w:b"]),
+                ("w:r", " shall pay.", []),
+            ],
+        )
+        self.assertEqual(len(para.getElementsByTagName("w:del")), 1)
+
+    def test_match_starting_and_ending_mid_run(self):
+        para = self.replace(
+            "<w:p><w:r><w:rPr><w:b/></w:rPr><w:t>The Company</w:t></w:r>"
+            '<w:r><w:rPr><w:i/></w:rPr><w:t xml:space="preserve"> shall pay.</w:t></w:r>'
+            "</w:p>",
+            r"Company shall",
+            "Supplier will",
+        )
+        self.assertEqual(
+            paragraph_layout(para),
+            [
+                ("w:r", "The ", ["w:b"]),
+                ("w:del", "Company", ["w:b"]),
+                ("w:del", " shall", ["w:i"]),
+                ("w:ins", "Supplier will", ["w:b"]),
+                ("w:r", " pay.", ["w:i"]),
+            ],
+        )
+        # Split pieces that start or end with a space keep it
+        for elem in para.getElementsByTagName("w:t") + para.getElementsByTagName(
+            "w:delText"
+        ):
+            text = elem.firstChild.data
+            if text != text.strip():
+                self.assertEqual(elem.getAttribute("xml:space"), "preserve")
+
+
+class TestRevisions(unittest.TestCase):
+    def setUp(self):
+        temp_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(temp_dir.cleanup)
+        unpacked = write_unpacked_document(
+            Path(temp_dir.name) / "unpacked",
+            "<w:p><w:r><w:t>The Company shall pay.</w:t></w:r></w:p>"
+            '<w:p><w:ins w:id="7" w:author="Ada" w:date="2025-01-02T00:00:00Z">'
+            "<w:r><w:t>Added</w:t></w:r></w:ins>"
+            '<w:del w:id="3" w:author="Bob" w:date="2025-01-01T00:00:00Z">'
+            "<w:r><w:delText>Removed</w:delText></w:r></w:del></w:p>",
+        )
+        self.doc = Document(unpacked, rsid="00AB12CD", author="Cy")
+        self.editor = self.doc["word/document.xml"]
+
+    def test_entries_in_document_order_with_int_ids(self):
+        self.editor.revisions()
+        # Changes made after the index is built still sort by position
+        self.editor.replace_all("Company", "Supplier")
+
+        revisions = self.editor.revisions()
+        self.assertEqual(
+            [(rev["type"], rev["text"]) for rev in revisions],
+            [
+                ("del", "Company"),
+                ("ins", "Supplier"),
+                ("ins", "Added"),
+                ("del", "Removed"),
+            ],
+        )
+        self.assertTrue(all(type(rev["id"]) is int for rev in revisions))
+        self.assertEqual([rev["id"] for rev in revisions[2:]], [7, 3])
+
+    def test_filtering_reuses_entries_until_edited(self):
+        self.assertEqual(len(self.editor.revisions()), 2)
+        with mock.patch.object(
+            DocxXMLEditor, "_revision_entry", wraps=self.editor._revision_entry
+        ) as entry:
+            by_ada = self.editor.revisions(author="Ada")
+            recent = self.editor.revisions(since="2025-01-02")
+            self.assertEqual(entry.call_count, 0)
+
+            self.editor.replace_all("pay", "settle")
+            self.assertEqual(len(self.editor.revisions(author="Cy")), 2)
+            self.assertGreater(entry.call_count, 0)
+        self.assertEqual([rev["text"] for rev in by_ada], ["Added"])
+        self.assertEqual([rev["text"] for rev in recent], ["Added"])
+
+    def test_returned_entries_are_copies(self):
+        self.doc.revisions()[0]["part"] = "changed"
+        self.assertEqual(
+            [rev["part"] for rev in self.doc.revisions()],
+            ["word/document.xml", "word/document.xml"],
+        )
+
+
+class TestRollback(unittest.TestCase):
+    def setUp(self):
+        temp_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(temp_dir.cleanup)
+        unpacked = write_unpacked_document(
+            Path(temp_dir.name) / "unpacked",
+            "<w:p><w:r><w:t>The Company shall pay.</w:t></w:r></w:p>"
+            '<w:p><w:ins w:id="7" w:author="Ada" w:date="2025-01-02T00:00:00Z">'
+            "<w:r><w:t>Added</w:t></w:r></w:ins>"
+            '<w:del w:id="3" w:author="Bob" w:date="2025-01-01T00:00:00Z">'
+            "<w:r><w:delText>Removed</w:delText></w:r></w:del></w:p>",
+        )
+        self.doc = Document(unpacked, rsid="00AB12CD", author="Cy")
+        self.editor = self.doc["word/document.xml"]
+
+    def test_tracked_change_operations_roll_back(self):
+        edits = {
+            "suggest_deletion": lambda: self.editor.suggest_deletion(
+                self.editor.get_node(tag="w:r", contains="The Company")
+            ),
+            "revert_insertion": lambda: self.editor.revert_insertion(
+                self.editor.get_node(tag="w:ins", attrs={"w:id": "7"})
+            ),
+            "revert_deletion": lambda: self.editor.revert_deletion(
+                self.editor.get_node(tag="w:del", attrs={"w:id": "3"})
+            ),
+        }
+        original = self.editor.dom.toxml()
+        for name, edit in edits.items():
+            with self.subTest(name):
+                checkpoint = self.editor.checkpoint()
+                edit()
+                self.assertNotEqual(self.editor.dom.toxml(), original)
+                self.editor.rollback(checkpoint)
+                self.assertEqual(self.editor.dom.toxml(), original)
+                self.assertEqual(len(self.editor.revisions()), 2)
+
+    def test_document_rollback_removes_comments_from_every_part(self):
+        paragraph = self.editor.get_node(tag="w:p", contains="Company")
+        original = self.editor.dom.toxml()
+        checkpoint = self.doc.checkpoint()
+        comment_id = self.doc.add_comment(paragraph, paragraph, "Check this")
+        self.assertTrue(self.doc.comments_path.exists())
+
+        self.doc.rollback(checkpoint)
+
+        self.assertEqual(self.editor.dom.toxml(), original)
+        self.assertFalse(self.doc.comments_path.exists())
+        self.assertNotIn("word/comments.xml", self.doc._editors)
+        self.assertEqual(self.doc.existing_comments, {})
+        with self.assertRaises(ValueError):
+            self.doc.reply_to_comment(comment_id, "Agreed")
+        self.doc.save()
+        rels = self.doc.original_path / "word/_rels/document.xml.rels"
+        self.assertNotIn(b"comments.xml", rels.read_bytes())
+
+    def test_document_rollback_keeps_earlier_comments(self):
+        paragraph = self.editor.get_node(tag="w:p", contains="Company")
+        kept = self.doc.add_comment(paragraph, paragraph, "Kept")
+        checkpoint = self.doc.checkpoint()
+        undone = self.doc.add_comment(paragraph, paragraph, "Undone")
+        comments = self.doc["word/comments.xml"]
+
+        self.doc.rollback(checkpoint)
+
+        self.assertEqual(
+            [
+                comment.getAttribute("w:id")
+                for comment in comments.dom.getElementsByTagName("w:comment")
+            ],
+            [str(kept)],
+        )
+        self.assertEqual(list(self.doc.existing_comments), [kept])
+        # IDs handed out before the rollback are not reused
+        self.assertGreater(self.doc.add_comment(paragraph, paragraph, "New"), undone)
+        self.doc.reply_to_comment(kept, "Agreed")
+        self.doc.save()
+
+
+class TestWorkspace(unittest.TestCase):
+    def test_writing_xml_in_place_leaves_original(self):
+        with tempfile.TemporaryDirectory() as temp_dir:
+            unpacked = write_unpacked_document(
+                Path(temp_dir) / "unpacked", "<w:p><w:r><w:t>Text</w:t></w:r></w:p>"
+            )
+            original = (unpacked / "word/document.xml").read_bytes()
+            doc = Document(unpacked)
+            with open(doc.unpacked_path / "word/document.xml", "r+b") as f:
+                f.write(b"corrupt")
+            self.assertEqual((unpacked / "word/document.xml").read_bytes(), original)
+            # Nothing is created next to the caller's directory
+            self.assertEqual(list(Path(temp_dir).iterdir()), [unpacked])
+
+    def test_reflink_is_only_tried_on_linux(self):
+        with tempfile.TemporaryDirectory() as temp_dir:
+            src = Path(temp_dir) / "document.xml"
+            src.write_bytes(b"<w:document/>")
+            dst = Path(temp_dir) / "copy.xml"
+            with mock.patch.object(document.sys, "platform", "darwin"), mock.patch(
+                "fcntl.ioctl"
+            ) as ioctl:
+                _link_or_copy(src, dst)
+            ioctl.assert_not_called()
+            self.assertEqual(dst.read_bytes(), src.read_bytes())
+
+
+class TestOpenDocx(unittest.TestCase):
+    def setUp(self):
+        temp_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(temp_dir.cleanup)
+        self.temp_path = Path(temp_dir.name)
+        unpacked = write_unpacked_document(
+            self.temp_path / "unpacked",
+            "<w:p><w:r><w:t>The Company shall pay.</w:t></w:r></w:p>",
+        )
+        Document(unpacked, rsid="00AB12CD").save(validate=False)
+
+        self.image = os.urandom(2000)
+        (unpacked / "word/media").mkdir()
+        (unpacked / "word/media/image1.png").write_bytes(self.image)
+        for name, old, new in [
+            (
+                "word/_rels/document.xml.rels",
+                "</Relationships>",
+                f'<Relationship Id="rId9" Type="{RELATIONSHIPS}/image" '
+                'Target="media/image1.png"/></Relationships>',
+            ),
+            (
+                "[Content_Types].xml",
+                "<Default Extension=",
+                '<Default Extension="png" ContentType="image/png"/><Default Extension=',
+            ),
+        ]:
+            path = unpacked / name
+            path.write_text(path.read_text().replace(old, new, 1))
+
+        self.docx = self.temp_path / "source.docx"
+        pack_document(unpacked, self.docx)
+
+    def test_validated_save_leaves_unchanged_parts_packed(self):
+        doc = Document.open_docx(self.docx, rsid="00AB12CD")
+        doc.replace_all("Company", "Supplier")
+        output = self.temp_path / "output.docx"
+        doc.save_docx(output, incremental=True)
+
+        self.assertIn("word/media/image1.png", doc._pending_parts)
+        with zipfile.ZipFile(output) as zf:
+            self.assertEqual(zf.read("word/media/image1.png"), self.image)
+            self.assertIn(b"Supplier", zf.read("word/document.xml"))
+
+    def test_save_docx_validates_every_part_by_default(self):
+        doc = Document.open_docx(self.docx, rsid="00AB12CD")
+        with mock.patch.object(doc, "validate") as validate:
+            doc.save_docx(self.temp_path / "output.docx")
+        validate.assert_called_once_with(incremental=False)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,553 @@
+#!/usr/bin/env python3
+"""
+Stream the text of a Word document as plain text or Markdown.
+
+The story parts are parsed with expat in fixed-size chunks and output is written
+paragraph by paragraph, so memory use does not grow with the document. Nothing
+is loaded into a DOM and no external converter is needed.
+
+Markdown output renders headings (from the paragraph style), bullet and numbered
+lists (from numbering.xml) and tables. Tracked changes are shown with CriticMarkup
+({++inserted++}, {--deleted--}) or can be accepted or rejected.
+
+With --anchors every block carries the line number of its w:p (or w:tbl) element
+in the pretty-printed XML, as produced by unpack.py and Document.open_docx, so it
+can be passed straight to get_node(tag="w:p", line_number=...). Markdown gets a
+trailing <!-- L123 --> comment, text a leading [L123]. For an unpacked directory
+the line numbers are those of the files on disk.
+
+Usage:
+    python extract_text.py <file.docx|unpacked_dir> [output] [--format text|markdown]
+        [--changes markup|accept|reject] [--anchors] [--all-stories]
+
+Example:
+    python extract_text.py contract.docx contract.md --anchors
+    python extract_text.py unpacked/ --format text --changes accept
+"""
+
+import argparse
+import re
+import sys
+import zipfile
+from contextlib import contextmanager
+from pathlib import Path
+from xml.parsers import expat
+
+from defusedxml import ElementTree
+
+try:
+    from .utilities import _forbid_entity_declarations
+except ImportError:
+    # Running as a script: make the skill root importable
+    sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+    from scripts.utilities import _forbid_entity_declarations
+
+# Story parts other than the main document, in output order
+_OTHER_STORY_PATTERNS = (
+    re.compile(r"word/header\d*\.xml"),
+    re.compile(r"word/footer\d*\.xml"),
+    re.compile(r"word/footnotes\.xml"),
+    re.compile(r"word/endnotes\.xml"),
+    re.compile(r"word/comments\.xml"),
+)
+
+_W_NAMESPACE = "http://schemas.openxmlformats.org/wordprocessingml/2006/main"
+
+_CHUNK_SIZE = 1 << 16
+
+# Tracked change wrappers and the kind of change they mark
+_CHANGE_TAGS = {"w:ins": "ins", "w:moveTo": "ins", "w:del": "del", "w:moveFrom": "del"}
+
+_CRITIC_MARKUP = {"ins": ("{++", "++}"), "del": ("{--", "--}")}
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Extract text or Markdown from a .docx or unpacked directory"
+    )
+    parser.add_argument("source", help=".docx file or unpacked directory")
+    parser.add_argument("output", nargs="?", help="Output file (default: stdout)")
+    parser.add_argument(
+        "--format", choices=("text", "markdown"), default="markdown", help="Output format"
+    )
+    parser.add_argument(
+        "--changes",
+        choices=("markup", "accept", "reject"),
+        default="markup",
+        help="Show tracked changes, or accept/reject them",
+    )
+    parser.add_argument(
+        "--anchors", action="store_true", help="Tag blocks with XML line numbers"
+    )
+    parser.add_argument(
+        "--all-stories",
+        action="store_true",
+        help="Include headers, footers, footnotes, endnotes and comments",
+    )
+    args = parser.parse_args()
+
+    options = dict(
+        markdown=args.format == "markdown",
+        changes=args.changes,
+        anchors=args.anchors,
+        all_stories=args.all_stories,
+    )
+    try:
+        if args.output:
+            with open(args.output, "w", encoding="utf-8") as out:
+                export_text(args.source, out, **options)
+        else:
+            export_text(args.source, sys.stdout, **options)
+    except ValueError as e:
+        sys.exit(f"Error: {e}")
+
+
+def export_text(source, out, **options):
+    """Write the text of a document to a file object.
+
+    Args:
+        source: Path to a .docx file or an unpacked directory
+        out: Text file object to write to
+        **options: See iter_lines()
+
+    Raises:
+        ValueError: If the source cannot be read
+    """
+    for line in iter_lines(source, **options):
+        out.write(line)
+        out.write("\n")
+
+
+def iter_lines(
+    source, markdown=True, changes="markup", anchors=False, all_stories=False
+):
+    """Yield the text of a document line by line.
+
+    Args:
+        source: Path to a .docx file or an unpacked directory
+        markdown: If True, render headings, lists and tables as Markdown (default: True)
+        changes: "markup" shows tracked changes with CriticMarkup, "accept" keeps
+            only the new text, "reject" keeps only the old text (default: "markup")
+        anchors: If True, tag each block with the line number of its element in
+            the pretty-printed XML (default: False)
+        all_stories: If True, also export headers, footers, footnotes, endnotes and
+            comments after the body, each introduced by its part name (default: False)
+
+    Yields:
+        str: Output lines without trailing newlines
+
+    Raises:
+        ValueError: If the source cannot be read or changes is not a known mode
+
+    Example:
+        for line in iter_lines("report.docx", anchors=True):
+            print(line)
+    """
+    if changes not in ("markup", "accept", "reject"):
+        raise ValueError(f"Unknown changes mode: {changes}")
+
+    with _open_package(source) as package:
+        names = package.names()
+        if "word/document.xml" not in names:
+            raise ValueError(f"{source} has no word/document.xml")
+
+        styles = _heading_levels(package.read("word/styles.xml"))
+        numbering = _numbering_formats(package.read("word/numbering.xml"))
+        parts = ["word/document.xml"]
+        if all_stories:
+            for pattern in _OTHER_STORY_PATTERNS:
+                parts.extend(sorted(n for n in names if pattern.fullmatch(n)))
+
+        for name in parts:
+            if name != "word/document.xml":
+                yield ""
+                yield f"<!-- {name} -->" if markdown else f"--- {name} ---"
+                yield ""
+            exporter = _StoryExporter(
+                markdown, changes, anchors, styles, numbering, package.pretty_lines
+            )
+            with package.open(name) as f:
+                while True:
+                    chunk = f.read(_CHUNK_SIZE)
+                    exporter.feed(chunk, final=not chunk)
+                    yield from exporter.take_lines()
+                    if not chunk:
+                        break
+
+
+class _Package:
+    """Read access to the parts of a .docx archive or an unpacked directory."""
+
+    def __init__(self, source):
+        self.path = Path(source)
+        self.zip = None if self.path.is_dir() else zipfile.ZipFile(self.path)
+        # Archives hold condensed XML; line numbers are computed as if pretty-printed
+        self.pretty_lines = self.zip is not None
+
+    def names(self):
+        if self.zip is not None:
+            return set(self.zip.namelist())
+        return {
+            p.relative_to(self.path).as_posix() for p in self.path.rglob("*") if p.is_file()
+        }
+
+    def open(self, name):
+        if self.zip is not None:
+            return self.zip.open(name)
+        return open(self.path / name, "rb")
+
+    def read(self, name):
+        """Read a part, or return None if the package does not have it."""
+        try:
+            with self.open(name) as f:
+                return f.read()
+        except (KeyError, FileNotFoundError):
+            return None
+
+    def close(self):
+        if self.zip is not None:
+            self.zip.close()
+
+
+@contextmanager
+def _open_package(source):
+    try:
+        package = _Package(source)
+    except (OSError, zipfile.BadZipFile) as e:
+        raise ValueError(f"Cannot read {source}: {e}")
+    try:
+        yield package
+    finally:
+        package.close()
+
+
+def _heading_levels(styles_xml):
+    """Map paragraph style IDs to heading levels (Title is level 1)."""
+    levels = {}
+    if styles_xml is None:
+        return levels
+    w = f"{{{_W_NAMESPACE}}}"
+    for style in ElementTree.fromstring(styles_xml).iter(f"{w}style"):
+        style_id = style.get(f"{w}styleId")
+        name_elem = style.find(f"{w}name")
+        name = (name_elem.get(f"{w}val") if name_elem is not None else "") or ""
+        outline = style.find(f"{w}pPr/{w}outlineLvl")
+        match = re.fullmatch(r"heading\s*([1-9])", name.strip(), re.IGNORECASE)
+        if match:
+            levels[style_id] = int(match.group(1))
+        elif name.strip().lower() == "title":
+            levels[style_id] = 1
+        elif outline is not None and (outline.get(f"{w}val") or "").isdigit():
+            level = int(outline.get(f"{w}val")) + 1
+            if level <= 9:
+                levels[style_id] = level
+    return levels
+
+
+def _numbering_formats(numbering_xml):
+    """Map (numId, ilvl) to the level's number format (e.g. "bullet", "decimal")."""
+    formats = {}
+    if numbering_xml is None:
+        return formats
+    w = f"{{{_W_NAMESPACE}}}"
+    root = ElementTree.fromstring(numbering_xml)
+    abstract_formats = {}
+    for abstract in root.iter(f"{w}abstractNum"):
+        levels = {}
+        for lvl in abstract.iter(f"{w}lvl"):
+            fmt = lvl.find(f"{w}numFmt")
+            levels[lvl.get(f"{w}ilvl")] = (
+                fmt.get(f"{w}val") if fmt is not None else "decimal"
+            )
+        abstract_formats[abstract.get(f"{w}abstractNumId")] = levels
+    for num in root.iter(f"{w}num"):
+        abstract_id = num.find(f"{w}abstractNumId")
+        if abstract_id is None:
+            continue
+        for ilvl, fmt in abstract_formats.get(abstract_id.get(f"{w}val"), {}).items():
+            formats[(num.get(f"{w}numId"), ilvl)] = fmt
+    return formats
+
+
+class _StoryExporter:
+    """Expat handlers turning one story part into output lines.
+
+    Only the current paragraph and table row are held in memory.
+    """
+
+    def __init__(self, markdown, changes, anchors, styles, numbering, pretty_lines):
+        self.markdown = markdown
+        self.changes = changes
+        self.anchors = anchors
+        self.styles = styles
+        self.numbering = numbering
+        self.pretty_lines = pretty_lines
+
+        self.parser = expat.ParserCreate()
+        self.parser.buffer_text = True
+        self.parser.EntityDeclHandler = _forbid_entity_declarations
+        self.parser.StartElementHandler = self._start
+        self.parser.EndElementHandler = self._end
+        self.parser.CharacterDataHandler = self._characters
+        self.parser.CommentHandler = self._comment
+        self.parser.ProcessingInstructionHandler = self._processing_instruction
+
+        self.lines = []
+        # Whether the last block was a list item or table row (no blank line after it)
+        self.in_compact = False
+        self.tags = []
+        self.change_stack = []
+
+        # Pretty-printed line tracking: the declaration takes line 1
+        self.line = 1
+        # Per open element: [child count, pending lone text, last child was text]
+        self.nodes = []
+
+        # Paragraph being collected (outermost only; nested text boxes are inlined)
+        self.para_depth = 0
+        self.para_line = None
+        self.segments = []
+        self.open_change = None
+        self.style = None
+        self.num_id = None
+        self.ilvl = None
+        self.hidden = False
+
+        # Tables: rows are emitted as they end; nested tables are flattened into cells
+        self.table_depth = 0
+        self.table_line = None
+        self.row_index = 0
+        self.row_cells = []
+        self.cell_paragraphs = []
+
+    def feed(self, data, final=False):
+        try:
+            self.parser.Parse(data, final)
+        except expat.ExpatError as e:
+            raise ValueError(f"Malformed XML: {e}")
+
+    def take_lines(self):
+        lines, self.lines = self.lines, []
+        return lines
+
+    # ==================== Line tracking ====================
+
+    def _element_line(self):
+        """Line the element being opened starts on, and update the tracking state."""
+        if not self.pretty_lines:
+            return self.parser.CurrentLineNumber
+        self._add_child()
+        self.line += 1
+        self.nodes.append([0, None, False])
+        return self.line
+
+    def _add_child(self, text=None):
+        """Account for a child node of the current element (text passed for text nodes)."""
+        if not self.nodes:
+            return
+        node = self.nodes[-1]
+        if text is not None and node[2]:
+            # Expat may report one text node in several pieces
+            if node[1] is not None:
+                node[1] += text
+            else:
+                self.line += text.count("\n")
+            return
+        node[0] += 1
+        node[2] = text is not None
+        # A lone text child is written on its parent's line, so a pending text
+        # node only takes lines of its own once a second child shows up
+        if node[1] is not None:
+            self.line += 1 + node[1].count("\n")
+            node[1] = None
+        if text is not None:
+            if node[0] == 1:
+                node[1] = text
+            else:
+                self.line += 1 + text.count("\n")
+
+    def _close_element(self):
+        if not self.pretty_lines:
+            return
+        count, pending, _ = self.nodes.pop()
+        if pending is not None:
+            # Only child: stays on the element's line, but embedded newlines count
+            self.line += pending.count("\n")
+        elif count:
+            # Closing tag on its own line
+            self.line += 1
+
+    # ==================== Expat handlers ====================
+
+    def _start(self, tag, attrs):
+        line = self._element_line()
+        parent = self.tags[-1] if self.tags else None
+        self.tags.append(tag)
+
+        if tag == "w:p":
+            self.para_depth += 1
+            if self.para_depth == 1:
+                self.para_line = line
+                self.segments = []
+                self.open_change = None
+                self.style = self.num_id = self.ilvl = None
+            elif self.segments:
+                self.segments.append(" ")
+        elif tag == "w:tbl":
+            self.table_depth += 1
+            if self.table_depth == 1 and self.para_depth == 0:
+                # A table directly after a list needs a blank line in between
+                self._end_table()
+                self.table_line = line
+                self.row_index = 0
+        elif tag == "w:tr" and self.table_depth == 1:
+            self.row_cells = []
+        elif tag == "w:tc" and self.table_depth == 1:
+            self.cell_paragraphs = []
+        elif tag in _CHANGE_TAGS:
+            self.change_stack.append(_CHANGE_TAGS[tag])
+        elif self.para_depth == 1 and parent == "w:pPr":
+            if tag == "w:pStyle":
+                self.style = attrs.get("w:val")
+        elif self.para_depth == 1 and parent == "w:numPr":
+            if tag == "w:numId":
+                self.num_id = attrs.get("w:val")
+            elif tag == "w:ilvl":
+                self.ilvl = attrs.get("w:val")
+        elif tag == "w:vanish" and parent == "w:rPr" and "w:pPr" not in self.tags:
+            self.hidden = attrs.get("w:val", "true") not in ("0", "false", "off")
+        elif parent == "w:r" and self.para_depth:
+            if tag == "w:tab" or tag == "w:ptab":
+                self._append("\t")
+            elif tag in ("w:br", "w:cr"):
+                self._append("\n")
+            elif tag == "w:noBreakHyphen":
+                self._append("-")
+
+    def _end(self, tag):
+        self.tags.pop()
+        self._close_element()
+
+        if tag == "w:p":
+            self.para_depth -= 1
+            if self.para_depth == 0:
+                self._end_paragraph()
+        elif tag == "w:tbl":
+            self.table_depth -= 1
+            if self.table_depth == 0 and self.para_depth == 0:
+                self._end_table()
+        elif tag == "w:tr" and self.table_depth == 1:
+            self._end_row()
+        elif tag == "w:tc" and self.table_depth == 1:
+            separator = "<br>" if self.markdown else " / "
+            self.row_cells.append(separator.join(p for p in self.cell_paragraphs if p))
+        elif tag in _CHANGE_TAGS:
+            self.change_stack.pop()
+        elif tag == "w:r":
+            self.hidden = False
+
+    def _characters(self, data):
+        if self.pretty_lines:
+            self._add_child(data)
+        if self.tags and self.tags[-1] in ("w:t", "w:delText") and self.para_depth:
+            self._append(data)
+
+    def _comment(self, data):
+        if self.pretty_lines:
+            self._add_child()
+            self.line += 1 + data.count("\n")
+
+    def _processing_instruction(self, target, data):
+        if self.pretty_lines:
+            self._add_child()
+            self.line += 1
+
+    # ==================== Output ====================
+
+    def _append(self, text):
+        if self.hidden:
+            return
+        change = self.change_stack[-1] if self.change_stack else None
+        if change == "ins" and self.changes == "reject":
+            return
+        if change == "del" and self.changes == "accept":
+            return
+        if self.changes == "markup" and change != self.open_change:
+            if self.open_change:
+                self.segments.append(_CRITIC_MARKUP[self.open_change][1])
+            if change:
+                self.segments.append(_CRITIC_MARKUP[change][0])
+            self.open_change = change
+        self.segments.append(text)
+
+    def _end_paragraph(self):
+        if self.open_change:
+            self.segments.append(_CRITIC_MARKUP[self.open_change][1])
+        text = "".join(self.segments)
+        self.segments = []
+
+        if self.table_depth:
+            if self.markdown:
+                text = text.replace("\n", "<br>").replace("|", "\\|")
+            self.cell_paragraphs.append(text.replace("\n", " "))
+            return
+        if not text.strip():
+            return
+
+        is_list = False
+        if self.markdown:
+            level = self.styles.get(self.style)
+            if level:
+                text = "#" * level + " " + text.replace("\n", " ")
+            elif self.num_id not in (None, "0"):
+                ilvl = self.ilvl or "0"
+                fmt = self.numbering.get((self.num_id, ilvl), "decimal")
+                marker = "-" if fmt in ("bullet", "none") else "1."
+                indent = "  " * int(ilvl) if ilvl.isdigit() else ""
+                text = f"{indent}{marker} " + text.replace("\n", " ")
+                is_list = True
+            else:
+                text = text.replace("\n", "  \n")
+        self._emit_block(self._anchored(text, self.para_line), is_list)
+
+    def _end_row(self):
+        if self.markdown:
+            line = "| " + " | ".join(self.row_cells) + " |"
+        else:
+            line = "\t".join(self.row_cells)
+        if self.row_index == 0:
+            if self.markdown:
+                if self.anchors:
+                    self._emit_block(f"<!-- L{self.table_line} -->", True)
+                self._emit_block(line, True)
+                line = "|" + "|".join(" --- " for _ in self.row_cells) + "|"
+            else:
+                line = self._anchored(line, self.table_line)
+        self._emit_block(line, True)
+        self.row_index += 1
+
+    def _anchored(self, text, line):
+        """Add the XML line anchor: a trailing comment in Markdown, a prefix in text."""
+        if not self.anchors:
+            return text
+        if self.markdown:
+            return f"{text} <!-- L{line} -->"
+        return f"[L{line}] {text}"
+
+    def _emit_block(self, text, compact):
+        """Add a block; in Markdown, blank lines separate blocks except within lists and tables."""
+        if self.markdown and not compact and self.in_compact:
+            self.lines.append("")
+        self.lines.append(text)
+        if self.markdown and not compact:
+            self.lines.append("")
+        self.in_compact = compact
+
+    def _end_table(self):
+        if self.markdown and self.in_compact:
+            self.lines.append("")
+        self.in_compact = False
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,130 @@
+import re
+import tempfile
+import unittest
+from pathlib import Path
+
+from ooxml.scripts.pack import pack_document
+from ooxml.scripts.unpack import unpack_document
+
+from .document_test import DECLARATION, NAMESPACES, write_unpacked_document
+from .extract_text import iter_lines
+from .utilities import XMLEditor
+
+
+def numbered(num_id, ilvl, text):
+    return (
+        f'<w:p><w:pPr><w:numPr><w:ilvl w:val="{ilvl}"/><w:numId w:val="{num_id}"/>'
+        f"</w:numPr></w:pPr><w:r><w:t>{text}</w:t></w:r></w:p>"
+    )
+
+
+def row(*cells):
+    cells = "".join(
+        f"<w:tc><w:p><w:r><w:t>{cell}</w:t></w:r></w:p></w:tc>" for cell in cells
+    )
+    return f"<w:tr>{cells}</w:tr>"
+
+
+BODY = (
+    '<w:p><w:pPr><w:pStyle w:val="Heading1"/></w:pPr><w:r><w:t>Terms</w:t></w:r></w:p>'
+    + numbered(1, 0, "Bullet one")
+    + numbered(1, 1, "Nested")
+    + numbered(2, 0, "Step")
+    + f"<w:tbl>{row('Name', 'Fee')}{row('Ada', '30')}</w:tbl>"
+    + '<w:p><w:r><w:t xml:space="preserve">Pay within </w:t></w:r>'
+    '<w:del w:id="1" w:author="Ada" w:date="2025-01-01T00:00:00Z">'
+    "<w:r><w:delText>30</w:delText></w:r></w:del>"
+    '<w:ins w:id="2" w:author="Ada" w:date="2025-01-01T00:00:00Z">'
+    "<w:r><w:t>45</w:t></w:r></w:ins>"
+    '<w:r><w:t xml:space="preserve"> days.</w:t></w:r></w:p>'
+)
+
+STYLES = (
+    f'<w:styles {NAMESPACES}><w:style w:type="paragraph" w:styleId="Heading1">'
+    '<w:name w:val="heading 1"/></w:style></w:styles>'
+)
+
+NUMBERING = (
+    f"<w:numbering {NAMESPACES}>"
+    '<w:abstractNum w:abstractNumId="0">'
+    '<w:lvl w:ilvl="0"><w:numFmt w:val="bullet"/></w:lvl>'
+    '<w:lvl w:ilvl="1"><w:numFmt w:val="bullet"/></w:lvl></w:abstractNum>'
+    '<w:abstractNum w:abstractNumId="1">'
+    '<w:lvl w:ilvl="0"><w:numFmt w:val="decimal"/></w:lvl></w:abstractNum>'
+    '<w:num w:numId="1"><w:abstractNumId w:val="0"/></w:num>'
+    '<w:num w:numId="2"><w:abstractNumId w:val="1"/></w:num>'
+    "</w:numbering>"
+)
+
+
+# Currently this is not run automatically in CI; it's just for documentation and manual checking.
+class TestIterLines(unittest.TestCase):
+    def setUp(self):
+        temp_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(temp_dir.cleanup)
+        self.temp_path = Path(temp_dir.name)
+        unpacked = write_unpacked_document(self.temp_path / "source", BODY)
+        (unpacked / "word/styles.xml").write_text(DECLARATION + STYLES)
+        (unpacked / "word/numbering.xml").write_text(DECLARATION + NUMBERING)
+        self.docx = self.temp_path / "source.docx"
+        pack_document(unpacked, self.docx)
+
+    def test_markdown_blocks(self):
+        self.assertEqual(
+            list(iter_lines(self.docx)),
+            [
+                "# Terms",
+                "",
+                "- Bullet one",
+                "  - Nested",
+                "1. Step",
+                "",
+                "| Name | Fee |",
+                "| --- | --- |",
+                "| Ada | 30 |",
+                "",
+                "Pay within {--30--}{++45++} days.",
+                "",
+            ],
+        )
+
+    def test_tracked_changes_modes(self):
+        for changes, expected in [
+            ("markup", "Pay within {--30--}{++45++} days."),
+            ("accept", "Pay within 45 days."),
+            ("reject", "Pay within 30 days."),
+        ]:
+            with self.subTest(changes):
+                lines = list(iter_lines(self.docx, markdown=False, changes=changes))
+                self.assertEqual(lines[-1], expected)
+
+    def test_unknown_changes_mode(self):
+        with self.assertRaises(ValueError):
+            list(iter_lines(self.docx, changes="hide"))
+
+    def test_anchors_match_unpacked_line_numbers(self):
+        unpacked = self.temp_path / "unpacked"
+        unpack_document(self.docx, unpacked)
+        editor = XMLEditor(unpacked / "word/document.xml")
+
+        for source in (self.docx, unpacked):
+            with self.subTest(source=source.name):
+                lines = iter_lines(
+                    source, markdown=False, changes="accept", anchors=True
+                )
+                matches = [re.fullmatch(r"\[L(\d+)\] (.*)", line) for line in lines]
+                anchored = [(int(match[1]), match[2]) for match in matches if match]
+                self.assertEqual(len(anchored), 6)
+                for line, text in anchored:
+                    # A table is anchored on its first row
+                    tag = "w:tbl" if "\t" in text else "w:p"
+                    node = editor.get_node(tag=tag, line_number=line)
+                    node_text = "".join(
+                        elem.firstChild.data
+                        for elem in node.getElementsByTagName("w:t")
+                    )
+                    self.assertTrue(node_text.startswith(text.replace("\t", "")))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,350 @@
+#!/usr/bin/env python3
+"""
+Mail merge: render one .docx per record from a template with {{placeholders}}.
+
+The template is read and parsed once. Placeholders are found in the visible text
+of every story part (body, headers, footers, footnotes, endnotes, comments) even
+when Word split them across several w:r elements; the characters are gathered
+into the first run so the placeholder keeps that run's formatting. Only w:t text
+is substituted: placeholders in attributes (image descriptions), field codes and
+deleted text are left as they are. Each part is then serialized once and split
+into literal chunks and field names, so rendering a record is a string join with
+no XML parsing.
+
+Outputs are written by a process pool. Members without placeholders (styles,
+media, relationships, ...) are copied from the template archive byte-for-byte,
+without recompression.
+
+Usage:
+    python merge.py <template.docx> <records.csv|records.json> <output_dir> [--name PATTERN] [--jobs N]
+
+Example:
+    python merge.py contract.docx clients.csv out/ --name "contract-{client_id}.docx" --jobs 8
+"""
+
+import argparse
+import csv
+import html
+import io
+import json
+import os
+import re
+import sys
+import zipfile
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+
+from defusedxml import minidom
+
+try:
+    from ooxml.scripts.pack import copy_member_raw
+except ImportError:
+    # Running as a script: make the skill root importable
+    sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+    from ooxml.scripts.pack import copy_member_raw
+
+# Parts whose text may hold placeholders
+_STORY_PART_PATTERN = re.compile(
+    r"word/(document|header\d*|footer\d*|footnotes|endnotes|comments)\.xml"
+)
+
+DEFAULT_PLACEHOLDER = r"\{\{\s*([A-Za-z_][\w.-]*)\s*\}\}"
+
+# Markup that closes the current w:t to emit line breaks and tabs inside a run
+_LINE_BREAK_XML = '</w:t><w:br/><w:t xml:space="preserve">'
+_TAB_XML = '</w:t><w:tab/><w:t xml:space="preserve">'
+
+# Marks field names in serialized parts; it cannot occur in parsed XML
+_FIELD_MARK = "\x00"
+
+# Characters XML 1.0 does not allow, even escaped
+_INVALID_XML_CHARS = re.compile("[\x00-\x08\x0b\x0c\x0e-\x1f\ud800-\udfff\ufffe\uffff]")
+
+# Template loaded once per worker process
+_worker_template = None
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Render one .docx per record from a template with {{placeholders}}"
+    )
+    parser.add_argument("template", help="Template .docx file")
+    parser.add_argument("records", help="Records as .csv (with header) or .json list")
+    parser.add_argument("output_dir", help="Directory for the generated documents")
+    parser.add_argument(
+        "--name",
+        default="{index:04d}.docx",
+        help="Output file name pattern; record fields and {index} are available",
+    )
+    parser.add_argument(
+        "--jobs", type=int, default=None, help="Worker processes (default: CPU count)"
+    )
+    args = parser.parse_args()
+
+    try:
+        records = load_records(args.records)
+        template = MergeTemplate(args.template)
+        outputs = template.merge(records, args.output_dir, args.name, jobs=args.jobs)
+    except ValueError as e:
+        sys.exit(f"Error: {e}")
+
+    print(f"Generated {len(outputs)} documents in {args.output_dir}")
+
+
+def load_records(path):
+    """Load merge records from a CSV file with a header row or a JSON list of objects.
+
+    Args:
+        path: Path to a .csv or .json file
+
+    Returns:
+        list: One dict per record
+
+    Raises:
+        ValueError: If the file type is not supported or the JSON is not a list
+    """
+    path = Path(path)
+    if path.suffix.lower() == ".csv":
+        with open(path, newline="", encoding="utf-8-sig") as f:
+            return list(csv.DictReader(f))
+    if path.suffix.lower() == ".json":
+        records = json.loads(path.read_text(encoding="utf-8"))
+        if not isinstance(records, list) or not all(
+            isinstance(record, dict) for record in records
+        ):
+            raise ValueError(f"{path} must hold a JSON list of objects")
+        return records
+    raise ValueError(f"Unsupported records file type: {path.suffix}")
+
+
+class MergeTemplate:
+    """A .docx template parsed once and rendered for many records.
+
+    Example:
+        template = MergeTemplate("contract.docx")
+        print(template.fields)  # {'client', 'amount', ...}
+        template.render({"client": "ACME", "amount": "1,000"}, "acme.docx")
+        template.merge(records, "out/", "contract-{client}.docx", jobs=8)
+    """
+
+    def __init__(self, template_docx, placeholder=DEFAULT_PLACEHOLDER):
+        """
+        Read the template and prepare its story parts for rendering.
+
+        Args:
+            template_docx: Path to the template .docx file
+            placeholder: Regex matching a placeholder, with one group capturing the
+                field name
+
+        Raises:
+            ValueError: If the template cannot be read or the regex has no group
+        """
+        self.placeholder = re.compile(placeholder)
+        if self.placeholder.groups != 1:
+            raise ValueError("Placeholder pattern must have exactly one group")
+
+        try:
+            self.data = Path(template_docx).read_bytes()
+            with zipfile.ZipFile(io.BytesIO(self.data)) as zf:
+                # name -> [literal, field, literal, ..., literal]
+                self.parts = {}
+                for info in zf.infolist():
+                    if _STORY_PART_PATTERN.fullmatch(info.filename):
+                        chunks = self._compile_part(zf.read(info))
+                        if len(chunks) > 1:
+                            self.parts[info.filename] = chunks
+        except (OSError, zipfile.BadZipFile) as e:
+            raise ValueError(f"Cannot read template {template_docx}: {e}")
+
+        self.fields = {
+            field for chunks in self.parts.values() for field in chunks[1::2]
+        }
+
+    def render(self, record, output_path):
+        """Write the document for one record.
+
+        Args:
+            record: Mapping of field name to value (converted with str())
+            output_path: Path of the .docx file to write
+
+        Raises:
+            ValueError: If the record lacks a field used by the template
+        """
+        missing = self.fields - set(record)
+        if missing:
+            raise ValueError(f"Record is missing fields: {', '.join(sorted(missing))}")
+
+        values = {field: _format_value(record[field]) for field in self.fields}
+        output_path = Path(output_path)
+        output_path.parent.mkdir(parents=True, exist_ok=True)
+        with zipfile.ZipFile(io.BytesIO(self.data)) as source, zipfile.ZipFile(
+            output_path, "w", zipfile.ZIP_DEFLATED
+        ) as target:
+            for info in source.infolist():
+                chunks = self.parts.get(info.filename)
+                if chunks is None:
+                    copy_member_raw(source, target, info)
+                    continue
+                rendered = "".join(
+                    values[chunk] if i % 2 else chunk for i, chunk in enumerate(chunks)
+                )
+                new_info = zipfile.ZipInfo(info.filename, date_time=info.date_time)
+                new_info.compress_type = zipfile.ZIP_DEFLATED
+                new_info.external_attr = info.external_attr
+                target.writestr(new_info, rendered.encode("utf-8"))
+
+    def merge(self, records, output_dir, name_pattern="{index:04d}.docx", jobs=None):
+        """Render every record into output_dir using a process pool.
+
+        Args:
+            records: Sequence of mappings (see render())
+            output_dir: Directory for the generated documents (created if needed)
+            name_pattern: str.format pattern for file names; receives the record's
+                fields and index (1-based). Names must stay inside output_dir.
+            jobs: Number of worker processes (default: CPU count); 1 renders in-process
+
+        Returns:
+            list: Paths of the generated documents, in record order
+
+        Raises:
+            ValueError: If a record lacks a field, a name points outside output_dir
+                or two records map to the same file
+        """
+        output_dir = Path(output_dir)
+        resolved_dir = output_dir.resolve()
+        tasks = []
+        for index, record in enumerate(records, start=1):
+            missing = self.fields - set(record)
+            if missing:
+                raise ValueError(
+                    f"Record {index} is missing fields: {', '.join(sorted(missing))}"
+                )
+            try:
+                name = name_pattern.format(index=index, **record)
+            except (KeyError, IndexError) as e:
+                raise ValueError(f"Record {index}: bad name pattern field {e}")
+            path = output_dir / name
+            if resolved_dir not in path.resolve().parents:
+                raise ValueError(f"Record {index}: {name!r} is outside {output_dir}")
+            tasks.append((record, path))
+
+        paths = [path for _, path in tasks]
+        if len(set(paths)) != len(paths):
+            raise ValueError("Output name pattern maps several records to the same file")
+
+        output_dir.mkdir(parents=True, exist_ok=True)
+        jobs = jobs or os.cpu_count() or 1
+        if jobs == 1 or len(tasks) <= 1:
+            for record, path in tasks:
+                self.render(record, path)
+            return paths
+
+        with ProcessPoolExecutor(
+            max_workers=jobs, initializer=_init_worker, initargs=(self,)
+        ) as executor:
+            chunksize = max(1, len(tasks) // (jobs * 4))
+            list(executor.map(_render_task, tasks, chunksize=chunksize))
+        return paths
+
+    def _compile_part(self, content):
+        """Split a story part into alternating literal chunks and field names.
+
+        Placeholders are replaced by marked field names in w:t text nodes only, so
+        matches anywhere else in the serialized XML are never substituted.
+        """
+        dom = minidom.parseString(content)
+        _gather_placeholders(dom, self.placeholder)
+        for t_elem in dom.getElementsByTagName("w:t"):
+            pieces = self.placeholder.split(_element_text(t_elem))
+            if len(pieces) > 1:
+                while t_elem.firstChild:
+                    t_elem.removeChild(t_elem.firstChild)
+                t_elem.appendChild(dom.createTextNode(_FIELD_MARK.join(pieces)))
+        xml = dom.toxml(encoding="UTF-8").decode("utf-8")
+        return xml.split(_FIELD_MARK)
+
+
+def _init_worker(template):
+    global _worker_template
+    _worker_template = template
+
+
+def _render_task(task):
+    record, path = task
+    _worker_template.render(record, path)
+
+
+def _format_value(value):
+    """Escape a value for a w:t, mapping line breaks and tabs to run content.
+
+    Control characters that XML cannot hold are dropped.
+    """
+    text = _INVALID_XML_CHARS.sub("", "" if value is None else str(value))
+    text = html.escape(text, quote=False)
+    text = text.replace("\r\n", "\n").replace("\n", _LINE_BREAK_XML)
+    return text.replace("\t", _TAB_XML)
+
+
+def _gather_placeholders(dom, placeholder):
+    """Move every placeholder into a single w:t, even when split across runs.
+
+    The text of a paragraph's w:t elements is concatenated; for each match spanning
+    several elements, the match moves into the first one and is removed from the
+    others. The w:t holding a placeholder gets xml:space="preserve" so values with
+    leading or trailing spaces survive.
+    """
+    paragraphs = {}
+    for t_elem in dom.getElementsByTagName("w:t"):
+        para = t_elem.parentNode
+        while para is not None and getattr(para, "tagName", None) != "w:p":
+            para = para.parentNode
+        paragraphs.setdefault(para, []).append(t_elem)
+
+    for t_elems in paragraphs.values():
+        texts = [_element_text(t_elem) for t_elem in t_elems]
+        starts = []
+        position = 0
+        for text in texts:
+            starts.append(position)
+            position += len(text)
+        full_text = "".join(texts)
+        lengths = [len(text) for text in texts]
+
+        changed = set()
+        for match in reversed(list(placeholder.finditer(full_text))):
+            first = _element_index(starts, lengths, match.start())
+            last = _element_index(starts, lengths, match.end() - 1)
+            changed.add(first)
+            if first == last:
+                continue
+            texts[first] = texts[first][: match.start() - starts[first]] + match.group(0)
+            for index in range(first + 1, last):
+                texts[index] = ""
+            texts[last] = texts[last][match.end() - starts[last] :]
+            changed.update(range(first + 1, last + 1))
+
+        for index in changed:
+            t_elem = t_elems[index]
+            while t_elem.firstChild:
+                t_elem.removeChild(t_elem.firstChild)
+            if texts[index]:
+                t_elem.appendChild(dom.createTextNode(texts[index]))
+            t_elem.setAttribute("xml:space", "preserve")
+
+
+def _element_index(starts, lengths, offset):
+    """Index of the w:t whose text holds the character at offset."""
+    for index in range(len(starts) - 1, -1, -1):
+        if starts[index] <= offset and lengths[index]:
+            return index
+    return 0
+
+
+def _element_text(elem):
+    return "".join(
+        node.data for node in elem.childNodes if node.nodeType == node.TEXT_NODE
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,133 @@
+import tempfile
+import unittest
+import zipfile
+from pathlib import Path
+
+from defusedxml import minidom
+
+from .merge import MergeTemplate
+
+NAMESPACES = (
+    'xmlns:w="http://schemas.openxmlformats.org/wordprocessingml/2006/main" '
+    'xmlns:wp="http://schemas.openxmlformats.org/drawingml/2006/wordprocessingDrawing"'
+)
+
+
+# Currently this is not run automatically in CI; it's just for documentation and manual checking.
+class TestMergeTemplate(unittest.TestCase):
+    def setUp(self):
+        temp_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(temp_dir.cleanup)
+        self.temp_path = Path(temp_dir.name)
+
+    def render(self, body, record):
+        """Render a template whose w:body holds body; return the output document.xml."""
+        template = self.temp_path / "template.docx"
+        with zipfile.ZipFile(template, "w") as zf:
+            zf.writestr(
+                "word/document.xml",
+                f'<?xml version="1.0" encoding="UTF-8"?>'
+                f"<w:document {NAMESPACES}><w:body>{body}</w:body></w:document>",
+            )
+        output = self.temp_path / "output.docx"
+        MergeTemplate(template).render(record, output)
+        with zipfile.ZipFile(output) as zf:
+            return minidom.parseString(zf.read("word/document.xml"))
+
+    def texts(self, dom, tag):
+        return [
+            "".join(node.data for node in elem.childNodes)
+            for elem in dom.getElementsByTagName(tag)
+        ]
+
+    def test_placeholder_split_across_runs(self):
+        dom = self.render(
+            "<w:p><w:r><w:t>Dear {{na</w:t></w:r>"
+            "<w:r><w:rPr><w:b/></w:rPr><w:t>me}},</w:t></w:r></w:p>",
+            {"name": "Ada"},
+        )
+        self.assertEqual("".join(self.texts(dom, "w:t")), "Dear Ada,")
+
+    def test_value_markup_is_escaped(self):
+        dom = self.render(
+            "<w:p><w:r><w:t>{{name}}</w:t></w:r></w:p>", {"name": 'A & "B" <C>'}
+        )
+        self.assertEqual(self.texts(dom, "w:t"), ['A & "B" <C>'])
+
+    def test_line_breaks_and_tabs(self):
+        dom = self.render(
+            "<w:p><w:r><w:t>{{address}}</w:t></w:r></w:p>",
+            {"address": "1 Road\nTown\tX"},
+        )
+        self.assertEqual(self.texts(dom, "w:t"), ["1 Road", "Town", "X"])
+        self.assertEqual(len(dom.getElementsByTagName("w:br")), 1)
+        self.assertEqual(len(dom.getElementsByTagName("w:tab")), 1)
+
+    def test_attribute_placeholder_left_alone(self):
+        dom = self.render(
+            '<w:p><w:r><w:drawing><wp:inline><wp:docPr id="1" name="Picture" '
+            'descr="{{name}}"/></wp:inline></w:drawing></w:r>'
+            "<w:r><w:t>{{name}}</w:t></w:r></w:p>",
+            {"name": 'Line "one"\nline two'},
+        )
+        doc_pr = dom.getElementsByTagName("wp:docPr")[0]
+        self.assertEqual(doc_pr.getAttribute("descr"), "{{name}}")
+
+    def test_field_code_placeholder_left_alone(self):
+        dom = self.render(
+            '<w:p><w:r><w:instrText xml:space="preserve"> MERGEFIELD {{name}} '
+            "</w:instrText></w:r><w:r><w:t>{{name}}</w:t></w:r></w:p>",
+            {"name": "A\nB"},
+        )
+        self.assertEqual(self.texts(dom, "w:instrText"), [" MERGEFIELD {{name}} "])
+
+    def test_deleted_text_placeholder_left_alone(self):
+        dom = self.render(
+            '<w:p><w:del w:id="1" w:author="A"><w:r><w:delText>{{name}}</w:delText>'
+            "</w:r></w:del><w:r><w:t>{{name}}</w:t></w:r></w:p>",
+            {"name": "<Ada>"},
+        )
+        self.assertEqual(self.texts(dom, "w:delText"), ["{{name}}"])
+        self.assertEqual(self.texts(dom, "w:t"), ["<Ada>"])
+
+    def test_invalid_xml_characters_are_dropped(self):
+        dom = self.render(
+            "<w:p><w:r><w:t>{{name}}</w:t></w:r></w:p>", {"name": "A\x01B\x0bC\ufffe"}
+        )
+        self.assertEqual(self.texts(dom, "w:t"), ["ABC"])
+
+
+class TestMerge(unittest.TestCase):
+    def setUp(self):
+        temp_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(temp_dir.cleanup)
+        self.temp_path = Path(temp_dir.name)
+        self.template = self.temp_path / "template.docx"
+        with zipfile.ZipFile(self.template, "w") as zf:
+            zf.writestr(
+                "word/document.xml",
+                f"<w:document {NAMESPACES}><w:body><w:p><w:r><w:t>{{{{id}}}}</w:t>"
+                "</w:r></w:p></w:body></w:document>",
+            )
+
+    def test_names_from_records(self):
+        paths = MergeTemplate(self.template).merge(
+            [{"id": "a"}, {"id": "b"}], self.temp_path / "out", "{id}.docx", jobs=1
+        )
+        self.assertEqual([path.name for path in paths], ["a.docx", "b.docx"])
+        self.assertTrue(all(path.exists() for path in paths))
+
+    def test_name_outside_output_dir_is_rejected(self):
+        output_dir = self.temp_path / "out"
+        absolute = str(self.temp_path / "esc")
+        for name in ("../esc", absolute, ".", "sub/../../esc"):
+            with self.subTest(name=name):
+                with self.assertRaises(ValueError):
+                    MergeTemplate(self.template).merge(
+                        [{"id": name}], output_dir, "{id}", jobs=1
+                    )
+        self.assertEqual(sorted(self.temp_path.iterdir()), [self.template])
+
+
+if __name__ == "__main__":
+    unittest.main()
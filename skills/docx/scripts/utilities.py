@@ -30,12 +30,23 @@ Example usage:
     editor.save()
 """
 
+import hashlib
 import html
+import io
+import os
+import re
+import stat
+import tempfile
+import xml.parsers.expat
 from pathlib import Path
 from typing import Optional, Union
 
 import defusedxml.minidom
 import defusedxml.sax
+from ooxml.scripts.pack import _UMASK
+
+# Whitespace between tags, as pretty-printing lays it out
+_LAYOUT_WHITESPACE = re.compile(rb">\s+<")
 
 
 class XMLEditor:
@@ -66,12 +77,30 @@ class XMLEditor:
         if not self.xml_path.exists():
             raise ValueError(f"XML file not found: {xml_path}")
 
-        with open(self.xml_path, "rb") as f:
-            header = f.read(200).decode("utf-8", errors="ignore")
+        source = self.xml_path.read_bytes()
+        header = source[:200].decode("utf-8", errors="ignore")
         self.encoding = "ascii" if 'encoding="ascii"' in header else "utf-8"
 
+        # Inverse operations of the edits made so far, undone by rollback(), and the
+        # number of older entries dropped by commit()
+        self._journal = []
+        self._journal_base = 0
+
+        # Number of journal entries reflected in the file, and (node, attributes_only)
+        # pairs touched by rolling back past that point
+        self._journal_synced = 0
+        self._unsynced_nodes = []
+        # Whether parse offsets still describe the file (see save(line_stable=True))
+        self._layout_valid = True
+
         parser = _create_line_tracking_parser()
-        self.dom = defusedxml.minidom.parse(str(self.xml_path), parser)
+        self.dom = defusedxml.minidom.parse(io.BytesIO(source), parser)
+
+        # Digest of the content as last loaded or saved, so saving a DOM that was
+        # never changed (or was changed back) writes nothing. It is taken from the
+        # file bytes: minidom keeps layout whitespace, so serializing an unchanged
+        # DOM reproduces them up to the XML declaration.
+        self._saved_digest = _content_digest(source)
 
     def get_node(
         self,
@@ -220,8 +249,8 @@ class XMLEditor:
         parent = elem.parentNode
         nodes = self._parse_fragment(new_content)
         for node in nodes:
-            parent.insertBefore(node, elem)
-        parent.removeChild(elem)
+            self._insert_node(parent, node, elem)
+        self._remove_node(elem)
         return nodes
 
     def insert_after(self, elem, xml_content):
@@ -242,10 +271,7 @@ class XMLEditor:
         next_sibling = elem.nextSibling
         nodes = self._parse_fragment(xml_content)
         for node in nodes:
-            if next_sibling:
-                parent.insertBefore(node, next_sibling)
-            else:
-                parent.appendChild(node)
+            self._insert_node(parent, node, next_sibling)
         return nodes
 
     def insert_before(self, elem, xml_content):
@@ -265,7 +291,7 @@ class XMLEditor:
         parent = elem.parentNode
         nodes = self._parse_fragment(xml_content)
         for node in nodes:
-            parent.insertBefore(node, elem)
+            self._insert_node(parent, node, elem)
         return nodes
 
     def append_to(self, elem, xml_content):
@@ -284,9 +310,113 @@ class XMLEditor:
         """
         nodes = self._parse_fragment(xml_content)
         for node in nodes:
-            elem.appendChild(node)
+            self._insert_node(elem, node)
         return nodes
 
+    def checkpoint(self):
+        """
+        Mark the current state of the DOM so later edits can be rolled back.
+
+        Returns:
+            int: Token to pass to rollback()
+
+        Example:
+            mark = editor.checkpoint()
+            editor.replace_node(elem, "<w:r><w:t>text</w:t></w:r>")
+            editor.rollback(mark)  # elem is back in place
+        """
+        return self._journal_base + len(self._journal)
+
+    def rollback(self, checkpoint=0):
+        """
+        Undo every edit made since a checkpoint.
+
+        Each edit records its inverse operations, so rolling back costs time
+        proportional to the edits undone rather than to the size of the document.
+        Removed and moved nodes are put back as the same objects, so references and
+        line numbers obtained before the checkpoint remain valid. Rolling back
+        invalidates checkpoints taken after the one rolled back to.
+
+        Args:
+            checkpoint: Token from checkpoint() (default: 0, undo every edit)
+
+        Raises:
+            ValueError: If the checkpoint is not a valid token or predates commit()
+
+        Example:
+            mark = editor.checkpoint()
+            try:
+                apply_edits(editor)
+                doc.validate()
+            except ValueError:
+                editor.rollback(mark)
+        """
+        if not self._journal_base <= checkpoint <= self.checkpoint():
+            raise ValueError(f"Unknown checkpoint: {checkpoint}")
+        keep = checkpoint - self._journal_base
+        while len(self._journal) > keep:
+            entry = self._journal.pop()
+            touched = None
+            kind = entry[0]
+            if kind == "insert":
+                node = entry[1]
+                touched = (node.parentNode, False)
+                if node.parentNode is not None:
+                    node.parentNode.removeChild(node)
+            elif kind == "remove":
+                _, node, parent, next_sibling = entry
+                parent.insertBefore(node, next_sibling)
+                touched = (node, False)
+            elif kind == "attribute":
+                _, elem, name, value = entry
+                if value is None:
+                    if elem.hasAttribute(name):
+                        elem.removeAttribute(name)
+                else:
+                    elem.setAttribute(name, value)
+                touched = (elem, True)
+            elif kind == "rename":
+                _, new_elem, old_elem = entry
+                while new_elem.firstChild:
+                    old_elem.appendChild(new_elem.firstChild)
+                new_elem.parentNode.replaceChild(old_elem, new_elem)
+                touched = (old_elem, False)
+            if len(self._journal) < self._journal_synced and touched[0] is not None:
+                # The file holds the undone edit: the node must be rewritten
+                self._unsynced_nodes.append(touched)
+        self._journal_synced = min(self._journal_synced, keep)
+
+    def commit(self, checkpoint=None):
+        """
+        Make the edits made before a checkpoint permanent, dropping their undo records.
+
+        The journal otherwise grows for the whole session and keeps every removed
+        node alive. Checkpoints before the one committed can no longer be rolled
+        back to; later ones stay valid.
+
+        Args:
+            checkpoint: Token from checkpoint() (default: the current state)
+
+        Raises:
+            ValueError: If the checkpoint is not a valid token
+
+        Example:
+            apply_edits(editor)
+            doc.validate()
+            editor.commit()  # keep the edits, free the memory holding their undo
+        """
+        if checkpoint is None:
+            checkpoint = self.checkpoint()
+        if not self._journal_base <= checkpoint <= self.checkpoint():
+            raise ValueError(f"Unknown checkpoint: {checkpoint}")
+        count = checkpoint - self._journal_base
+        # Edits not in the file yet must still be found by save(line_stable=True)
+        for entry in self._journal[self._journal_synced : count]:
+            self._unsynced_nodes.append(_journal_touched(entry))
+        del self._journal[:count]
+        self._journal_synced = max(0, self._journal_synced - count)
+        self._journal_base = checkpoint
+
     def get_next_rid(self):
         """Get the next available rId for relationships files."""
         max_id = 0
@@ -299,15 +429,336 @@ class XMLEditor:
                     pass
         return f"rId{max_id + 1}"
 
-    def save(self):
+    def save(self, line_stable=False):
         """
         Save the edited XML back to the file.
 
         Serializes the DOM tree and writes it back to the original file path,
-        preserving the original encoding (ascii or utf-8).
+        preserving the original encoding (ascii or utf-8). The file is replaced
+        atomically, so a hard-linked copy of the part is never written through.
+        Nothing is written if the content is unchanged since it was loaded or last
+        saved.
+
+        With line_stable=True only the changed top-level blocks (children of w:body,
+        or of the root element in other parts) are rewritten, pretty-printed at their
+        original indentation; every other byte of the file is kept. Blocks changed by
+        editor methods are known from the journal, and the others are compared with
+        the file so changes made directly on DOM nodes are written too. Element line
+        numbers are updated in place, so get_node(line_number=...) keeps working
+        against the saved file without re-parsing.
+
+        Args:
+            line_stable: If True, rewrite only the changed blocks (default: False)
+
+        Returns:
+            list: With line_stable=True, (range, delta) pairs mapping old line numbers
+            of unchanged content to new ones (new = old + delta); lines of rewritten
+            blocks are not covered. None for a full save, including the fallback when
+            the file layout is unknown (after a full save) or the edits, journaled or
+            direct, reach outside the top-level blocks.
+
+        Example:
+            line_map = editor.save(line_stable=True)
+            # [(range(1, 120), 0), (range(131, 2400), 3)]: line 200 is now line 203
         """
+        if line_stable and self._layout_valid:
+            line_map = self._save_line_stable()
+            if line_map is not None:
+                return line_map
+
         content = self.dom.toxml(encoding=self.encoding)
-        self.xml_path.write_bytes(content)
+        digest = _content_digest(content)
+        if digest == self._saved_digest:
+            return None
+        _write_bytes_atomic(self.xml_path, content)
+        self._saved_digest = digest
+        self._layout_valid = False
+        return None
+
+    def _save_line_stable(self):
+        """Splice re-rendered changed blocks into the file; see save(line_stable=True).
+
+        Returns:
+            list: The line map, or None if the edits cannot be saved this way
+        """
+        container = self._block_container()
+        ancestors = []
+        node = container
+        while node.nodeType == node.ELEMENT_NODE:
+            ancestors.insert(0, node)
+            node = node.parentNode
+        if not all(hasattr(elem, "parse_end") for elem in ancestors):
+            return None
+
+        dirty = self._dirty_elements(container)
+        if dirty is None:
+            return None
+        changed, retagged = dirty
+
+        source = self.xml_path.read_bytes()
+        direct = self._direct_changes(source, ancestors, changed)
+        if direct is None:
+            return None
+        changed |= direct[0]
+        retagged |= direct[1]
+
+        # (bytes, offset in source if copied verbatim, element the bytes hold)
+        pieces = []
+        cursor = 0
+        for elem in ancestors:
+            tag_end = _start_tag_end(source, elem.parse_offset)
+            if source[tag_end - 2 : tag_end] == b"/>":
+                # Written as an empty element: there is no content to splice into
+                return None
+            pieces.append((source[cursor : elem.parse_offset], cursor, None))
+            original = source[elem.parse_offset : tag_end]
+            start_tag = original
+            if elem in retagged:
+                start_tag = _start_tag_xml(elem, original).encode(
+                    self.encoding, "xmlcharrefreplace"
+                )
+            if start_tag == original:
+                pieces.append((original, elem.parse_offset, elem))
+            else:
+                pieces.append((start_tag, None, elem))
+            cursor = tag_end
+
+        # Blocks are indented like the first one kept as is
+        for child in container.childNodes:
+            if hasattr(child, "parse_end") and child not in changed:
+                indent = _line_indent(source, child.parse_offset)
+                break
+        else:
+            indent = _line_indent(source, container.parse_offset) + "  "
+        separator = ("\n" + indent).encode(self.encoding)
+
+        # The whitespace between two blocks adjacent in the file is kept
+        previous_end = cursor
+        for child in container.childNodes:
+            if child.nodeType == child.TEXT_NODE and not child.data.strip():
+                continue
+            if hasattr(child, "parse_end") and child not in changed:
+                start, end = child.parse_offset, _element_end(source, child)
+                if previous_end is not None and not source[previous_end:start].strip():
+                    pieces.append((source[previous_end:start], previous_end, None))
+                else:
+                    pieces.append((separator, None, None))
+                pieces.append((source[start:end], start, child))
+                previous_end = end
+            else:
+                pieces.append((separator, None, None))
+                pieces.append((self._render_block(child, indent), None, child))
+                previous_end = None
+
+        content_end = container.parse_end
+        if previous_end is not None and not source[previous_end:content_end].strip():
+            pieces.append((source[previous_end:content_end], previous_end, None))
+        else:
+            closing_indent = _line_indent(source, container.parse_offset)
+            pieces.append((("\n" + closing_indent).encode(self.encoding), None, None))
+        pieces.append((source[content_end:], content_end, None))
+
+        line_map = self._relocate(source, pieces, ancestors)
+        content = b"".join(piece for piece, _, _ in pieces)
+        if content != source:
+            _write_bytes_atomic(self.xml_path, content)
+            self._saved_digest = None
+
+        self._journal_synced = len(self._journal)
+        self._unsynced_nodes = []
+        return line_map
+
+    def _direct_changes(self, source, ancestors, changed):
+        """Find what direct DOM edits, which the journal does not see, have changed.
+
+        Blocks are compared with the file ignoring whitespace between tags, since
+        blocks rewritten by an earlier line-stable save are pretty-printed in the
+        file but not in the DOM.
+
+        Args:
+            source: Current file content
+            ancestors: Elements from the root down to the block container
+            changed: Blocks already known to be changed, which are not compared
+
+        Returns:
+            tuple: (blocks, start_tags) sets of container children to re-render and
+            of ancestors whose attributes differ from the file; None if content
+            outside the blocks differs
+        """
+        container = ancestors[-1]
+        blocks = set()
+        start_tags = set()
+        for elem in ancestors:
+            tag_end = _start_tag_end(source, elem.parse_offset)
+            if source[tag_end - 2 : tag_end] == b"/>":
+                return None
+            written = _start_tag_attributes(elem, source[elem.parse_offset : tag_end])
+            if written != dict(elem.attributes.items()):
+                start_tags.add(elem)
+            for child in elem.childNodes:
+                if (
+                    child.nodeType != child.ELEMENT_NODE
+                    or child in ancestors
+                    or child in changed
+                ):
+                    continue
+                if hasattr(child, "parse_end"):
+                    original = source[child.parse_offset : _element_end(source, child)]
+                    current = child.toxml().encode(self.encoding, "xmlcharrefreplace")
+                    if _LAYOUT_WHITESPACE.sub(b"><", original) == _LAYOUT_WHITESPACE.sub(
+                        b"><", current
+                    ):
+                        continue
+                if elem is not container:
+                    return None
+                blocks.add(child)
+        return blocks, start_tags
+
+    def _block_container(self):
+        """The element whose children are saved as blocks: w:body, else the root."""
+        root = self.dom.documentElement
+        for child in root.childNodes:
+            if child.nodeType == child.ELEMENT_NODE and child.tagName == "w:body":
+                return child
+        return root
+
+    def _dirty_elements(self, container):
+        """Find what the edits not yet saved have touched.
+
+        Returns:
+            tuple: (changed, retagged) sets of container children to re-render and of
+            the container or its ancestors whose start tag changed; None if an edit
+            reached outside the blocks
+        """
+        touched = list(self._unsynced_nodes)
+        touched.extend(map(_journal_touched, self._journal[self._journal_synced :]))
+
+        changed = set()
+        retagged = set()
+        for node, attributes_only in touched:
+            if _contains(node, container):
+                if attributes_only:
+                    retagged.add(node)
+                elif node is not container:
+                    return None
+                continue
+            child = node
+            while child.parentNode is not None and child.parentNode is not container:
+                child = child.parentNode
+            if child.parentNode is container:
+                changed.add(child)
+            elif child.nodeType == child.DOCUMENT_NODE:
+                return None
+            # Otherwise the node has been detached since, which a later edit records
+        return changed, retagged
+
+    def _render_block(self, block, indent):
+        """Pretty-print a block at the given indentation, the way unpack.py lays out parts."""
+        clone = block.cloneNode(True)
+        _strip_layout_whitespace(clone)
+        text = clone.toprettyxml(indent="  ").rstrip("\n")
+        return text.replace("\n", "\n" + indent).encode(
+            self.encoding, "xmlcharrefreplace"
+        )
+
+    def _relocate(self, source, pieces, ancestors):
+        """Move element positions to the new file layout and build the line map.
+
+        Args:
+            source: Previous file content
+            pieces: (bytes, source offset or None, element or None) of the new content
+            ancestors: Elements from the root down to the block container
+
+        Returns:
+            list: Merged (range, delta) pairs for the lines copied verbatim
+        """
+        line_map = []
+        old_line, old_offset = 1, 0
+        new_line, new_offset, new_column = 1, 0, 0
+        line_delta = byte_delta = 0
+        for index, (piece, offset, elem) in enumerate(pieces):
+            if offset is not None:
+                old_line += source.count(b"\n", old_offset, offset)
+                old_offset = offset
+                line_delta, byte_delta = new_line - old_line, new_offset - offset
+                # Lines shared with rewritten content are left out, unless the
+                # verbatim part of the line is more than indentation
+                first_line, last_line = old_line, old_line + piece.count(b"\n")
+                if index and pieces[index - 1][1] is None:
+                    if not piece.split(b"\n", 1)[0].strip():
+                        first_line += 1
+                if index + 1 < len(pieces) and pieces[index + 1][1] is None:
+                    if not piece.rsplit(b"\n", 1)[-1].strip():
+                        last_line -= 1
+                line_map.append((range(first_line, last_line + 1), line_delta))
+            if elem in ancestors:
+                elem.parse_position = (new_line, elem.parse_position[1])
+                elem.parse_offset = new_offset
+            elif elem is not None and offset is None:
+                _assign_positions(elem, piece, new_line, new_column, new_offset)
+            elif elem is not None and (line_delta or byte_delta):
+                _shift_positions(elem, line_delta, byte_delta)
+
+            newlines = piece.count(b"\n")
+            new_line += newlines
+            if newlines:
+                new_column = len(piece) - piece.rfind(b"\n") - 1
+            else:
+                new_column += len(piece)
+            new_offset += len(piece)
+
+        # The last piece holds the end tags of the ancestors and anything after the
+        # container, all shifted alike
+        for elem in ancestors:
+            elem.parse_end += byte_delta
+            sibling = elem.nextSibling
+            while sibling is not None and elem is not ancestors[0]:
+                if sibling.nodeType == sibling.ELEMENT_NODE:
+                    _shift_positions(sibling, line_delta, byte_delta)
+                sibling = sibling.nextSibling
+        return _merge_line_map(line_map)
+
+    def _insert_node(self, parent, node, ref=None):
+        """Insert (or move) a node before ref, or append it, recording the inverse."""
+        if node.parentNode is not None:
+            self._remove_node(node)
+        parent.insertBefore(node, ref)
+        self._journal.append(("insert", node))
+
+    def _remove_node(self, node):
+        """Detach a node from its parent, recording where to put it back."""
+        parent = node.parentNode
+        self._journal.append(("remove", node, parent, node.nextSibling))
+        parent.removeChild(node)
+
+    def _set_attribute(self, elem, name, value):
+        """Set an attribute, recording its previous value."""
+        old = elem.getAttribute(name) if elem.hasAttribute(name) else None
+        self._journal.append(("attribute", elem, name, old))
+        elem.setAttribute(name, value)
+
+    def _remove_attribute(self, elem, name):
+        """Remove an attribute if present, recording its previous value."""
+        if elem.hasAttribute(name):
+            self._journal.append(("attribute", elem, name, elem.getAttribute(name)))
+            elem.removeAttribute(name)
+
+    def _rename_element(self, elem, tag):
+        """Replace an element by one with another tag, the same attributes and children.
+
+        Returns:
+            The new element (the old one is kept intact for rollback)
+        """
+        new_elem = self.dom.createElement(tag)
+        for i in range(elem.attributes.length):
+            attr = elem.attributes.item(i)
+            new_elem.setAttribute(attr.name, attr.value)
+        # Copy ALL child nodes (not just firstChild) to handle entities
+        while elem.firstChild:
+            new_elem.appendChild(elem.firstChild)
+        elem.parentNode.replaceChild(new_elem, elem)
+        self._journal.append(("rename", new_elem, elem))
+        return new_elem
 
     def _parse_fragment(self, xml_content):
         """
@@ -322,6 +773,25 @@ class XMLEditor:
         Raises:
             AssertionError: If fragment contains no element nodes
         """
+        return self._parse_fragments([xml_content])[0]
+
+    def _parse_fragments(self, xml_contents):
+        """
+        Parse several XML fragments with a single parser pass.
+
+        Each fragment is wrapped in its own container element so the nodes can be
+        separated again after parsing. Use this instead of repeated _parse_fragment
+        calls when inserting many fragments at different positions.
+
+        Args:
+            xml_contents: List of strings, each containing an XML fragment
+
+        Returns:
+            List of lists of defusedxml.minidom.Node objects, one list per fragment
+
+        Raises:
+            AssertionError: If any fragment contains no element nodes
+        """
         # Extract namespace declarations from the root document element
         root_elem = self.dom.documentElement
         namespaces = []
@@ -332,15 +802,212 @@ class XMLEditor:
                     namespaces.append(f'{attr.name}="{attr.value}"')  # type: ignore
 
         ns_decl = " ".join(namespaces)
-        wrapper = f"<root {ns_decl}>{xml_content}</root>"
+        chunks = "".join(f"<chunk>{content}</chunk>" for content in xml_contents)
+        wrapper = f"<root {ns_decl}>{chunks}</root>"
         fragment_doc = defusedxml.minidom.parseString(wrapper)
-        nodes = [
-            self.dom.importNode(child, deep=True)
-            for child in fragment_doc.documentElement.childNodes  # type: ignore
-        ]
-        elements = [n for n in nodes if n.nodeType == n.ELEMENT_NODE]
-        assert elements, "Fragment must contain at least one element"
-        return nodes
+
+        results = []
+        for chunk in fragment_doc.documentElement.childNodes:  # type: ignore
+            nodes = [
+                self.dom.importNode(child, deep=True) for child in chunk.childNodes
+            ]
+            elements = [n for n in nodes if n.nodeType == n.ELEMENT_NODE]
+            assert elements, "Fragment must contain at least one element"
+            results.append(nodes)
+        return results
+
+
+def _write_bytes_atomic(path, content):
+    """
+    Write bytes to a file by writing a temporary sibling and renaming it over the target.
+
+    Replacing the directory entry (rather than writing into the existing file) gives
+    the part a new inode, which breaks any hard link to the original document.
+
+    Args:
+        path: Destination file path
+        content: Bytes to write
+    """
+    path = Path(path)
+    try:
+        mode = stat.S_IMODE(os.stat(path).st_mode)
+    except FileNotFoundError:
+        mode = 0o666 & ~_UMASK
+    fd, temp_path = tempfile.mkstemp(prefix=f".{path.name}.", dir=path.parent)
+    try:
+        with os.fdopen(fd, "wb") as f:
+            f.write(content)
+        # mkstemp creates files as 0600; keep the permissions of the part being replaced
+        os.chmod(temp_path, mode)
+        os.replace(temp_path, path)
+    except BaseException:
+        Path(temp_path).unlink(missing_ok=True)
+        raise
+
+
+def _contains(node, other):
+    """Whether other is node or one of its descendants."""
+    while other is not None:
+        if other is node:
+            return True
+        other = other.parentNode
+    return False
+
+
+def _start_tag_end(source, offset):
+    """Offset just past the start tag beginning at offset ('>' may occur in values)."""
+    quote = None
+    for index in range(offset, len(source)):
+        char = source[index]
+        if quote:
+            if char == quote:
+                quote = None
+        elif char in b"\"'":
+            quote = char
+        elif char == ord(">"):
+            return index + 1
+    raise ValueError(f"Unterminated start tag at byte {offset}")
+
+
+def _start_tag_attributes(elem, original):
+    """The attributes of an element's start tag as written in the file."""
+    parser = xml.parsers.expat.ParserCreate()
+    parser.ordered_attributes = True
+    attributes = {}
+    parser.StartElementHandler = lambda name, attrs: attributes.update(
+        zip(attrs[::2], attrs[1::2])
+    )
+    parser.Parse(original + f"</{elem.tagName}>".encode(), True)
+    return attributes
+
+
+def _start_tag_xml(elem, original):
+    """Serialize the start tag of an element, keeping the attribute order of original.
+
+    Args:
+        elem: Element whose current attributes are written
+        original: Bytes of the element's start tag in the file
+
+    Returns:
+        str: The start tag; attributes not in original come last
+    """
+    parser = xml.parsers.expat.ParserCreate()
+    parser.ordered_attributes = True
+    order = []
+    parser.StartElementHandler = lambda name, attrs: order.extend(attrs[::2])
+    parser.Parse(original + f"</{elem.tagName}>".encode(), True)
+
+    clone = elem.cloneNode(False)
+    names = [name for name in order if clone.hasAttribute(name)]
+    names += [name for name in clone.attributes.keys() if name not in names]
+    values = [(name, clone.getAttribute(name)) for name in names]
+    for name, _ in values:
+        clone.removeAttribute(name)
+    for name, value in values:
+        clone.setAttribute(name, value)
+    return clone.toxml()[:-2] + ">"
+
+
+def _forbid_entity_declarations(*args):
+    raise ValueError("Entity declarations are not allowed in OOXML parts")
+
+
+def _journal_touched(entry):
+    """The (node, attributes_only) pair whose content a journaled edit changed."""
+    if entry[0] == "remove":
+        return entry[2], False
+    return entry[1], entry[0] == "attribute"
+
+
+def _content_digest(content):
+    """Digest of serialized XML, ignoring the XML declaration and surrounding whitespace."""
+    if content.startswith(b"<?xml"):
+        content = content[content.find(b"?>") + 2 :]
+    return hashlib.sha1(content.strip()).digest()
+
+
+def _element_end(source, elem):
+    """Offset just past an element's end tag, from the offset its end event reported.
+
+    Expat reports the end of an element written as <a/> just past the tag, and the
+    end of <a>...</a> at the start of its end tag.
+    """
+    end = elem.parse_end
+    end_tag = f"</{elem.tagName}>".encode()
+    if source[end - 2 : end] != b"/>" and source.startswith(end_tag, end):
+        return end + len(end_tag)
+    return end
+
+
+def _line_indent(source, offset):
+    """The whitespace between the start of the line and offset."""
+    line_start = source.rfind(b"\n", 0, offset) + 1
+    prefix = source[line_start:offset].decode("ascii", errors="replace")
+    return prefix if not prefix.strip() else ""
+
+
+def _strip_layout_whitespace(elem):
+    """Remove whitespace-only text between child elements, left by pretty-printing."""
+    children = elem.childNodes
+    if any(child.nodeType == child.ELEMENT_NODE for child in children):
+        for child in list(children):
+            if child.nodeType == child.TEXT_NODE and not child.data.strip():
+                elem.removeChild(child)
+            elif child.nodeType == child.ELEMENT_NODE:
+                _strip_layout_whitespace(child)
+
+
+def _shift_positions(elem, line_delta, byte_delta):
+    """Move the parse positions of an element and its descendants."""
+    for node in [elem] + elem.getElementsByTagName("*"):
+        line, column = node.parse_position
+        node.parse_position = (line + line_delta, column)
+        node.parse_offset += byte_delta
+        node.parse_end += byte_delta
+
+
+def _assign_positions(elem, content, line, column, offset):
+    """Set the parse positions of a freshly serialized element and its descendants.
+
+    Args:
+        elem: Element serialized as content
+        content: Bytes of the serialized element (our own output, parsed with expat)
+        line, column, offset: Position of content in the file
+    """
+    elements = iter([elem] + elem.getElementsByTagName("*"))
+    stack = []
+    parser = xml.parsers.expat.ParserCreate()
+
+    def start(name, attrs):
+        node = next(elements)
+        node_line = parser.CurrentLineNumber
+        node_column = parser.CurrentColumnNumber
+        if node_line == 1:
+            node_column += column
+        node.parse_position = (line + node_line - 1, node_column)
+        node.parse_offset = offset + parser.CurrentByteIndex
+        stack.append(node)
+
+    def end(name):
+        stack.pop().parse_end = offset + parser.CurrentByteIndex
+
+    parser.StartElementHandler = start
+    parser.EndElementHandler = end
+    parser.Parse(content, True)
+
+
+def _merge_line_map(line_map):
+    """Join adjacent or overlapping (range, delta) pairs with the same delta."""
+    merged = []
+    for lines, delta in line_map:
+        if not lines:
+            continue
+        if merged and merged[-1][1] == delta and lines.start <= merged[-1][0].stop:
+            previous = merged[-1][0]
+            merged[-1] = (range(previous.start, max(previous.stop, lines.stop)), delta)
+        else:
+            merged.append((lines, delta))
+    return merged
 
 
 def _create_line_tracking_parser():
@@ -349,7 +1016,8 @@ def _create_line_tracking_parser():
 
     Monkey patches the SAX content handler to store the current line and column
     position from the underlying expat parser onto each element as a parse_position
-    attribute (line, column) tuple.
+    attribute (line, column) tuple. The byte offsets of the start and end events are
+    kept as parse_offset and parse_end, for saving with line_stable=True.
 
     Returns:
         defusedxml.sax.xmlreader.XMLReader: Configured SAX parser
@@ -363,9 +1031,17 @@ def _create_line_tracking_parser():
                 parser._parser.CurrentLineNumber,  # type: ignore
                 parser._parser.CurrentColumnNumber,  # type: ignore
             )
+            cur_elem.parse_offset = parser._parser.CurrentByteIndex  # type: ignore
+
+        def endElementNS(name, tagName):
+            cur_elem = dom_handler.elementStack[-1]
+            cur_elem.parse_end = parser._parser.CurrentByteIndex  # type: ignore
+            orig_end_cb(name, tagName)
 
         orig_start_cb = dom_handler.startElementNS
         dom_handler.startElementNS = startElementNS
+        orig_end_cb = dom_handler.endElementNS
+        dom_handler.endElementNS = endElementNS
         orig_set_content_handler(dom_handler)
 
     parser = defusedxml.sax.make_parser()
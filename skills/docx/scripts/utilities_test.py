@@ -0,0 +1,268 @@
+import tempfile
+import unittest
+from pathlib import Path
+from unittest import mock
+from xml.dom import minidom
+
+from ooxml.scripts.unpack import _pretty_print
+
+from .utilities import XMLEditor
+
+PART = (
+    b'<?xml version="1.0" encoding="utf-8"?>\n'
+    b'<w:document xmlns:w="http://schemas.openxmlformats.org/wordprocessingml/2006/main">\n'
+    b"  <w:body>\n"
+    b"    <w:p>\n"
+    b"      <w:r>\n"
+    b"        <w:t>First</w:t>\n"
+    b"      </w:r>\n"
+    b"    </w:p>\n"
+    b"    <w:p>\n"
+    b"      <w:r>\n"
+    b"        <w:t>Second</w:t>\n"
+    b"      </w:r>\n"
+    b"    </w:p>\n"
+    b"  </w:body>\n"
+    b"</w:document>\n"
+)
+
+
+# Currently this is not run automatically in CI; it's just for documentation and manual checking.
+class TestSave(unittest.TestCase):
+    def setUp(self):
+        temp_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(temp_dir.cleanup)
+        self.path = Path(temp_dir.name) / "document.xml"
+        self.path.write_bytes(PART)
+
+    def test_unchanged_editor_writes_nothing(self):
+        editor = XMLEditor(self.path)
+        inode = self.path.stat().st_ino
+        editor.save()
+        self.assertEqual(self.path.stat().st_ino, inode)
+        self.assertEqual(self.path.read_bytes(), PART)
+
+    def test_loading_does_not_serialize(self):
+        with mock.patch.object(minidom.Document, "toxml") as toxml:
+            XMLEditor(self.path)
+        toxml.assert_not_called()
+
+    def test_unchanged_unpacked_part_writes_nothing(self):
+        self.path.write_bytes(unpacked_part(paragraphs("First")))
+        editor = XMLEditor(self.path)
+        inode = self.path.stat().st_ino
+        editor.save()
+        self.assertEqual(self.path.stat().st_ino, inode)
+
+    def test_edit_undone_before_save_writes_nothing(self):
+        editor = XMLEditor(self.path)
+        inode = self.path.stat().st_ino
+        editor.append_to(editor.get_node(tag="w:body"), "<w:p/>")
+        editor.rollback()
+        editor.save()
+        self.assertEqual(self.path.stat().st_ino, inode)
+
+    def test_changed_editor_writes(self):
+        editor = XMLEditor(self.path)
+        editor.append_to(editor.get_node(tag="w:body"), "<w:p/>")
+        editor.save()
+        self.assertEqual(self.path.read_bytes(), editor.dom.toxml(encoding="utf-8"))
+
+
+def paragraphs(*texts):
+    return "".join(f"<w:p><w:r><w:t>{text}</w:t></w:r></w:p>" for text in texts)
+
+
+def unpacked_part(body):
+    """A document.xml with the given w:body content, laid out as unpack.py writes it."""
+    return _pretty_print(
+        f'<w:document xmlns:w="http://schemas.openxmlformats.org/wordprocessingml/2006/main">'
+        f"<w:body>{body}<w:sectPr/></w:body></w:document>".encode()
+    )
+
+
+class TestLineStableSave(unittest.TestCase):
+    def setUp(self):
+        temp_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(temp_dir.cleanup)
+        self.path = Path(temp_dir.name) / "document.xml"
+        self.source = unpacked_part(paragraphs("First", "Second", "Third"))
+        self.path.write_bytes(self.source)
+
+    def assertPositionsMatchFreshParse(self, editor):
+        def positions(xml_editor):
+            return [
+                (elem.tagName, elem.parse_position, elem.parse_offset)
+                for elem in xml_editor.dom.getElementsByTagName("*")
+            ]
+
+        self.assertEqual(positions(editor), positions(XMLEditor(self.path)))
+
+    def assertLineMapHolds(self, old, line_map):
+        old_lines = old.split(b"\n")
+        new_lines = self.path.read_bytes().split(b"\n")
+        for lines, delta in line_map:
+            for line in lines:
+                self.assertEqual(old_lines[line - 1], new_lines[line + delta - 1])
+
+    def test_insert_keeps_other_lines(self):
+        editor = XMLEditor(self.path)
+        second = editor.get_node(tag="w:p", contains="Second")
+        editor.insert_before(second, paragraphs("New"))
+        line_map = editor.save(line_stable=True)
+
+        self.assertEqual(line_map, [(range(1, 9), 0), (range(9, 23), 5)])
+        self.assertLineMapHolds(self.source, line_map)
+        self.assertPositionsMatchFreshParse(editor)
+
+    def test_output_matches_full_pretty_print(self):
+        editor = XMLEditor(self.path)
+        editor.replace_node(
+            editor.get_node(tag="w:p", contains="Second"), paragraphs("Changed")
+        )
+        editor.append_to(
+            editor.get_node(tag="w:p", contains="Third"), "<w:r><w:t>!</w:t></w:r>"
+        )
+        editor.save(line_stable=True)
+
+        expected = unpacked_part(
+            paragraphs("First", "Changed")
+            + "<w:p><w:r><w:t>Third</w:t></w:r><w:r><w:t>!</w:t></w:r></w:p>"
+        )
+        self.assertEqual(self.path.read_bytes(), expected)
+
+    def test_save_edit_rollback_save(self):
+        editor = XMLEditor(self.path)
+        checkpoint = editor.checkpoint()
+        editor.replace_node(
+            editor.get_node(tag="w:p", contains="First"), paragraphs("One", "Two")
+        )
+        line_map = editor.save(line_stable=True)
+        self.assertLineMapHolds(self.source, line_map)
+        self.assertPositionsMatchFreshParse(editor)
+        edited = self.path.read_bytes()
+
+        editor.rollback(checkpoint)
+        line_map = editor.save(line_stable=True)
+
+        self.assertEqual(self.path.read_bytes(), self.source)
+        self.assertLineMapHolds(edited, line_map)
+        self.assertPositionsMatchFreshParse(editor)
+
+    def test_direct_dom_edit_is_saved_with_journaled_edits(self):
+        editor = XMLEditor(self.path)
+        text = editor.get_node(tag="w:t", contains="Third")
+        text.firstChild.data = "Edited"
+        editor.insert_after(
+            editor.get_node(tag="w:p", contains="First"), paragraphs("New")
+        )
+        line_map = editor.save(line_stable=True)
+
+        self.assertEqual(
+            self.path.read_bytes(),
+            unpacked_part(paragraphs("First", "New", "Second", "Edited")),
+        )
+        self.assertLineMapHolds(self.source, line_map)
+        self.assertPositionsMatchFreshParse(editor)
+
+    def test_direct_dom_edit_alone_is_saved(self):
+        editor = XMLEditor(self.path)
+        editor.get_node(tag="w:t", contains="Second").firstChild.data = "Edited"
+        line_map = editor.save(line_stable=True)
+
+        self.assertEqual(
+            self.path.read_bytes(),
+            unpacked_part(paragraphs("First", "Edited", "Third")),
+        )
+        self.assertLineMapHolds(self.source, line_map)
+
+    def test_direct_edit_outside_blocks_falls_back_to_full_save(self):
+        editor = XMLEditor(self.path)
+        editor.get_node(tag="w:body").setAttribute("w:rsid", "00AB12CD")
+        editor.dom.documentElement.insertBefore(
+            editor.dom.createElement("w:background"), editor.get_node(tag="w:body")
+        )
+        self.assertIsNone(editor.save(line_stable=True))
+        self.assertEqual(self.path.read_bytes(), editor.dom.toxml(encoding="ascii"))
+
+    def test_unchanged_editor_keeps_file(self):
+        editor = XMLEditor(self.path)
+        inode = self.path.stat().st_ino
+        line_map = editor.save(line_stable=True)
+        self.assertEqual(self.path.stat().st_ino, inode)
+        self.assertLineMapHolds(self.source, line_map)
+        self.assertEqual(line_map, [(range(1, self.source.count(b"\n") + 2), 0)])
+
+    def test_falls_back_to_full_save_when_layout_unknown(self):
+        editor = XMLEditor(self.path)
+        editor.append_to(editor.get_node(tag="w:body"), "<w:p/>")
+        editor.save()
+        self.assertFalse(editor._layout_valid)
+
+        editor.append_to(editor.get_node(tag="w:body"), "<w:p/>")
+        self.assertIsNone(editor.save(line_stable=True))
+        self.assertEqual(self.path.read_bytes(), editor.dom.toxml(encoding="ascii"))
+
+
+class TestRollback(unittest.TestCase):
+    def setUp(self):
+        temp_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(temp_dir.cleanup)
+        self.path = Path(temp_dir.name) / "document.xml"
+        self.path.write_bytes(unpacked_part(paragraphs("First", "Second")))
+        self.editor = XMLEditor(self.path)
+        self.original = self.editor.dom.toxml()
+
+    def test_rollback_undoes_each_edit(self):
+        edits = {
+            "insert_before": lambda elem: self.editor.insert_before(
+                elem, paragraphs("New")
+            ),
+            "insert_after": lambda elem: self.editor.insert_after(
+                elem, paragraphs("New")
+            ),
+            "append_to": lambda elem: self.editor.append_to(elem, "<w:r/>"),
+            "replace_node": lambda elem: self.editor.replace_node(
+                elem, paragraphs("One", "Two")
+            ),
+        }
+        for name, edit in edits.items():
+            with self.subTest(name):
+                elem = self.editor.get_node(tag="w:p", contains="Second")
+                checkpoint = self.editor.checkpoint()
+                edit(elem)
+                self.assertNotEqual(self.editor.dom.toxml(), self.original)
+                self.editor.rollback(checkpoint)
+                self.assertEqual(self.editor.dom.toxml(), self.original)
+                # The node reference stays valid after rollback
+                self.assertIs(self.editor.get_node(tag="w:p", contains="Second"), elem)
+
+    def test_commit_drops_earlier_checkpoints(self):
+        body = self.editor.get_node(tag="w:body")
+        start = self.editor.checkpoint()
+        self.editor.append_to(body, paragraphs("Kept"))
+        middle = self.editor.checkpoint()
+        self.editor.append_to(body, paragraphs("Undone"))
+
+        self.editor.commit(middle)
+        self.assertEqual(len(self.editor._journal), 1)
+        with self.assertRaises(ValueError):
+            self.editor.rollback(start)
+        self.editor.rollback(middle)
+        kept = self.editor.dom.toxml()
+        self.assertIn("Kept", kept)
+        self.assertNotIn("Undone", kept)
+        self.assertEqual(self.editor.checkpoint(), middle)
+
+    def test_line_stable_save_after_commit_writes_committed_edits(self):
+        first = self.editor.get_node(tag="w:p", contains="First")
+        self.editor.append_to(first, "<w:r/>")
+        self.editor.commit()
+        self.assertEqual(self.editor._journal, [])
+        self.assertIsNotNone(self.editor.save(line_stable=True))
+        saved = XMLEditor(self.path).get_node(tag="w:p", contains="First")
+        self.assertEqual(len(saved.getElementsByTagName("w:r")), 2)
+
+
+if __name__ == "__main__":
+    unittest.main()